@@ -0,0 +1,59 @@
+from database.database_full import FullDatabase
+from utils import discord_helpers, general_helpers
+import bot_helpers
+import discord
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def admin_sync_commands(
+    database: FullDatabase, interaction: discord.Interaction, hash_file: str
+):
+    """Sync the slash commands to Discord, even if they did not change"""
+    try:
+        await interaction.response.defer(ephemeral=True)
+        #######################################################################
+        #                               RECORDS                               #
+        #######################################################################
+
+        #######################################################################
+        #                             PROCESSING                              #
+        #######################################################################
+        sync_result = await bot_helpers.sync_command_tree(
+            interaction.client.tree, hash_file, force=True
+        )
+
+        #######################################################################
+        #                              RESPONSE                               #
+        #######################################################################
+        response_dictionary = {
+            "hash": sync_result["hash"],
+            "commands": len(sync_result["commands"]),
+        }
+        response_code_block = await discord_helpers.code_block(
+            await general_helpers.format_json(response_dictionary), "json"
+        )
+        await discord_helpers.final_message(
+            interaction=interaction,
+            message="\n".join(
+                [
+                    f"Slash commands synced:",
+                    f"{response_code_block}",
+                ]
+            ),
+            ephemeral=True,
+        )
+
+        #######################################################################
+        #                               LOGGING                               #
+        #######################################################################
+        logger.info(
+            f"Synchronized {len(sync_result['commands'])} command(s) on request"
+        )
+
+    # Errors
+    except AssertionError as message:
+        await discord_helpers.fail_message(interaction, message, ephemeral=True)
+    except Exception as error:
+        await discord_helpers.error_message(interaction, error, ephemeral=True)
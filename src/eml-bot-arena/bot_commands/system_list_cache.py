@@ -15,6 +15,8 @@ async def system_list_cache(database: FullDatabase, interaction: discord.Interac
         #######################################################################
         # Cache Times
         cache_times = await database.core_database.get_cache_times()
+        # Read Counters
+        read_stats = await database.core_database.get_read_stats()
 
         #######################################################################
         #                             PROCESSING                              #
@@ -33,12 +35,17 @@ async def system_list_cache(database: FullDatabase, interaction: discord.Interac
         response_code_block = await discord_helpers.code_block(
             await general_helpers.format_json(response_dictionary), language="json"
         )
+        read_stats_code_block = await discord_helpers.code_block(
+            await general_helpers.format_json(read_stats), language="json"
+        )
         await discord_helpers.final_message(
             interaction=interaction,
             message="\n".join(
                 [
                     f"Cache Refresh Times:",
                     f"{response_code_block}",
+                    f"Table Reads:",
+                    f"{read_stats_code_block}",
                 ]
             ),
         )
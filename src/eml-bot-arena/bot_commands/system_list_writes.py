@@ -15,6 +15,12 @@ async def system_list_writes(database: FullDatabase, interaction: discord.Intera
         #######################################################################
         # Pending Writes
         pending_writes = await database.core_database.get_pending_writes()
+        # Buffered History Rows
+        history_buffer = await database.core_database.get_history_buffer_lengths()
+        # Backend Status (e.g. replication lag)
+        backend_status = await database.core_database.get_backend_status()
+        # Remaining API Quota
+        quota_status = await database.core_database.get_quota_status()
 
         #######################################################################
         #                             PROCESSING                              #
@@ -26,12 +32,27 @@ async def system_list_writes(database: FullDatabase, interaction: discord.Intera
         response_code_block = await discord_helpers.code_block(
             await general_helpers.format_json(response_dictionary), language="json"
         )
+        backend_code_block = await discord_helpers.code_block(
+            await general_helpers.format_json(backend_status), language="json"
+        )
+        history_code_block = await discord_helpers.code_block(
+            await general_helpers.format_json(history_buffer), language="json"
+        )
+        quota_code_block = await discord_helpers.code_block(
+            await general_helpers.format_json(quota_status), language="json"
+        )
         await discord_helpers.final_message(
             interaction=interaction,
             message="\n".join(
                 [
                     f"Pending writes:",
                     f"{response_code_block}",
+                    f"Buffered history rows:",
+                    f"{history_code_block}",
+                    f"Backend:",
+                    f"{backend_code_block}",
+                    f"Quota:",
+                    f"{quota_code_block}",
                 ]
             ),
         )
@@ -1,3 +1,4 @@
 from bot_helpers.command_log import command_log
 from bot_helpers.command_is_allowed import command_is_allowed
 from bot_helpers.get_constant import get_constant
+from bot_helpers.sync_command_tree import sync_command_tree
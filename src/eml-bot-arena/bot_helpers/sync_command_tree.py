@@ -0,0 +1,41 @@
+import discord
+import hashlib
+import json
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def command_tree_hash(tree: discord.app_commands.CommandTree) -> str:
+    """Hash the global commands as Discord stores them (names, parameters, ...)"""
+    payload = sorted(
+        [command.to_dict(tree) for command in tree.get_commands()],
+        key=lambda command: (command.get("type", 1), command["name"]),
+    )
+    payload_json = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload_json.encode("utf-8")).hexdigest()
+
+
+async def sync_command_tree(
+    tree: discord.app_commands.CommandTree, hash_file: str, force: bool = False
+) -> dict:
+    """Sync the commands to Discord, only if they changed since the last sync
+
+    The hash of the last synced command tree is kept in `hash_file`. Command
+    names include the `BOT_PREFIX`, so a new prefix is a new hash.
+    """
+    tree_hash = await command_tree_hash(tree)
+    synced_hash = None
+    if os.path.exists(hash_file):
+        with open(hash_file, "r", encoding="utf-8") as file:
+            synced_hash = file.read().strip()
+    if not force and tree_hash == synced_hash:
+        logger.info(f"Command tree unchanged ({tree_hash[:12]}), sync skipped")
+        return {"synced": False, "hash": tree_hash, "commands": []}
+    synced_commands = await tree.sync()
+    os.makedirs(os.path.dirname(os.path.abspath(hash_file)), exist_ok=True)
+    with open(hash_file, "w", encoding="utf-8") as file:
+        file.write(tree_hash)
+    command_list = sorted([command.name for command in synced_commands])
+    return {"synced": True, "hash": tree_hash, "commands": command_list}
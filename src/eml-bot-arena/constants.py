@@ -45,6 +45,7 @@ COMMAND_ZADMINFIXROLES = "zadminfixroles"
 COMMAND_ZADMINGENERATEUUID = "zadmingenerateuuid"
 COMMAND_ZADMINMATCHENTRY = "zadminmatchentry"
 COMMAND_ZADMINSUSPEND = "zadminsuspend"
+COMMAND_ZADMINSYNCCOMMANDS = "zadminsynccommands"
 COMMAND_ZDEBUGDBCACHE = "zdebugdbcache"
 COMMAND_ZDEBUGDBQUEUE = "zdebugdbqueue"
 DISCORD_CHANNEL_BOT_COMMANDS = "bot-commands"
@@ -59,6 +60,7 @@ DISCORD_ROLE_PREFIX_COCAPTAIN = "CoCaptain"
 DISCORD_ROLE_PREFIX_PLAYER = "Player"
 DISCORD_ROLE_PREFIX_TEAM = "Team:"
 DISCORD_ROLES_LIST_ADMIN = "Director, Server Mod"
+DISCORD_STARTUP_WAIT_SECONDS = 2
 INPUT_ALLOWED_CHARS_LIMITED = "-_ "  # Comment added to keep line long enough for the formatter to ignore, and this one is even longer
 INPUT_ALLOWED_CHARS_PLAYER_NAME = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"  # Comment added to keep line long enough for the formatter to ignore
 INPUT_ALLOWED_CHARS_TEAM_NAME = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_ "  # Comment added to keep line long enough for the formatter to ignore
@@ -75,8 +77,35 @@ INVITES_TO_TEAM_EXPIRATION_DAYS = 7
 INVITES_TO_TEAM_RECEIVE_MAX = 5
 INVITES_TO_TEAM_SEND_MAX = 5
 LEAGUE_DB_CACHE_DURATION_SECONDS = 300
+LEAGUE_DB_CACHE_MAX_STALENESS_SECONDS = 1800
+LEAGUE_DB_CACHE_REFRESH_ALL_TABLES = False
+LEAGUE_DB_CACHE_SNAPSHOT_INTERVAL_SECONDS = 300
+LEAGUE_DB_CIRCUIT_FAILURE_THRESHOLD = 3
+LEAGUE_DB_CIRCUIT_PROBE_INTERVAL_SECONDS = 30
+LEAGUE_DB_EXPIRED_SWEEP_INTERVAL_SECONDS = 300
+LEAGUE_DB_HISTORY_ARCHIVE_INTERVAL_SECONDS = 86400
+LEAGUE_DB_HISTORY_BUFFER_MAX_ROWS = 5000
+LEAGUE_DB_HISTORY_FLUSH_INTERVAL_SECONDS = 30
+LEAGUE_DB_HISTORY_FLUSH_THRESHOLD = 200
+LEAGUE_DB_HISTORY_RETENTION_DAYS = 90
+LEAGUE_DB_INDEX_MAX_TOMBSTONES = 256
+LEAGUE_DB_QUEUE_BATCH_WRITES = True
+LEAGUE_DB_QUEUE_FLUSH_INTERVAL_SECONDS = 2
+LEAGUE_DB_QUEUE_FLUSH_THRESHOLD = 25
+LEAGUE_DB_QUEUE_MAX_LENGTH = 500
 LEAGUE_DB_QUEUE_WRITE_DELAY_SECONDS = 0
+LEAGUE_DB_QUOTA_BURST = 10
+LEAGUE_DB_QUOTA_READS_PER_MINUTE = 60
+LEAGUE_DB_QUOTA_WRITES_PER_MINUTE = 60
+LEAGUE_DB_REPLICATION_BATCH_SIZE = 200
+LEAGUE_DB_REPLICATION_IMPORT_INTERVAL_SECONDS = 300
+LEAGUE_DB_REPLICATION_IMPORT_MIN_ROWS_RATIO = 0.5
+LEAGUE_DB_REPLICATION_INTERVAL_SECONDS = 5
+LEAGUE_DB_REPLICATION_MAX_BACKOFF_SECONDS = 300
 LEAGUE_DB_RESPONSE_TIMEOUT_SECONDS = 5
+LEAGUE_DB_RETRY_BASE_DELAY_SECONDS = 1
+LEAGUE_DB_RETRY_MAX_ATTEMPTS = 5
+LEAGUE_DB_RETRY_MAX_DELAY_SECONDS = 32
 LEAGUE_DB_SPREADSHEET_DEFAULT_COLS = 27
 LEAGUE_DB_SPREADSHEET_DEFAULT_ROWS = 1000
 LEAGUE_DB_TAB_COMMAND_LOCK = "CommandLock"
@@ -95,6 +124,7 @@ LEAGUE_DB_TAB_TEAM_INVITE = "TeamInvite"
 LEAGUE_DB_TAB_TEAM_PLAYER = "TeamPlayer"
 LEAGUE_DB_TAB_VW_ROSTER = "vwRoster"
 LEAGUE_DB_TAB_CONSTANTS = "Constants"
+LEAGUE_DB_THREAD_POOL_MAX_WORKERS = 4
 LINK_ACCUMULATED_POINTS = "https://echomasterleague.com/eml-accumulated-points-ap-system/"  # Comment added to keep line long enough for the formatter to ignore
 LINK_ACTION_LIST = "https://docs.google.com/spreadsheets/d/e/2PACX-1vRhkQIBw9ETybdGNVggWnAf9ueizzDMc0lbKcsDPQsD6c1jDd8p8u8OUwl5gdcR2M14KmCV6-eF03p4/pubhtml"
 LINK_BOT_COMMANDS = "https://echomasterleague.com/eml-bot-commands/"
@@ -0,0 +1,126 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class StorageBackend:
+    """Where the tables of the database are stored (e.g. Google Sheets, SQLite)
+
+    `CoreDatabase` does the caching, queueing and batching of writes, and hands
+    the storage itself to a backend. Every table is a tab of rows, where the first
+    row holds the field names and the first column holds the record_id, like the
+    worksheets described by `database/fields.py`.
+
+    note: these methods block, `CoreDatabase` calls them through `run_blocking()`.
+    It never runs two reads or commits at the same time.
+    """
+
+    name: str = "base"
+    rate_limited: bool = False  # whether requests count against an API quota
+
+    def connect(self) -> None:
+        """Open the storage (e.g. the spreadsheet), if it is not open yet
+
+        note: backends also connect on first use, this lets startup do it early.
+        """
+        pass
+
+    def ensure_table(self, table_name: str, field_names: list[str]) -> None:
+        """Create a table with a header row of `field_names`, if it does not exist
+
+        Raises `EmlWorksheetCreateError` if it could not be created.
+        """
+        raise NotImplementedError
+
+    def ensure_tables(self, tables: dict[str, list[str]]) -> None:
+        """Create the tables that do not exist, `tables` maps names to field names
+
+        Raises `EmlWorksheetCreateError` if they could not be created.
+        """
+        for table_name, field_names in tables.items():
+            self.ensure_table(table_name, field_names)
+
+    def read_tables(
+        self, table_names: list[str]
+    ) -> dict[str, list[list[int | float | str | None]]]:
+        """Read all the rows (header row included) of several tables"""
+        raise NotImplementedError
+
+    def read_columns(
+        self, table_names: list[str], column: int
+    ) -> dict[str, list[int | float | str | None]]:
+        """Read one column (header row included) of several tables, `column` is 0-based"""
+        raise NotImplementedError
+
+    def read_first_rows(
+        self, table_name: str, row_count: int
+    ) -> list[list[int | float | str | None]]:
+        """Read the first `row_count` rows (header row included) of a table"""
+        raise NotImplementedError
+
+    def get_record_ids(self, table_name: str) -> list[str]:
+        """Read only the first column (the record_id) of every row of a table"""
+        raise NotImplementedError
+
+    def get_unindexed_tables(self, targets: list[tuple[str, str]]) -> list[str]:
+        """Get the tables to `index_tables()` before writing to (table_name, record_id)
+
+        note: this makes no request, backends that find rows by themselves return [].
+        """
+        return []
+
+    def index_tables(self, table_names: list[str]) -> None:
+        """Read where the rows of several tables are, for `update_rows` and `delete_rows`"""
+        pass
+
+    def append_rows(
+        self, table_name: str, rows: list[list[int | float | str | None]]
+    ) -> None:
+        """Add rows to the bottom of a table"""
+        raise NotImplementedError
+
+    def update_rows(
+        self, updates: list[tuple[str, list[int | float | str | None]]]
+    ) -> set[tuple[str, str]]:
+        """Replace rows, by (table_name, row_data) matched on the record_id
+
+        Returns the (table_name, record_id) of the rows that were not found.
+        """
+        raise NotImplementedError
+
+    def delete_rows(self, deletes: list[tuple[str, str]]) -> set[tuple[str, str]]:
+        """Delete rows, by (table_name, record_id)
+
+        Returns the (table_name, record_id) of the rows that were not found.
+        """
+        raise NotImplementedError
+
+    def replace_table(
+        self, table_name: str, rows: list[list[int | float | str | None]]
+    ) -> None:
+        """Replace every row of a table (header row included) with `rows`"""
+        raise NotImplementedError
+
+    def get_table_sizes(self, table_names: list[str]) -> dict[str, int]:
+        """Get the number of cells each table takes up (rows x columns)"""
+        raise NotImplementedError
+
+    def error_status(self, error: Exception) -> int | None:
+        """Get the HTTP status of an error raised by the backend (if it has one)"""
+        return None
+
+    def is_outage(self, error: Exception) -> bool:
+        """Check if an error means the backend is down (see `CircuitBreaker`)"""
+        return False
+
+    def ping(self) -> None:
+        """Make the cheapest request the backend has, to check that it is up"""
+        pass
+
+    def get_status(self) -> dict:
+        """Get the state of the backend, for debugging"""
+        return {"backend": self.name}
+
+    def close(self) -> None:
+        """Release any connection held by the backend"""
+        pass
@@ -0,0 +1,402 @@
+from database.backend_base import StorageBackend
+import bisect
+import constants
+import errors.database_errors as DbErrors
+import gspread
+import requests
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class GspreadBackend(StorageBackend):
+    """Google Sheets backend, every table is a worksheet of one spreadsheet
+
+    Attributes:
+        _gs_client (gspread.Client): The Google Sheets client to use
+        _db_spreadsheet (gspread.Spreadsheet): The Google Sheets spreadsheet to use as a database
+        _worksheets (dict): The worksheets that were already looked up, by title
+        _db_row_index (dict): Sheet row number of each record_id, per worksheet
+
+    UPDATE and DELETE target rows through `_db_row_index`, instead of searching
+    the worksheet for the record_id first. The index is rebuilt on every table
+    read, and follows the rows that are appended and deleted. It is dropped when
+    rows are appended somewhere else than expected (rows were added by hand), and
+    read again by `index_tables()` when a write asks for a record_id it does not
+    know (see `get_unindexed_tables`).
+    """
+
+    name = "gspread"
+    rate_limited = True
+
+    def __init__(self, gs_client: gspread.Client, spreadsheet_url: str):
+        """Set up the backend, the spreadsheet is opened by `connect()` (or on first use)"""
+        self._gs_client = gs_client
+        self._spreadsheet_url = spreadsheet_url
+        self._spreadsheet: gspread.Spreadsheet | None = None
+        self._worksheets: dict[str, gspread.Worksheet] = {}
+        self._db_row_index: dict[str, dict[str, int]] = {}
+        self._db_row_counts: dict[str, int] = {}
+
+    def connect(self) -> None:
+        """Open the spreadsheet"""
+        if self._spreadsheet:
+            return
+        try:
+            logger.debug(f"Connecting to Spreadsheet: {self._spreadsheet_url}")
+            self._spreadsheet = self._gs_client.open_by_url(self._spreadsheet_url)
+        except gspread.SpreadsheetNotFound as error:
+            raise DbErrors.EmlSpreadsheetDoesNotExist(f"Spreadsheet not found: {error}")
+
+    @property
+    def _db_spreadsheet(self) -> gspread.Spreadsheet:
+        """The spreadsheet used as a database, opened on first use"""
+        self.connect()
+        return self._spreadsheet
+
+    def error_status(self, error: Exception) -> int | None:
+        """Get the HTTP status of a Sheets API error"""
+        if isinstance(error, gspread.exceptions.APIError):
+            return error.code
+        return None
+
+    def is_outage(self, error: Exception) -> bool:
+        """Check if an error is a timeout, a connection error or a 5xx
+
+        note: a 429 is the quota, not an outage. It is retried, and only counted
+        by the circuit once its retries run out (see `CoreDatabase._call_backend`).
+        """
+        if isinstance(error, requests.exceptions.RequestException):
+            return True
+        status = self.error_status(error)
+        return status is not None and status >= 500
+
+    def ping(self) -> None:
+        """Read the spreadsheet metadata"""
+        logger.debug(f"[ 0 write, 1 read ] Checking the spreadsheet")
+        self._db_spreadsheet.worksheets()
+
+    def create_table_worksheet(self, title: str) -> gspread.Worksheet:
+        """Create a new worksheet in the DB spreadsheet"""
+        try:
+            worksheet = self._db_spreadsheet.add_worksheet(
+                title,
+                rows=constants.LEAGUE_DB_SPREADSHEET_DEFAULT_ROWS,
+                cols=constants.LEAGUE_DB_SPREADSHEET_DEFAULT_COLS,
+            )
+            worksheet.format("A1:Z1", {"textFormat": {"bold": True}})
+            worksheet.freeze(rows=1)
+        except gspread.WorksheetNotFound as error:
+            raise DbErrors.EmlWorksheetCreateError(f"Worsheet not created: {error}")
+        self._worksheets[title] = worksheet
+        return worksheet
+
+    def get_table_worksheet(self, table_name: str) -> gspread.Worksheet:
+        """Get a worksheet from the DB spreadsheet by title"""
+        try:
+            if table_name not in self._worksheets:
+                logger.info(f"[ 0 write, 1 read ] Getting Worksheet: {table_name}")
+                self._worksheets[table_name] = self._db_spreadsheet.worksheet(
+                    table_name
+                )
+        except gspread.WorksheetNotFound as error:
+            raise DbErrors.EmlWorksheetDoesNotExist(f"Worksheet not found: {error}")
+        return self._worksheets[table_name]
+
+    def ensure_table(self, table_name: str, field_names: list[str]) -> None:
+        """Create a worksheet with a header row of `field_names`, if it does not exist"""
+        try:
+            self.get_table_worksheet(table_name)
+        except DbErrors.EmlWorksheetDoesNotExist:
+            # Create the worksheet if it doesn't exist
+            worksheet = self.create_table_worksheet(table_name)
+            # Add the fields to the worksheet
+            worksheet.update(f"A1", [field_names])
+
+    def ensure_tables(self, tables: dict[str, list[str]]) -> None:
+        """Create the missing worksheets, with their header rows, in one `batch_update`
+
+        Every worksheet is looked up with one metadata request. Missing worksheets
+        are added with their header row (bold, frozen) by one `batch_update`, then
+        the metadata is read once more to look them up.
+        """
+        self._load_worksheets()
+        missing = {
+            title: field_names
+            for title, field_names in tables.items()
+            if title not in self._worksheets
+        }
+        if not missing:
+            return
+        next_id = max([worksheet.id for worksheet in self._worksheets.values()] + [0])
+        requests = []
+        for title, field_names in missing.items():
+            next_id += 1
+            grid = {
+                "rowCount": constants.LEAGUE_DB_SPREADSHEET_DEFAULT_ROWS,
+                "columnCount": max(
+                    constants.LEAGUE_DB_SPREADSHEET_DEFAULT_COLS, len(field_names)
+                ),
+                "frozenRowCount": 1,
+            }
+            properties = {"sheetId": next_id, "title": title, "gridProperties": grid}
+            requests.append({"addSheet": {"properties": properties}})
+            header_cells = [
+                {
+                    "userEnteredValue": {"stringValue": field_name},
+                    "userEnteredFormat": {"textFormat": {"bold": True}},
+                }
+                for field_name in field_names
+            ]
+            update_cells = {
+                "start": {"sheetId": next_id, "rowIndex": 0, "columnIndex": 0},
+                "rows": [{"values": header_cells}],
+                "fields": "userEnteredValue,userEnteredFormat.textFormat.bold",
+            }
+            requests.append({"updateCells": update_cells})
+        logger.info(f"[ 1 write, 0 read ] Creating Worksheets: {', '.join(missing)}")
+        try:
+            self._db_spreadsheet.batch_update({"requests": requests})
+        except gspread.exceptions.APIError as error:
+            raise DbErrors.EmlWorksheetCreateError(f"Worsheets not created: {error}")
+        self._load_worksheets()
+
+    def _load_worksheets(self) -> None:
+        """Look up every worksheet of the spreadsheet with one metadata request"""
+        logger.info(f"[ 0 write, 1 read ] Getting Worksheets")
+        self._worksheets = {
+            worksheet.title: worksheet
+            for worksheet in self._db_spreadsheet.worksheets()
+        }
+
+    def read_tables(
+        self, table_names: list[str]
+    ) -> dict[str, list[list[int | float | str | None]]]:
+        """Read several worksheets with one `values_batch_get` request"""
+        logger.debug(f"[ 0 write, 1 read ] Getting Tables: {', '.join(table_names)}")
+        ranges = [gspread.utils.absolute_range_name(name) for name in table_names]
+        response = self._db_spreadsheet.values_batch_get(ranges)
+        tables = {}
+        for name, value_range in zip(table_names, response["valueRanges"]):
+            table_data = gspread.utils.fill_gaps(value_range.get("values", [[]]))
+            self._build_row_index(name, [row[0] if row else "" for row in table_data])
+            tables[name] = table_data
+        return tables
+
+    def read_columns(
+        self, table_names: list[str], column: int
+    ) -> dict[str, list[int | float | str | None]]:
+        """Read one column of several worksheets with one `values_batch_get` request"""
+        letter = gspread.utils.rowcol_to_a1(1, column + 1)[:-1]
+        logger.debug(
+            f"[ 0 write, 1 read ] Getting column {letter} of: {', '.join(table_names)}"
+        )
+        ranges = [
+            gspread.utils.absolute_range_name(name, f"{letter}:{letter}")
+            for name in table_names
+        ]
+        response = self._db_spreadsheet.values_batch_get(ranges)
+        columns = {}
+        for name, value_range in zip(table_names, response["valueRanges"]):
+            values = value_range.get("values", [])
+            columns[name] = [row[0] if row else "" for row in values]
+        return columns
+
+    def read_first_rows(
+        self, table_name: str, row_count: int
+    ) -> list[list[int | float | str | None]]:
+        """Read the first `row_count` rows of a worksheet with one `values_batch_get` request"""
+        logger.debug(f"[ 0 write, 1 read ] Getting {row_count} row(s) of {table_name}")
+        range_name = gspread.utils.absolute_range_name(table_name, f"1:{row_count}")
+        response = self._db_spreadsheet.values_batch_get([range_name])
+        return gspread.utils.fill_gaps(response["valueRanges"][0].get("values", [[]]))
+
+    def get_unindexed_tables(self, targets: list[tuple[str, str]]) -> list[str]:
+        """Get the tables that are not indexed, or do not know a targeted record_id"""
+        table_names = []
+        for table_name, record_id in targets:
+            table_rows = self._db_row_index.get(table_name)
+            if table_rows is None or record_id not in table_rows:
+                if table_name not in table_names:
+                    table_names.append(table_name)
+        return table_names
+
+    def index_tables(self, table_names: list[str]) -> None:
+        """Index the rows of several worksheets with one `values_batch_get` request"""
+        logger.debug(f"[ 0 write, 1 read ] Indexing rows of: {', '.join(table_names)}")
+        ranges = [
+            gspread.utils.absolute_range_name(name, "A:A") for name in table_names
+        ]
+        response = self._db_spreadsheet.values_batch_get(ranges)
+        for name, value_range in zip(table_names, response["valueRanges"]):
+            values = value_range.get("values", [])
+            self._build_row_index(name, [row[0] if row else "" for row in values])
+
+    def get_record_ids(self, table_name: str) -> list[str]:
+        """Read the first column of a worksheet (and index its rows)"""
+        worksheet = self.get_table_worksheet(table_name)
+        logger.debug(f"[ 0 write, 1 read ] Indexing rows of {table_name}")
+        record_ids = worksheet.col_values(1)
+        self._build_row_index(table_name, record_ids)
+        return record_ids
+
+    def append_rows(
+        self, table_name: str, rows: list[list[int | float | str | None]]
+    ) -> None:
+        """Add rows to the bottom of a worksheet with one `append_rows` request"""
+        worksheet = self.get_table_worksheet(table_name)
+        logger.debug(f"[ 1 write, 0 read ] INSERT {len(rows)} row(s) in {table_name}")
+        response = worksheet.append_rows(rows, table_range="A1")
+        self._index_appended_rows(table_name, [row[0] for row in rows], response)
+
+    def update_rows(
+        self, updates: list[tuple[str, list[int | float | str | None]]]
+    ) -> set[tuple[str, str]]:
+        """Replace rows in any worksheet with one `values_batch_update` request
+
+        note: rows are found through the row index, see `get_unindexed_tables`.
+        """
+        missing = set()
+        data = []
+        for table_name, row_data in updates:
+            row_number = self._get_row_number(table_name, row_data[0])
+            if not row_number:
+                missing.add((table_name, row_data[0]))
+                continue
+            data.append(
+                {
+                    "range": gspread.utils.absolute_range_name(
+                        table_name, f"A{row_number}"
+                    ),
+                    "values": [row_data],
+                }
+            )
+        if data:
+            logger.debug(f"[ 1 write, 0 read ] UPDATE {len(data)} row(s)")
+            body = {"valueInputOption": "RAW", "data": data}
+            self._db_spreadsheet.values_batch_update(body)
+        return missing
+
+    def delete_rows(self, deletes: list[tuple[str, str]]) -> set[tuple[str, str]]:
+        """Delete rows in any worksheet with one `batch_update` request
+
+        Rows are deleted bottom-up in each worksheet, so the row numbers of the
+        rows still to delete do not move. Adjacent rows are deleted as one range.
+        Rows are found through the row index, see `get_unindexed_tables`.
+        """
+        missing = set()
+        deleted_rows: dict[str, set[int]] = {}
+        for table_name, record_id in deletes:
+            row_number = self._get_row_number(table_name, record_id)
+            if not row_number:
+                missing.add((table_name, record_id))
+                continue
+            deleted_rows.setdefault(table_name, set()).add(row_number)
+        if not deleted_rows:
+            return missing
+        requests = []
+        for table_name, table_rows in deleted_rows.items():
+            worksheet = self.get_table_worksheet(table_name)
+            for first_row, last_row in self._row_ranges(table_rows):
+                dimension_range = {
+                    "sheetId": worksheet.id,
+                    "dimension": "ROWS",
+                    "startIndex": first_row - 1,
+                    "endIndex": last_row,
+                }
+                requests.append({"deleteDimension": {"range": dimension_range}})
+        row_count = sum(len(table_rows) for table_rows in deleted_rows.values())
+        logger.debug(
+            f"[ 1 write, 0 read ] DELETE {row_count} row(s) in {len(requests)} range(s)"
+        )
+        self._db_spreadsheet.batch_update({"requests": requests})
+        for table_name, table_rows in deleted_rows.items():
+            self._unindex_deleted_rows(table_name, list(table_rows))
+        return missing
+
+    @staticmethod
+    def _row_ranges(row_numbers: set[int]) -> list[tuple[int, int]]:
+        """Group row numbers into (first, last) ranges of adjacent rows, bottom-up"""
+        ranges = []
+        for row_number in sorted(row_numbers, reverse=True):
+            if ranges and ranges[-1][0] == row_number + 1:
+                ranges[-1] = (row_number, ranges[-1][1])
+            else:
+                ranges.append((row_number, row_number))
+        return ranges
+
+    def replace_table(
+        self, table_name: str, rows: list[list[int | float | str | None]]
+    ) -> None:
+        """Clear a worksheet, then write `rows` to it"""
+        worksheet = self.get_table_worksheet(table_name)
+        logger.debug(f"[ 2 write, 0 read ] REPLACE of {table_name}")
+        worksheet.clear()
+        time.sleep(constants.LEAGUE_DB_QUEUE_WRITE_DELAY_SECONDS)
+        worksheet.append_rows(rows)
+        self._build_row_index(table_name, [row[0] if row else "" for row in rows])
+
+    def get_table_sizes(self, table_names: list[str]) -> dict[str, int]:
+        """Get the grid size (rows x columns) of worksheets from the spreadsheet metadata"""
+        logger.debug(
+            f"[ 0 write, 1 read ] Getting the size of {len(table_names)} table(s)"
+        )
+        metadata = self._db_spreadsheet.fetch_sheet_metadata()
+        sizes = {}
+        for sheet in metadata.get("sheets", []):
+            properties = sheet["properties"]
+            if properties["title"] in table_names:
+                grid = properties.get("gridProperties", {})
+                sizes[properties["title"]] = grid.get("rowCount", 0) * grid.get(
+                    "columnCount", 0
+                )
+        return sizes
+
+    def _build_row_index(self, table_name: str, record_ids: list[str]) -> None:
+        """Index the sheet row number of each record_id (first one wins, like `find`)"""
+        table_rows = {}
+        for index, record_id in reversed(list(enumerate(record_ids))):
+            table_rows[record_id] = index + 1
+        self._db_row_index[table_name] = table_rows
+        self._db_row_counts[table_name] = len(record_ids)
+
+    def _get_row_number(self, table_name: str, record_id: str) -> int | None:
+        """Get the sheet row number of a record from the row index"""
+        return self._db_row_index.get(table_name, {}).get(record_id)
+
+    def _index_appended_rows(
+        self, table_name: str, record_ids: list[str], response: dict
+    ) -> None:
+        """Add rows appended to the bottom of a worksheet to the row index"""
+        if table_name not in self._db_row_index:
+            return
+        try:
+            updated_range = response["updates"]["updatedRange"]
+            first_cell = gspread.utils.get_a1_from_absolute_range(updated_range)
+            first_row, _ = gspread.utils.a1_to_rowcol(first_cell.split(":")[0])
+        except (KeyError, TypeError, gspread.exceptions.IncorrectCellLabel):
+            first_row = None
+        if first_row != self._db_row_counts[table_name] + 1:
+            # unknown position, or rows added by hand: index again when needed
+            del self._db_row_index[table_name]
+            return
+        table_rows = self._db_row_index[table_name]
+        for offset, record_id in enumerate(record_ids):
+            table_rows.setdefault(record_id, first_row + offset)
+        self._db_row_counts[table_name] += len(record_ids)
+
+    def _unindex_deleted_rows(self, table_name: str, row_numbers: list[int]) -> None:
+        """Remove deleted rows from the row index, and shift the rows below them up"""
+        table_rows = self._db_row_index.get(table_name)
+        if table_rows is None:
+            return
+        deleted_rows = sorted(row_numbers)
+        shifted_rows = {}
+        for record_id, row_number in table_rows.items():
+            shift = bisect.bisect_left(deleted_rows, row_number)
+            if shift < len(deleted_rows) and deleted_rows[shift] == row_number:
+                continue
+            shifted_rows[record_id] = row_number - shift
+        self._db_row_index[table_name] = shifted_rows
+        self._db_row_counts[table_name] -= len(deleted_rows)
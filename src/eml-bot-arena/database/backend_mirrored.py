@@ -0,0 +1,333 @@
+from database.backend_base import StorageBackend
+from database.backend_sqlite import SqliteBackend
+from database.enums import WriteOperations
+from database.fields import BaseFields
+import constants
+import json
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+CHANGELOG_TABLE = "_changelog"
+REPLICATED_TABLE = "_replicated"
+
+
+class MirroredSqliteBackend(SqliteBackend):
+    """SQLite backend (the source of truth) that is mirrored to another backend
+
+    Every write is logged to a changelog table, in the same transaction as the
+    write itself. `send_change_run()` sends the changelog to the mirror (e.g. a
+    `GspreadBackend`) one run at a time, and `import_changes()` applies rows that
+    were edited by hand in the mirror back to SQLite. Both are driven by a
+    `DatabaseReplicator`, never by `CoreDatabase`, which makes every request to
+    the mirror within its quota. Tables are created in the mirror by the
+    replicator too, so the bot starts while the mirror is down.
+
+    The records known to be in the mirror are kept in a replicated table, so an
+    import only deletes records that were removed from the mirror, never records
+    that did not reach it yet.
+    """
+
+    name = "sqlite_mirrored"
+
+    def __init__(self, database_path: str, mirror: StorageBackend):
+        """Open (or create) the SQLite database file, and its changelog"""
+        super().__init__(database_path)
+        self._mirror = mirror
+        self._mirror_pending_tables: dict[str, list[str]] = {}
+        self._status = {
+            "replicated": 0,
+            "last_replicated_at": None,
+            "last_lag_seconds": None,
+            "imported": 0,
+            "conflicts": 0,
+            "last_imported_at": None,
+        }
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self._quote(CHANGELOG_TABLE)} ("
+                "sequence INTEGER PRIMARY KEY AUTOINCREMENT, table_name TEXT,"
+                " operation TEXT, record_id TEXT, row_data TEXT, created_at REAL)"
+            )
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self._quote(REPLICATED_TABLE)} ("
+                "table_name TEXT, record_id TEXT, PRIMARY KEY (table_name, record_id))"
+            )
+
+    def ensure_table(self, table_name: str, field_names: list[str]) -> None:
+        """Create the table in SQLite, and queue it for the mirror"""
+        super().ensure_table(table_name, field_names)
+        self._mirror_pending_tables[table_name] = list(field_names)
+
+    def ensure_tables(self, tables: dict[str, list[str]]) -> None:
+        """Create the tables in SQLite, and queue them for the mirror
+
+        note: the mirror is not touched here, so startup does not depend on it
+        (see `DatabaseReplicator.ensure_mirror_tables`).
+        """
+        for table_name, field_names in tables.items():
+            self.ensure_table(table_name, field_names)
+
+    @property
+    def mirror(self) -> StorageBackend:
+        """The backend the tables are mirrored to"""
+        return self._mirror
+
+    def get_mirror_pending_tables(self) -> dict[str, list[str]]:
+        """Get the tables still to create in the mirror, with their field names"""
+        return dict(self._mirror_pending_tables)
+
+    def remove_mirror_pending_tables(self, table_names: list[str]) -> None:
+        """Forget the tables that were created in the mirror"""
+        for table_name in table_names:
+            self._mirror_pending_tables.pop(table_name, None)
+
+    def is_mirror_unavailable(self, error: Exception) -> bool:
+        """Check if an error means the mirror is down, or over its quota"""
+        return self._mirror.is_outage(error) or self._mirror.error_status(error) == 429
+
+    def _record_change(
+        self, operation: WriteOperations, table_name: str, row_data: list
+    ) -> None:
+        """Log a write to the changelog, for `send_change_run()`"""
+        if operation == WriteOperations.REPLACE:
+            row_data = [[self._to_cell(value) for value in row] for row in row_data]
+            record_id = None
+        else:
+            row_data = [self._to_cell(value) for value in row_data]
+            record_id = row_data[0]
+        self._connection.execute(
+            f"INSERT INTO {self._quote(CHANGELOG_TABLE)}"
+            " (table_name, operation, record_id, row_data, created_at)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (table_name, operation.value, record_id, json.dumps(row_data), time.time()),
+        )
+
+    def get_change_runs(self, limit: int) -> list[list[tuple]]:
+        """Get up to `limit` logged writes, oldest first, grouped into runs
+
+        A run holds writes of the same operation, that `send_change_run()` sends
+        to the mirror with one backend request (e.g. one `append_rows`).
+        """
+        with self._lock:
+            cursor = self._connection.execute(
+                "SELECT sequence, table_name, operation, record_id, row_data, created_at"
+                f" FROM {self._quote(CHANGELOG_TABLE)} ORDER BY sequence LIMIT ?",
+                (limit,),
+            )
+            changes = cursor.fetchall()
+        runs: list[list[tuple]] = []
+        for change in changes:
+            previous = runs[-1][-1] if runs else None
+            same_run = (
+                previous
+                and previous[2] == change[2]
+                and change[2] != WriteOperations.REPLACE
+                and (change[2] != WriteOperations.INSERT or previous[1] == change[1])
+            )
+            if same_run:
+                runs[-1].append(change)
+            else:
+                runs.append([change])
+        return runs
+
+    def send_change_run(self, run: list[tuple]) -> None:
+        """Send a run of logged writes (see `get_change_runs`) to the mirror
+
+        The writes only leave the changelog once they were sent, so a failure is
+        sent again on the next call.
+        """
+        operation = WriteOperations(run[0][2])
+        table_name = run[0][1]
+        if operation == WriteOperations.INSERT:
+            rows = [json.loads(change[4]) for change in run]
+            self._mirror.append_rows(table_name, rows)
+        elif operation == WriteOperations.UPDATE:
+            # only the last UPDATE of each record is sent
+            updates = {(change[1], change[3]): change for change in run}
+            missing = self._mirror.update_rows(
+                [(change[1], json.loads(change[4])) for change in updates.values()]
+            )
+            for missing_table_name, record_id in missing:
+                logger.warning(
+                    f"Not replicated, record deleted from the mirror: {missing_table_name} {record_id}"
+                )
+        elif operation == WriteOperations.DELETE:
+            self._mirror.delete_rows([(change[1], change[3]) for change in run])
+        elif operation == WriteOperations.REPLACE:
+            self._mirror.replace_table(table_name, json.loads(run[0][4]))
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"DELETE FROM {self._quote(CHANGELOG_TABLE)} WHERE sequence <= ?",
+                (run[-1][0],),
+            )
+            self._mark_replicated(operation, table_name, run)
+        self._status["replicated"] += len(run)
+        self._status["last_replicated_at"] = time.time()
+        self._status["last_lag_seconds"] = round(time.time() - run[0][5], 3)
+
+    def _mark_replicated(
+        self, operation: WriteOperations, table_name: str, run: list[tuple]
+    ) -> None:
+        """Keep track of the records in the mirror, after a run was sent to it"""
+        replicated = self._quote(REPLICATED_TABLE)
+        if operation == WriteOperations.REPLACE:
+            rows = json.loads(run[0][4])[1:]
+            self._connection.execute(
+                f"DELETE FROM {replicated} WHERE table_name = ?", (table_name,)
+            )
+            keys = [(table_name, row[0]) for row in rows if row and row[0]]
+        else:
+            keys = [(change[1], change[3]) for change in run]
+        if operation == WriteOperations.DELETE:
+            self._connection.executemany(
+                f"DELETE FROM {replicated} WHERE table_name = ? AND record_id = ?",
+                keys,
+            )
+        else:
+            self._connection.executemany(
+                f"INSERT OR IGNORE INTO {replicated} VALUES (?, ?)", keys
+            )
+
+    def import_changes(
+        self, mirror_tables: dict[str, list[list[int | float | str | None]]]
+    ) -> dict[str, int]:
+        """Apply rows that were edited in the mirror back to SQLite
+
+        `mirror_tables` are the tables read from the mirror, header row included.
+
+        Only tables keyed on `record_id`, with an `updated_at`, are imported. A
+        record with writes still waiting in the changelog keeps the SQLite copy.
+        Otherwise the mirror wins, unless its `updated_at` is older than the SQLite
+        copy; that is a conflict, and the SQLite copy is sent to the mirror again.
+        Records missing from the mirror are only deleted if they were replicated
+        before, and never when the mirror tab is empty or much smaller than SQLite
+        (e.g. a recreated tab); an empty tab gets the SQLite copy again.
+        Returns the number of rows changed in SQLite, per table.
+        """
+        changed: dict[str, int] = {}
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                f"SELECT DISTINCT table_name, record_id FROM {self._quote(CHANGELOG_TABLE)}"
+            )
+            pending = set(cursor.fetchall())
+            for table_name, mirror_table in mirror_tables.items():
+                columns = self._get_columns(table_name)
+                is_keyed = (
+                    len(columns) > BaseFields.updated_at
+                    and columns[BaseFields.record_id] == BaseFields.record_id.name
+                    and columns[BaseFields.updated_at] == BaseFields.updated_at.name
+                )
+                if not is_keyed or (table_name, None) in pending:
+                    continue
+                count = self._import_table(table_name, mirror_table[1:], pending)
+                if count:
+                    changed[table_name] = count
+        self._status["imported"] += sum(changed.values())
+        self._status["last_imported_at"] = time.time()
+        return changed
+
+    def _import_table(
+        self,
+        table_name: str,
+        mirror_rows: list[list[int | float | str | None]],
+        pending: set[tuple[str, str]],
+    ) -> int:
+        """Apply the rows of one mirrored table to SQLite (see `import_changes`)"""
+        table = self._quote(table_name)
+        columns = self._get_columns(table_name)
+        mirror_records = {}
+        for row in mirror_rows:
+            if row and row[0] and row[0] not in mirror_records:
+                mirror_records[row[0]] = self._to_row(table_name, row)
+        cursor = self._connection.execute(
+            f"SELECT rowid, * FROM {table} ORDER BY rowid"
+        )
+        local_rows = cursor.fetchall()
+        local_records = {}
+        for row in local_rows:
+            local_records.setdefault(row[1], (row[0], list(row[1:])))
+        replicated = self._quote(REPLICATED_TABLE)
+        cursor = self._connection.execute(
+            f"SELECT record_id FROM {replicated} WHERE table_name = ?", (table_name,)
+        )
+        replicated_ids = {row[0] for row in cursor.fetchall()}
+        # records in both copies are in the mirror, whoever wrote them
+        self._connection.executemany(
+            f"INSERT OR IGNORE INTO {replicated} VALUES (?, ?)",
+            [(table_name, record_id) for record_id in mirror_records],
+        )
+        if local_rows and not mirror_records:
+            logger.warning(f"Mirror tab is empty, sending it again: {table_name}")
+            rows = [list(columns)] + [list(row[1:]) for row in local_rows]
+            self._record_change(WriteOperations.REPLACE, table_name, rows)
+            return 0
+        count = 0
+        placeholders = ", ".join("?" * len(columns))
+        assignments = ", ".join(f"{self._quote(column)} = ?" for column in columns)
+        for record_id, mirror_row in mirror_records.items():
+            if (table_name, record_id) in pending:
+                continue
+            if record_id not in local_records:
+                self._connection.execute(
+                    f"INSERT INTO {table} VALUES ({placeholders})", mirror_row
+                )
+                count += 1
+                continue
+            rowid, local_row = local_records[record_id]
+            if mirror_row == local_row:
+                continue
+            if mirror_row[BaseFields.updated_at] < local_row[BaseFields.updated_at]:
+                logger.warning(
+                    f"Import conflict, keeping SQLite: {table_name} {record_id}"
+                )
+                self._status["conflicts"] += 1
+                self._record_change(WriteOperations.UPDATE, table_name, local_row)
+                continue
+            self._connection.execute(
+                f"UPDATE {table} SET {assignments} WHERE rowid = ?",
+                mirror_row + [rowid],
+            )
+            count += 1
+        deleted = [
+            (record_id, rowid)
+            for record_id, (rowid, _) in local_records.items()
+            if record_id in replicated_ids
+            and record_id not in mirror_records
+            and (table_name, record_id) not in pending
+        ]
+        min_rows = (
+            len(local_records) * constants.LEAGUE_DB_REPLICATION_IMPORT_MIN_ROWS_RATIO
+        )
+        if deleted and len(mirror_records) < min_rows:
+            logger.warning(
+                f"Mirror tab is much smaller than SQLite, not deleting {len(deleted)} records: {table_name}"
+            )
+            return count
+        for record_id, rowid in deleted:
+            self._connection.execute(f"DELETE FROM {table} WHERE rowid = ?", (rowid,))
+            self._connection.execute(
+                f"DELETE FROM {replicated} WHERE table_name = ? AND record_id = ?",
+                (table_name, record_id),
+            )
+            count += 1
+        return count
+
+    def get_status(self) -> dict:
+        """Get the replication state (pending writes, lag, imports, conflicts)"""
+        with self._lock:
+            cursor = self._connection.execute(
+                f"SELECT COUNT(*), MIN(created_at) FROM {self._quote(CHANGELOG_TABLE)}"
+            )
+            pending, oldest = cursor.fetchone()
+        status = {"backend": self.name, "pending": pending}
+        status["mirror_tables_pending"] = len(self._mirror_pending_tables)
+        status["lag_seconds"] = round(time.time() - oldest, 3) if oldest else 0
+        status.update(self._status)
+        return status
+
+    def close(self) -> None:
+        """Close the SQLite connection, and the mirror"""
+        super().close()
+        self._mirror.close()
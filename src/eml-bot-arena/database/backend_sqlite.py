@@ -0,0 +1,250 @@
+from database.backend_base import StorageBackend
+from database.enums import WriteOperations
+import errors.database_errors as DbErrors
+import sqlite3
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SqliteBackend(StorageBackend):
+    """SQLite backend, every table is an SQLite table with the same layout as its worksheet
+
+    Each tab becomes a table named after the tab, with one TEXT column per field
+    (named after the header row). Rows keep their insertion order (`rowid`), and
+    the first column (the record_id) is indexed. Values are stored the way a
+    worksheet returns them, as text: `None` is "", `True` is "TRUE".
+
+    Meant for running the bot locally, and benchmarking commands without Google.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, database_path: str):
+        """Open (or create) the SQLite database file"""
+        logger.debug(f"Opening SQLite Database: {database_path}")
+        self._lock = threading.Lock()
+        try:
+            self._connection = sqlite3.connect(database_path, check_same_thread=False)
+        except sqlite3.Error as error:
+            raise DbErrors.EmlSpreadsheetDoesNotExist(f"Database not opened: {error}")
+        self._columns: dict[str, list[str]] = {}
+
+    @staticmethod
+    def _quote(identifier: str) -> str:
+        """Quote a table or column name"""
+        return '"' + str(identifier).replace('"', '""') + '"'
+
+    @staticmethod
+    def _to_cell(value: int | float | str | None) -> str:
+        """Convert a value to the text a worksheet would return for it"""
+        if value is None:
+            return ""
+        if value is True:
+            return "TRUE"
+        if value is False:
+            return "FALSE"
+        return str(value)
+
+    def _to_row(self, table_name: str, row_data: list) -> list[str]:
+        """Convert a row to cells, one per column of the table"""
+        width = len(self._get_columns(table_name))
+        cells = [self._to_cell(value) for value in row_data[:width]]
+        return cells + [""] * (width - len(cells))
+
+    def _get_columns(self, table_name: str) -> list[str]:
+        """Get the column (field) names of a table"""
+        if table_name not in self._columns:
+            cursor = self._connection.execute(
+                f"PRAGMA table_info({self._quote(table_name)})"
+            )
+            columns = [column[1] for column in cursor.fetchall()]
+            if not columns:
+                raise DbErrors.EmlWorksheetDoesNotExist(
+                    f"Table not found: {table_name}"
+                )
+            self._columns[table_name] = columns
+        return self._columns[table_name]
+
+    def _create_table(self, table_name: str, field_names: list[str]) -> None:
+        """Create a table, and index its first column"""
+        columns = ", ".join(f"{self._quote(name)} TEXT" for name in field_names)
+        table = self._quote(table_name)
+        self._connection.execute(f"CREATE TABLE {table} ({columns})")
+        index = self._quote(f"{table_name}_{field_names[0]}")
+        first_column = self._quote(field_names[0])
+        self._connection.execute(f"CREATE INDEX {index} ON {table} ({first_column})")
+        self._columns[table_name] = list(field_names)
+
+    def ensure_table(self, table_name: str, field_names: list[str]) -> None:
+        """Create a table with one column per field name, if it does not exist"""
+        with self._lock:
+            try:
+                self._get_columns(table_name)
+            except DbErrors.EmlWorksheetDoesNotExist:
+                try:
+                    with self._connection:
+                        self._create_table(table_name, field_names)
+                except sqlite3.Error as error:
+                    raise DbErrors.EmlWorksheetCreateError(
+                        f"Table not created: {error}"
+                    )
+
+    def read_tables(
+        self, table_names: list[str]
+    ) -> dict[str, list[list[int | float | str | None]]]:
+        """Read several tables, each with its header row first"""
+        tables = {}
+        with self._lock:
+            for table_name in table_names:
+                columns = self._get_columns(table_name)
+                cursor = self._connection.execute(
+                    f"SELECT * FROM {self._quote(table_name)} ORDER BY rowid"
+                )
+                tables[table_name] = [list(columns)] + [
+                    list(row) for row in cursor.fetchall()
+                ]
+        return tables
+
+    def read_columns(
+        self, table_names: list[str], column: int
+    ) -> dict[str, list[int | float | str | None]]:
+        """Read one column of several tables, each with its header first"""
+        columns = {}
+        with self._lock:
+            for table_name in table_names:
+                column_name = self._get_columns(table_name)[column]
+                cursor = self._connection.execute(
+                    f"SELECT {self._quote(column_name)}"
+                    f" FROM {self._quote(table_name)} ORDER BY rowid"
+                )
+                columns[table_name] = [column_name] + [
+                    row[0] for row in cursor.fetchall()
+                ]
+        return columns
+
+    def read_first_rows(
+        self, table_name: str, row_count: int
+    ) -> list[list[int | float | str | None]]:
+        """Read the first `row_count` rows of a table, header row included"""
+        with self._lock:
+            columns = self._get_columns(table_name)
+            cursor = self._connection.execute(
+                f"SELECT * FROM {self._quote(table_name)} ORDER BY rowid LIMIT ?",
+                (max(row_count - 1, 0),),
+            )
+            return [list(columns)] + [list(row) for row in cursor.fetchall()]
+
+    def get_record_ids(self, table_name: str) -> list[str]:
+        """Read the first column of a table, header included"""
+        with self._lock:
+            columns = self._get_columns(table_name)
+            cursor = self._connection.execute(
+                f"SELECT {self._quote(columns[0])} FROM {self._quote(table_name)}"
+                " ORDER BY rowid"
+            )
+            return [columns[0]] + [row[0] for row in cursor.fetchall()]
+
+    def append_rows(
+        self, table_name: str, rows: list[list[int | float | str | None]]
+    ) -> None:
+        """Add rows to the end of a table"""
+        with self._lock:
+            columns = self._get_columns(table_name)
+            placeholders = ", ".join("?" * len(columns))
+            with self._connection:
+                self._connection.executemany(
+                    f"INSERT INTO {self._quote(table_name)} VALUES ({placeholders})",
+                    [self._to_row(table_name, row) for row in rows],
+                )
+                for row in rows:
+                    self._record_change(WriteOperations.INSERT, table_name, row)
+
+    def _first_rowid(self, table_name: str, record_id: str) -> int | None:
+        """Get the rowid of the first row of a record (like `find`)"""
+        columns = self._get_columns(table_name)
+        cursor = self._connection.execute(
+            f"SELECT rowid FROM {self._quote(table_name)}"
+            f" WHERE {self._quote(columns[0])} = ? ORDER BY rowid LIMIT 1",
+            (self._to_cell(record_id),),
+        )
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def update_rows(
+        self, updates: list[tuple[str, list[int | float | str | None]]]
+    ) -> set[tuple[str, str]]:
+        """Replace rows matched on their record_id, in one transaction"""
+        missing = set()
+        with self._lock, self._connection:
+            for table_name, row_data in updates:
+                rowid = self._first_rowid(table_name, row_data[0])
+                if rowid is None:
+                    missing.add((table_name, row_data[0]))
+                    continue
+                assignments = ", ".join(
+                    f"{self._quote(column)} = ?"
+                    for column in self._get_columns(table_name)
+                )
+                self._connection.execute(
+                    f"UPDATE {self._quote(table_name)} SET {assignments} WHERE rowid = ?",
+                    self._to_row(table_name, row_data) + [rowid],
+                )
+                self._record_change(WriteOperations.UPDATE, table_name, row_data)
+        return missing
+
+    def delete_rows(self, deletes: list[tuple[str, str]]) -> set[tuple[str, str]]:
+        """Delete rows matched on their record_id, in one transaction"""
+        missing = set()
+        with self._lock, self._connection:
+            for table_name, record_id in deletes:
+                rowid = self._first_rowid(table_name, record_id)
+                if rowid is None:
+                    missing.add((table_name, record_id))
+                    continue
+                self._connection.execute(
+                    f"DELETE FROM {self._quote(table_name)} WHERE rowid = ?", (rowid,)
+                )
+                self._record_change(WriteOperations.DELETE, table_name, [record_id])
+        return missing
+
+    def replace_table(
+        self, table_name: str, rows: list[list[int | float | str | None]]
+    ) -> None:
+        """Recreate a table from `rows`, the first row is the header row"""
+        if not rows:
+            return
+        with self._lock, self._connection:
+            self._connection.execute(f"DROP TABLE IF EXISTS {self._quote(table_name)}")
+            self._columns.pop(table_name, None)
+            self._create_table(table_name, rows[0])
+            placeholders = ", ".join("?" * len(rows[0]))
+            self._connection.executemany(
+                f"INSERT INTO {self._quote(table_name)} VALUES ({placeholders})",
+                [self._to_row(table_name, row) for row in rows[1:]],
+            )
+            self._record_change(WriteOperations.REPLACE, table_name, rows)
+
+    def get_table_sizes(self, table_names: list[str]) -> dict[str, int]:
+        """Get the cells of each table, header row included (rows x columns)"""
+        sizes = {}
+        with self._lock:
+            for table_name in table_names:
+                columns = self._get_columns(table_name)
+                cursor = self._connection.execute(
+                    f"SELECT COUNT(*) FROM {self._quote(table_name)}"
+                )
+                sizes[table_name] = (cursor.fetchone()[0] + 1) * len(columns)
+        return sizes
+
+    def _record_change(
+        self, operation: WriteOperations, table_name: str, row_data: list
+    ) -> None:
+        """Called inside the transaction of every write (e.g. to log it for a mirror)"""
+        pass
+
+    def close(self) -> None:
+        """Close the SQLite connection"""
+        with self._lock:
+            self._connection.close()
@@ -1,11 +1,13 @@
 from database.database_core import CoreDatabase
+from database.database_session import DatabaseSession
 from database.fields import BaseFields
 from database.records import BaseRecord
+from database.table_index import TableIndex
+from database.table_query import TableQuery
 from enum import IntEnum, StrEnum, verify, EnumCheck
 from typing import Type
 import constants
 import errors.database_errors as DbErrors
-import gspread
 import utils.general_helpers as general_helpers
 import logging
 
@@ -25,11 +27,17 @@ class BaseTable:
     - `insert_record(record)`: Insert a new record into the table
     ## Read:
     - `get_table_data()`: Get all the data from the worksheet. (i.e. the table)
+    - `get_record_from_row(row)`: Get the record of a row of the table
+    - `where(**criteria)`: Query the table (see `TableQuery`)
     - `get_record(record_id)`: Get a record by its ID
     ## Update:
     - `update_record(record)`: Update a record in the table
     ## Delete:
     - `delete_record(record_id)`: Delete a record by its ID
+    - `delete_expired_records()`: Delete the expired records of the whole table
+
+    Every write also adds a row to the `*History` table, unless the table was
+    created with `keep_history=False` (see `HistoryTable`).
     """
 
     def __init__(
@@ -38,37 +46,73 @@ class BaseTable:
         table_name: str,
         record_type: Type[BaseRecord],
         fields: Type[BaseFields],
+        indexed_fields: list[IntEnum] = None,
+        keep_history: bool = True,
+        expires_at_field: IntEnum = None,
     ):
         self.table_name: str = table_name
         self._db: CoreDatabase = db
         self._record_type: Type[BaseRecord] = record_type
         self._fields: Type[BaseFields] = fields
-        self._history_table: HistoryTable
-        try:
-            table_worksheet: gspread.worksheet.Worksheet
-            table_worksheet = db.get_table_worksheet(table_name)
-        except DbErrors.EmlWorksheetDoesNotExist as error:
-            # Create the worksheet if it doesn't exist
-            table_worksheet = db.create_table_worksheet(table_name)
-            # Add the fields to the worksheet
-            field_list = [field.name for field in fields]
-            table_worksheet.update(f"A1", [field_list])
-        except DbErrors.EmlWorksheetCreateError as error:
-            message = f"Worksheet '{table_name}' does not exist and could not be created: {error}"
-            raise DbErrors.EmlWorksheetDoesNotExist(message)
-        history_table_name = f"{table_name}{constants.LEAGUE_DB_TAB_SUFFIX_HISTORY}"
-        self._history_table = HistoryTable(db, history_table_name, record_type, fields)
+        self._history_table: HistoryTable | None = None
+        self._expires_at_field: IntEnum | None = expires_at_field
+        self._expired_swept_at: int = 0
+        # Create the table (with its fields) if it doesn't exist
+        # note: tables are created together, see `CoreDatabase.ensure_tables`
+        field_list = [field.name for field in fields]
+        db.ensure_table(table_name, field_list)
+        # Hash index the common lookup keys (see `TableQuery`)
+        indexed_columns = [int(field) for field in indexed_fields or []]
+        db.register_table(table_name, indexed_columns)
+        if keep_history:
+            history_table_name = f"{table_name}{constants.LEAGUE_DB_TAB_SUFFIX_HISTORY}"
+            self._history_table = HistoryTable(
+                db, history_table_name, record_type, fields
+            )
 
     async def get_table_data(self):
-        """Get all the data from the workseet"""
-        try:
-            table = await self._db.get_table_data(self.table_name)
-        except gspread.exceptions.APIError as error:
-            raise DbErrors.EmlWorksheetReadError(
-                f"Error reading worksheet: {error.response.text}"
-            )
+        """Get all the data from the workseet
+
+        Inside a `DatabaseSession`, the table is read once and then pinned.
+        """
+        session = DatabaseSession.current()
+        if session:
+            table = session.get_table(self.table_name)
+            if table is not None:
+                return table
+        table = await self._db.get_table_data(self.table_name)
+        if session:
+            session.pin_table(self.table_name, table)
         return table
 
+    def where(self, **criteria: int | float | str | None) -> TableQuery:
+        """Query the table, e.g. `await table.where(team_id=team_id).all()`"""
+        return TableQuery(self, self._fields).where(**criteria)
+
+    async def get_table_index(
+        self, table: list[list[int | float | str | None]]
+    ) -> TableIndex | None:
+        """Get the indexes of the table, if they index this copy of it"""
+        return await self._db.get_table_index(self.table_name, table)
+
+    async def get_record_from_row(self, row: list[int | float | str | None]):
+        """Get the record of a row, shared with the rest of the `DatabaseSession`"""
+        session = DatabaseSession.current()
+        if session:
+            return session.get_record(self.table_name, row, self._record_type)
+        return self._record_type(row)
+
+    async def _after_write(self, record_id: str, record: BaseRecord = None):
+        """Re-pin the table (and record) in the `DatabaseSession` after a write"""
+        session = DatabaseSession.current()
+        if not session:
+            return
+        session.unpin_table(self.table_name)
+        if record:
+            session.put_record(self.table_name, record_id, record)
+        else:
+            session.forget_record(self.table_name, record_id)
+
     async def create_record(
         self,
         data_list: list[int | float | str | None],
@@ -83,17 +127,14 @@ class BaseTable:
 
     async def insert_record(self, record: BaseRecord):
         """Insert a new record into the table"""
-        try:
-            # Update History
+        # Update History
+        if self._history_table:
             operation = HistoryOperations.CREATE
             await self._history_table.create_history_record(record, operation)
-            # Insert Record
-            record_list = await record.to_list()
-            await self._db.append_row(table_name=self.table_name, row_data=record_list)
-        except gspread.exceptions.APIError as error:
-            raise DbErrors.EmlWorksheetWriteError(
-                f"Error writing to worksheet: {error.response.text}"
-            )
+        # Insert Record
+        record_list = await record.to_list()
+        await self._db.append_row(table_name=self.table_name, row_data=record_list)
+        await self._after_write(record_list[BaseFields.record_id], record)
 
     async def update_record(self, record: BaseRecord):
         """Update a record in the table"""
@@ -102,43 +143,61 @@ class BaseTable:
             BaseFields.updated_at, await general_helpers.iso_timestamp()
         )
         table = await self.get_table_data()
-        for row in table:
-            if table.index(row) == 0:
-                continue
-            if row[BaseFields.record_id] == record_id:
-                # Update History
-                operation = HistoryOperations.UPDATE
-                await self._history_table.create_history_record(record, operation)
-                # Update Records
-                record_list = await record.to_list()
-                await self._db.update_row(
-                    table_name=self.table_name, row_data=record_list
-                )
-                return
-        raise DbErrors.EmlRecordNotFound(f"Record '{record_id}' not found")
+        position = await self._db.locate_row(self.table_name, table, record_id)
+        if position is None:
+            raise DbErrors.EmlRecordNotFound(f"Record '{record_id}' not found")
+        # Update History
+        if self._history_table:
+            operation = HistoryOperations.UPDATE
+            await self._history_table.create_history_record(record, operation)
+        # Update Records
+        record_list = await record.to_list()
+        await self._db.update_row(table_name=self.table_name, row_data=record_list)
+        await self._after_write(record_id, record)
 
     async def delete_record(self, record_id: str):
         """Delete a record from the table"""
         table = await self.get_table_data()
-        for row in table:
-            if table.index(row) == 0:
+        position = await self._db.locate_row(self.table_name, table, record_id)
+        if position is None:
+            raise DbErrors.EmlRecordNotFound(f"Record '{record_id}' not found")
+        # Update History
+        if self._history_table:
+            record = self._record_type(table[position])
+            operation = HistoryOperations.DELETE
+            await self._history_table.create_history_record(record, operation)
+        # Delete Record
+        await self._db.delete_row(table_name=self.table_name, record_id=record_id)
+        await self._after_write(record_id)
+
+    async def delete_expired_records(self):
+        """Delete the expired records of the whole table
+
+        Sweeps the cached rows at most once every
+        `LEAGUE_DB_EXPIRED_SWEEP_INTERVAL_SECONDS`, so records nobody queries
+        for are still cleaned up.
+        """
+        if self._expires_at_field is None:
+            return
+        now = await general_helpers.epoch_timestamp()
+        interval = constants.LEAGUE_DB_EXPIRED_SWEEP_INTERVAL_SECONDS
+        if now - self._expired_swept_at < interval:
+            return
+        self._expired_swept_at = now
+        table = await self.get_table_data()
+        expired_ids = []
+        for row in table[1:]:
+            expires_at = row[self._expires_at_field]
+            if not expires_at:
                 continue
-            if row[BaseFields.record_id] == record_id:
-                try:
-                    # Update History
-                    record = self._record_type(row)
-                    operation = HistoryOperations.DELETE
-                    await self._history_table.create_history_record(record, operation)
-                    # Delete Record
-                    await self._db.delete_row(
-                        table_name=self.table_name, record_id=record_id
-                    )
-                except gspread.exceptions.APIError as error:
-                    raise DbErrors.EmlWorksheetWriteError(
-                        f"Error writing to worksheet: {error.response.text}"
-                    )
-                return
-        raise DbErrors.EmlRecordNotFound(f"Record '{record_id}' not found")
+            if now > await general_helpers.epoch_timestamp(expires_at):
+                expired_ids.append(row[BaseFields.record_id])
+        for record_id in expired_ids:
+            await self.delete_record(record_id)
+        if expired_ids:
+            logger.info(
+                f"Deleted {len(expired_ids)} expired '{self.table_name}' records"
+            )
 
 
 """
@@ -170,7 +229,11 @@ class HistoryOperations(StrEnum):
 
 
 class HistoryTable:
-    """A class to manipulate a History table in the database"""
+    """A class to manipulate a History table in the database
+
+    History rows are only ever appended, and never read back: they are buffered
+    and appended in bulk (see `CoreDatabase.append_history_row`), not cached.
+    """
 
     def __init__(
         self,
@@ -183,21 +246,13 @@ class HistoryTable:
         self._db: CoreDatabase = db
         self._record_type: Type[BaseRecord] = record_type
         self._record_fields: Type[BaseFields] = fields
-        try:
-            history_worksheet: gspread.worksheet.Worksheet
-            history_worksheet = db.get_table_worksheet(table_name)
-        except DbErrors.EmlWorksheetDoesNotExist as error:
-            # Create the worksheet if it doesn't exist
-            history_worksheet = db.create_table_worksheet(table_name)
-            # Add the fields to the worksheet
-            fields: Type[IntEnum] = self._record_fields
-            original_field_list = [field.name for field in fields]
-            history_field_list = [field.name for field in HistoryFields]
-            field_list = history_field_list + original_field_list
-            history_worksheet.update(f"A1", [field_list])
-        except DbErrors.EmlWorksheetCreateError as error:
-            message = f"Worksheet '{table_name}' does not exist and could not be created: {error}"
-            raise DbErrors.EmlWorksheetDoesNotExist(message)
+        # Create the table (with its fields) if it doesn't exist
+        fields: Type[IntEnum] = self._record_fields
+        original_field_list = [field.name for field in fields]
+        history_field_list = [field.name for field in HistoryFields]
+        field_list = history_field_list + original_field_list
+        db.ensure_table(table_name, field_list)
+        db.register_history_table(table_name)
 
     async def create_history_record(
         self, record: BaseRecord, operation: HistoryOperations
@@ -212,10 +267,7 @@ class HistoryTable:
             await general_helpers.iso_timestamp()
         )
         history_list[HistoryFields.history_operation] = operation.value
-        # insert the history record list into the table
-        try:
-            await self._db.append_row(table_name=self.table_name, row_data=history_list)
-        except gspread.exceptions.APIError as error:
-            raise DbErrors.EmlWorksheetWriteError(
-                f"Error writing to worksheet: {error.response.text}"
-            )
+        # buffer the history record list for the history flusher
+        await self._db.append_history_row(
+            table_name=self.table_name, row_data=history_list
+        )
@@ -0,0 +1,74 @@
+from database.enums import CircuitStates
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Tracks backend failures, and stops sending requests to a backend that is down
+
+    - CLOSED: requests go through, consecutive failures are counted
+    - OPEN: after `failure_threshold` consecutive failures, requests are refused
+    - HALF_OPEN: a recovery probe is running, one success closes the circuit and
+      one failure opens it again
+
+    The breaker only keeps the state, `CoreDatabase` decides what to do with it.
+    """
+
+    def __init__(self, failure_threshold: int):
+        self.failure_threshold = failure_threshold
+        self.state = CircuitStates.CLOSED
+        self._failure_count = 0
+        self._opened_at: float | None = None
+        self._last_error: str | None = None
+        self._stats = {"opened": 0, "refused": 0}
+
+    def allows_requests(self) -> bool:
+        """Check if a request may be sent to the backend"""
+        return self.state != CircuitStates.OPEN
+
+    def refuse(self) -> None:
+        """Count a request that was refused while the circuit is open"""
+        self._stats["refused"] += 1
+
+    def half_open(self) -> None:
+        """Let a recovery probe through"""
+        if self.state == CircuitStates.OPEN:
+            self.state = CircuitStates.HALF_OPEN
+
+    def record_success(self) -> CircuitStates | None:
+        """Reset the failure count, returns the new state if it changed"""
+        self._failure_count = 0
+        if self.state == CircuitStates.CLOSED:
+            return None
+        self.state = CircuitStates.CLOSED
+        self._opened_at = None
+        return self.state
+
+    def record_failure(self, error: Exception) -> CircuitStates | None:
+        """Count a failure, returns the new state if it changed"""
+        self._failure_count += 1
+        self._last_error = str(error)
+        if self.state == CircuitStates.OPEN:
+            return None
+        if (
+            self.state == CircuitStates.CLOSED
+            and self._failure_count < self.failure_threshold
+        ):
+            return None
+        if self.state == CircuitStates.CLOSED:
+            self._opened_at = time.time()
+            self._stats["opened"] += 1
+        self.state = CircuitStates.OPEN
+        return self.state
+
+    def get_status(self) -> dict:
+        """Get the state of the circuit, for debugging"""
+        status = {"state": self.state, "failures": self._failure_count}
+        status["open_seconds"] = (
+            round(time.time() - self._opened_at, 3) if self._opened_at else 0
+        )
+        status["last_error"] = self._last_error
+        status.update(self._stats)
+        return status
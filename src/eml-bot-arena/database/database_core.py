@@ -1,7 +1,19 @@
-from database.enums import WriteOperations
+from concurrent.futures import ThreadPoolExecutor
+from database.backend_base import StorageBackend
+from database.circuit_breaker import CircuitBreaker
+from database.enums import CircuitStates, WriteOperations
+from database.rate_limiter import TokenBucket
+from database.table_index import TableIndex
+from typing import Any, Callable
+import asyncio
 import constants
+import contextlib
 import errors.database_errors as DbErrors
-import gspread
+import functools
+import json
+import os
+import random
+import sqlite3
 import time
 import logging
 
@@ -11,129 +23,891 @@ logger = logging.getLogger(__name__)
 class CoreDatabase:
     """Google Sheets (pseudo-) Database
 
-    This class is a pseudo-database that uses Google Sheets as a backend. It is
-    designed to be used with the `gspread` library.
+    This class is a pseudo-database that caches tables, and queues writes to them.
+    The tables are stored by a `StorageBackend`: Google Sheets (`GspreadBackend`)
+    or SQLite (`SqliteBackend`).
 
     Attributes:
-        _gs_client (gspread.Client): The Google Sheets client to use
-        _db_spreadsheet (gspread.Spreadsheet): The Google Sheets spreadsheet to use as a database
+        _backend (StorageBackend): Where the tables are stored
         _db_local_cache (dict): A cache of worksheets to reduce API calls
+        _db_registered_tables (list): Tables that are read through the cache
+        _db_pending_tables (dict): Tables to create if missing (see `ensure_tables`)
+        _db_indexes (dict): Hash indexes of the cached tables (see `TableIndex`)
+        _db_refresh_task (asyncio.Task): Background refresh of stale tables
+        _db_read_futures (dict): Table reads in flight, shared by every caller
         _db_write_queue (list): A queue of write operations to commit to the database
+        _db_write_lock (asyncio.Lock): Serializes commits of the write queue
+        _db_write_flusher (asyncio.Task): Background task that commits the write queue
+        _db_wal_path (str): Write-ahead log file that keeps the write queue on disk
+        _db_snapshot_path (str): SQLite file that keeps a snapshot of the cache on disk
+        _executor (ThreadPoolExecutor): Bounded pool that runs blocking backend calls
+        _db_read_quota (TokenBucket): Per-minute read quota of the backend
+        _db_write_quota (TokenBucket): Per-minute write quota of the backend
+        _db_circuit (CircuitBreaker): Opens when the backend is down (see below)
+        _db_history_buffer (dict): History rows waiting to be appended, per table
+        _db_history_flusher (asyncio.Task): Background task that appends history rows
+
+    note: backends block (e.g. `gspread` is `requests` based). Every backend call
+    is sent to `_executor` through `run_blocking()`, so a slow Sheets response
+    only holds up the command that is waiting for it, and not the whole
+    discord.py event loop.
+
+    Every backend request goes through `_call_backend()`. For a rate limited
+    backend (Google Sheets) it waits for the read or write quota first, so requests
+    are spread out before Google's per-minute quota is hit. 429 and 5xx responses
+    are retried with jittered exponential backoff, anything else (e.g. 403) is
+    raised right away.
+
+    After `LEAGUE_DB_CIRCUIT_FAILURE_THRESHOLD` outage errors in a row (timeouts,
+    5xx, or a 429 that is still refused after every retry), the circuit opens and the database runs degraded: reads are served
+    from the cache however old it is, writes stay in the write queue (and the
+    write-ahead log), and no request is sent to the backend. A background probe
+    pings the backend every `LEAGUE_DB_CIRCUIT_PROBE_INTERVAL_SECONDS`, and closes
+    the circuit once it answers. Circuit listeners are told of both changes.
+
+    Writes are "write-behind": `append_row`, `update_row` and `delete_row` update
+    the local cache and queue the write, then return. The write flusher commits
+    the queue every `LEAGUE_DB_QUEUE_FLUSH_INTERVAL_SECONDS`, or as soon as it
+    holds `LEAGUE_DB_QUEUE_FLUSH_THRESHOLD` writes. Writers are made to wait for
+    a commit once the queue reaches `LEAGUE_DB_QUEUE_MAX_LENGTH`.
+
+    With a `write_ahead_log_path`, every queued write is appended (and fsync'd) to
+    that file before the write returns. If that fails, the write raises
+    `EmlWriteAheadLogError` and is not queued. The log is rewritten to hold only what is
+    still queued after each commit. On startup the log is replayed into the write
+    queue, so writes that were acknowledged but not committed before a crash or
+    restart are not lost. Replayed INSERTs that did reach the sheet are dropped.
+
+    History rows (see `append_history_row`) are a separate stream: they are never
+    read back, so they skip the cache, the write queue and the write-ahead log.
+    They are buffered, and appended with one `append_rows` per history table every
+    `LEAGUE_DB_HISTORY_FLUSH_INTERVAL_SECONDS` (or once the buffer holds
+    `LEAGUE_DB_HISTORY_FLUSH_THRESHOLD` rows). A crash loses the buffered history
+    rows (one interval, or the whole outage while the circuit is open), never a
+    record write. Each history table buffers at most
+    `LEAGUE_DB_HISTORY_BUFFER_MAX_ROWS` rows, the oldest are dropped (and logged).
+
+    With a `cache_snapshot_path`, the cache (rows and pull times) is saved to that
+    file every `LEAGUE_DB_CACHE_SNAPSHOT_INTERVAL_SECONDS` and on `close()`.
+    `load_cache_snapshot()` puts it back in the cache on startup, as stale data:
+    it is served right away, while every table is read again in the background.
     """
 
-    def __init__(self, gs_client: gspread.Client, spreadsheet_url: str):
+    def __init__(
+        self,
+        backend: StorageBackend,
+        write_ahead_log_path: str = None,
+        cache_snapshot_path: str = None,
+    ):
         """Initialize the Database class"""
-        self._gs_client = gs_client
-        self._worksheets: dict[str, gspread.Worksheet] = {}
+        self._backend = backend
         self._db_cache_pull_times: dict[str, float] = {}
         self._db_local_cache: dict[str, list[list[int | float | str | None]]] = {}
         self._db_write_queue: list[list[int | float | str | None]] = []
-        try:
-            logger.debug(f"Connecting to Spreadsheet: {spreadsheet_url}")
-            self._db_spreadsheet = gs_client.open_by_url(spreadsheet_url)
-        except gspread.SpreadsheetNotFound as error:
-            raise DbErrors.EmlSpreadsheetDoesNotExist(f"Spreadsheet not found: {error}")
+        self._db_registered_tables: list[str] = []
+        self._db_pending_tables: dict[str, list[str]] = {}
+        self._db_indexes: dict[str, TableIndex] = {}
+        self._db_refresh_task: asyncio.Task | None = None
+        self._db_read_futures: dict[str, asyncio.Future] = {}
+        self._db_read_stats = {
+            "requested": 0,
+            "deduplicated": 0,
+            "read": 0,
+            "requests": 0,
+        }
+        self._db_write_lock = asyncio.Lock()
+        self._db_write_event = asyncio.Event()
+        self._db_write_flusher: asyncio.Task | None = None
+        self._db_wal_path = write_ahead_log_path
+        self._db_wal_lock = asyncio.Lock()
+        self._db_replayed_writes: list[list[int | float | str | None]] = []
+        self._db_snapshot_path = cache_snapshot_path
+        self._db_snapshot_task: asyncio.Task | None = None
+        self._db_read_quota = TokenBucket(
+            constants.LEAGUE_DB_QUOTA_READS_PER_MINUTE, constants.LEAGUE_DB_QUOTA_BURST
+        )
+        self._db_write_quota = TokenBucket(
+            constants.LEAGUE_DB_QUOTA_WRITES_PER_MINUTE, constants.LEAGUE_DB_QUOTA_BURST
+        )
+        self._db_retry_count = 0
+        self._db_circuit = CircuitBreaker(constants.LEAGUE_DB_CIRCUIT_FAILURE_THRESHOLD)
+        self._db_circuit_listeners: list[Callable] = []
+        self._db_probe_task: asyncio.Task | None = None
+        self._db_history_tables: list[str] = []
+        self._db_history_buffer: dict[str, list[list[int | float | str | None]]] = {}
+        self._db_history_lock = asyncio.Lock()
+        self._db_history_event = asyncio.Event()
+        self._db_history_flusher: asyncio.Task | None = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=constants.LEAGUE_DB_THREAD_POOL_MAX_WORKERS,
+            thread_name_prefix="eml-db",
+        )
+        self._replay_write_ahead_log()
 
-    def create_table_worksheet(self, title: str) -> gspread.Worksheet:
-        """Create a new worksheet in the DB spreadsheet"""
-        try:
-            worksheet = self._db_spreadsheet.add_worksheet(
-                title,
-                rows=constants.LEAGUE_DB_SPREADSHEET_DEFAULT_ROWS,
-                cols=constants.LEAGUE_DB_SPREADSHEET_DEFAULT_COLS,
-            )
-            worksheet.format("A1:Z1", {"textFormat": {"bold": True}})
-            worksheet.freeze(rows=1)
-        except gspread.WorksheetNotFound as error:
-            raise DbErrors.EmlWorksheetCreateError(f"Worsheet not created: {error}")
-        return worksheet
-
-    def get_table_worksheet(self, table_name: str) -> gspread.Worksheet:
-        """Get a worksheet from the DB spreadsheet by title"""
+    async def run_blocking(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking call (e.g. a `gspread` request) in the DB thread pool"""
+        loop = asyncio.get_running_loop()
+        call = functools.partial(func, *args, **kwargs)
+        return await loop.run_in_executor(self._executor, call)
+
+    async def _call_backend(
+        self, quota: TokenBucket, requests: int, func: Callable, *args
+    ) -> Any:
+        """Call the backend within its quota, retrying 429 and 5xx responses
+
+        `requests` is the number of API requests the call makes (e.g. 2 to replace
+        a table). Retries wait `LEAGUE_DB_RETRY_BASE_DELAY_SECONDS * 2^attempt`
+        (up to `LEAGUE_DB_RETRY_MAX_DELAY_SECONDS`), with full jitter.
+        """
+        if self._db_pending_tables:
+            await self.ensure_tables()
+        attempt = 0
+        while True:
+            if not self._db_circuit.allows_requests():
+                self._db_circuit.refuse()
+                raise DbErrors.EmlDatabaseUnavailable(
+                    f"Database is unavailable (circuit {self._db_circuit.state})"
+                )
+            if self._backend.rate_limited:
+                await quota.acquire(requests)
+            try:
+                result = await self.run_blocking(func, *args)
+            except Exception as error:
+                status = self._backend.error_status(error)
+                retryable = status == 429 or (status is not None and status >= 500)
+                exhausted = attempt + 1 >= constants.LEAGUE_DB_RETRY_MAX_ATTEMPTS
+                if self._backend.is_outage(error) or (status == 429 and exhausted):
+                    previous_state = self._db_circuit.state
+                    state = self._db_circuit.record_failure(error)
+                    if state:
+                        await self._circuit_changed(state, previous_state, error)
+                    if not self._db_circuit.allows_requests():
+                        raise
+                if status == 403:
+                    logger.error(f"Backend permission denied (not retried): {error}")
+                if not retryable or exhausted:
+                    raise
+                delay = min(
+                    constants.LEAGUE_DB_RETRY_MAX_DELAY_SECONDS,
+                    constants.LEAGUE_DB_RETRY_BASE_DELAY_SECONDS * 2**attempt,
+                )
+                delay = random.uniform(0, delay)
+                attempt += 1
+                self._db_retry_count += 1
+                logger.warning(
+                    f"Backend responded {status}, retry {attempt} in {delay:.2f}s: {error}"
+                )
+                await asyncio.sleep(delay)
+            else:
+                previous_state = self._db_circuit.state
+                state = self._db_circuit.record_success()
+                if state:
+                    await self._circuit_changed(state, previous_state)
+                return result
+
+    def add_circuit_listener(self, listener: Callable) -> None:
+        """Add an async `listener(state, message)`, called when the circuit opens or closes"""
+        self._db_circuit_listeners.append(listener)
+
+    async def _circuit_changed(
+        self,
+        state: CircuitStates,
+        previous_state: CircuitStates,
+        error: Exception = None,
+    ) -> None:
+        """Start or stop degraded mode, and tell the circuit listeners"""
+        if state == CircuitStates.OPEN and previous_state == CircuitStates.CLOSED:
+            message = (
+                f"Database unavailable, running from the cache."
+                f" Writes are queued ({len(self._db_write_queue)} pending)."
+                f"\nLast error: {error}"
+            )
+            logger.error(message)
+            if not self._db_probe_task or self._db_probe_task.done():
+                self._db_probe_task = asyncio.create_task(
+                    self._probe_backend(), name="eml-db-circuit-probe"
+                )
+        elif state == CircuitStates.CLOSED:
+            message = (
+                f"Database available again, committing"
+                f" {len(self._db_write_queue)} queued write(s)."
+            )
+            logger.warning(message)
+            self.start_write_flusher()
+            self._db_write_event.set()
+            if self._db_history_buffer:
+                self.start_history_flusher()
+                self._db_history_event.set()
+        else:
+            return
+        for listener in self._db_circuit_listeners:
+            asyncio.create_task(
+                self._notify_circuit_listener(listener, state, message),
+                name="eml-db-circuit-listener",
+            )
+
+    async def _notify_circuit_listener(
+        self, listener: Callable, state: CircuitStates, message: str
+    ) -> None:
         try:
-            if table_name not in self._worksheets:
-                logger.info(f"[ 0 write, 1 read ] Getting Worksheet: {table_name}")
-                self._worksheets[table_name] = self._db_spreadsheet.worksheet(
-                    table_name
+            await listener(state, message)
+        except Exception as error:
+            logger.exception(f"Circuit listener failed: {error}")
+
+    async def _probe_backend(self) -> None:
+        """Ping the backend every interval, until the circuit closes again"""
+        while self._db_circuit.state != CircuitStates.CLOSED:
+            await asyncio.sleep(constants.LEAGUE_DB_CIRCUIT_PROBE_INTERVAL_SECONDS)
+            self._db_circuit.half_open()
+            try:
+                await self._call_backend(self._db_read_quota, 1, self._backend.ping)
+            except Exception as error:
+                if self._db_circuit.state == CircuitStates.HALF_OPEN:
+                    self._db_circuit.record_failure(error)
+                logger.warning(f"Database still unavailable: {error}")
+
+    def ensure_table(self, table_name: str, field_names: list[str]) -> None:
+        """Queue a table to create with a header row of `field_names`, if it does not exist
+
+        note: the queued tables are created together by `ensure_tables()`, or
+        right before the next backend request.
+        """
+        self._db_pending_tables[table_name] = list(field_names)
+
+    async def connect(self) -> None:
+        """Open the backend (e.g. the spreadsheet), within its quota and circuit"""
+        await self._call_backend(self._db_read_quota, 1, self._backend.connect)
+
+    async def ensure_tables(self) -> None:
+        """Create every queued table that does not exist, with as few requests as possible
+
+        note: this goes through `_call_backend()`, so it is retried, and refused
+        while the circuit is open.
+        """
+        tables, self._db_pending_tables = self._db_pending_tables, {}
+        if tables:
+            try:
+                # lists the tables, then creates the missing ones (if any) and lists again
+                await self._call_backend(
+                    self._db_read_quota, 2, self._create_tables, tables
                 )
-        except gspread.WorksheetNotFound as error:
-            raise DbErrors.EmlWorksheetDoesNotExist(f"Worksheet not found: {error}")
-        return self._worksheets[table_name]
+            except Exception:
+                # queued again, for the next backend request
+                self._db_pending_tables = {**tables, **self._db_pending_tables}
+                raise
+
+    def _create_tables(self, tables: dict[str, list[str]]) -> None:
+        """Create the tables that do not exist"""
+        try:
+            self._backend.ensure_tables(tables)
+        except DbErrors.EmlWorksheetCreateError as error:
+            message = f"Worksheets {', '.join(tables)} do not exist and could not be created: {error}"
+            raise DbErrors.EmlWorksheetDoesNotExist(message)
+
+    def register_table(
+        self, table_name: str, indexed_columns: list[int] = None
+    ) -> None:
+        """Register a table that is read through the cache (see `refresh_tables`)
+
+        Each registered table gets a record locator, and `indexed_columns` get a
+        hash index. Both are kept up to date with the cache (see `TableIndex`).
+        """
+        if table_name not in self._db_registered_tables:
+            self._db_registered_tables.append(table_name)
+        self._db_indexes[table_name] = TableIndex(indexed_columns or [])
+        self._index_table(table_name)
+
+    def _index_table(self, table_name: str) -> None:
+        """Rebuild the indexes of a table from its cached copy"""
+        if table_name in self._db_indexes and table_name in self._db_local_cache:
+            self._db_indexes[table_name].build(self._db_local_cache[table_name])
+
+    async def get_table_index(
+        self, table_name: str, table: list[list[int | float | str | None]]
+    ) -> TableIndex | None:
+        """Get the indexes of a table, if they index this copy of it"""
+        table_index = self._db_indexes.get(table_name)
+        if table_index and table_index.rows is table:
+            return table_index
+        return None
+
+    async def locate_row(
+        self,
+        table_name: str,
+        table: list[list[int | float | str | None]],
+        record_id: str,
+    ) -> int | None:
+        """Get the position of a record in a copy of a table (None if not found)"""
+        table_index = await self.get_table_index(table_name, table)
+        if table_index:
+            return table_index.locate(record_id)
+        # not indexed (e.g. an unregistered table), walk it
+        for position in range(1, len(table)):
+            if table[position] and table[position][0] == record_id:
+                return position
+        return None
+
+    async def _is_table_stale(self, table_name: str) -> bool:
+        """Check if a table is missing from the cache, or cached for too long"""
+        if table_name not in self._db_local_cache:
+            return True
+        if table_name not in self._db_cache_pull_times:
+            return True
+        cache_age = time.time() - self._db_cache_pull_times[table_name]
+        return cache_age > constants.LEAGUE_DB_CACHE_DURATION_SECONDS
 
     async def get_table_data(
         self, table_name: str
     ) -> list[list[int | float | str | None]]:
-        """Get all the data from a worksheet"""
-        # write any pending changes to the spreadsheet
-        await self.commit_all_writes()
-        # get the data from the worksheet if needed
+        """Get all the data from a worksheet
+
+        Reads are served from the local cache, which already includes any writes
+        that are still waiting in the write queue (stale-while-revalidate):
+        - Not cached: read the worksheet now
+        - Stale: return the cached copy now, and refresh it in the background
+        - Older than `LEAGUE_DB_CACHE_MAX_STALENESS_SECONDS`: read the worksheet now
+        Every other stale table is refreshed in the same request.
+        """
         is_cached = (
             table_name in self._db_local_cache
             and table_name in self._db_cache_pull_times
         )
-        is_stale = (
-            table_name in self._db_cache_pull_times
-            and (time.time() - self._db_cache_pull_times[table_name])
-            > constants.LEAGUE_DB_CACHE_DURATION_SECONDS
-        )
-        is_safe = len(self._db_write_queue) == 0
-        if not is_cached or (is_stale and is_safe):
-            logger.debug(f"[ 0 write, 1 read ] Getting Table: {table_name}")
-            try:
-                worksheet = self.get_table_worksheet(table_name)
-                table_data = worksheet.get_all_values()
-                self._db_local_cache[table_name] = table_data
-                self._db_cache_pull_times[table_name] = time.time()
-                logger.debug(f"DB Read cache updated for {table_name}")
-            except Exception as error:
-                logger.exception(
-                    f"Failed to update DB Read cache for {table_name}:\n{error}"
+        if is_cached and not self._db_circuit.allows_requests():
+            # degraded mode: the cache is all there is
+            return self._db_local_cache[table_name]
+        if not is_cached:
+            await self._refresh_stale_tables(table_name)
+        elif await self._is_table_stale(table_name):
+            cache_age = time.time() - self._db_cache_pull_times[table_name]
+            if cache_age > constants.LEAGUE_DB_CACHE_MAX_STALENESS_SECONDS:
+                await self._refresh_stale_tables(table_name)
+            elif not self._db_refresh_task or self._db_refresh_task.done():
+                self._db_refresh_task = asyncio.create_task(
+                    self._refresh_stale_tables(table_name),
+                    name="eml-db-cache-refresh",
                 )
+        if table_name not in self._db_local_cache:
+            raise DbErrors.EmlWorksheetReadError(f"Error reading table: {table_name}")
         return self._db_local_cache[table_name]
 
+    async def _refresh_stale_tables(self, table_name: str) -> None:
+        """Refresh a table, along with every other stale registered table"""
+        table_names = [table_name]
+        for other_table_name in self._db_registered_tables:
+            if other_table_name in table_names:
+                continue
+            if (
+                constants.LEAGUE_DB_CACHE_REFRESH_ALL_TABLES
+                or await self._is_table_stale(other_table_name)
+            ):
+                table_names.append(other_table_name)
+        await self.refresh_tables(table_names)
+
+    async def refresh_tables(self, table_names: list[str] = None) -> None:
+        """Commit pending writes, then read tables into the cache (single-flight)
+
+        With no `table_names`, every registered table is refreshed. A table that
+        is already being read is not read again, the caller waits for that read
+        instead. See `get_read_stats` for how many reads this saved.
+        """
+        if table_names is None:
+            table_names = list(self._db_registered_tables)
+        in_flight = []
+        table_names_to_read = []
+        for name in table_names:
+            self._db_read_stats["requested"] += 1
+            if name in self._db_read_futures:
+                self._db_read_stats["deduplicated"] += 1
+                if self._db_read_futures[name] not in in_flight:
+                    in_flight.append(self._db_read_futures[name])
+            else:
+                table_names_to_read.append(name)
+        if table_names_to_read:
+            read_future = asyncio.get_running_loop().create_future()
+            for name in table_names_to_read:
+                self._db_read_futures[name] = read_future
+            try:
+                # write any pending changes to the spreadsheet
+                await self.commit_all_writes()
+                self._db_read_stats["read"] += len(table_names_to_read)
+                self._db_read_stats["requests"] += 1
+                await self._read_tables(table_names_to_read)
+            finally:
+                for name in table_names_to_read:
+                    del self._db_read_futures[name]
+                read_future.set_result(None)
+        for read_future in in_flight:
+            await asyncio.shield(read_future)
+
+    async def _read_tables(self, table_names: list[str]) -> None:
+        """Read several tables into the cache with one backend request
+
+        All the tables are swapped into the cache together, and share one pull time.
+        """
+        if not table_names:
+            return
+        try:
+            # no commits while reading, so the backend sees a settled table
+            async with self._db_write_lock:
+                tables = await self._call_backend(
+                    self._db_read_quota, 1, self._backend.read_tables, table_names
+                )
+                pull_time = time.time()
+            # keep writes that were queued while the tables were being read
+            for queued_write in self._db_write_queue:
+                if queued_write[0] in tables:
+                    await self._apply_write_to_rows(
+                        tables[queued_write[0]], queued_write
+                    )
+            for name, table_data in tables.items():
+                self._db_local_cache[name] = table_data
+                self._db_cache_pull_times[name] = pull_time
+                self._index_table(name)
+            logger.debug(f"DB Read cache updated for {', '.join(table_names)}")
+        except DbErrors.EmlDatabaseUnavailable as error:
+            logger.warning(
+                f"DB Read cache not updated for {', '.join(table_names)}: {error}"
+            )
+        except Exception as error:
+            logger.exception(
+                f"Failed to update DB Read cache for {', '.join(table_names)}:\n{error}"
+            )
+
+    async def _apply_write_to_rows(
+        self,
+        rows: list[list[int | float | str | None]],
+        queued_write: list[int | float | str | None],
+    ) -> None:
+        """Apply a queued write operation to a list of rows (e.g. a fresh table read)
+
+        note: this is safe to repeat, a write that is already present is replaced.
+        """
+        operation = queued_write[1]
+        record_id = queued_write[2]
+        row_data = queued_write[2:]
+        for i, row in enumerate(rows):
+            if row and row[0] == record_id:
+                if operation == WriteOperations.DELETE:
+                    del rows[i]
+                else:
+                    rows[i] = row_data
+                return
+        if operation == WriteOperations.INSERT:
+            rows.append(row_data)
+
+    def _replay_write_ahead_log(self) -> None:
+        """Load writes that were queued, but never committed, from the write-ahead log"""
+        if not self._db_wal_path or not os.path.exists(self._db_wal_path):
+            return
+        with open(self._db_wal_path, "r", encoding="utf-8") as wal_file:
+            for line in wal_file:
+                try:
+                    queued_write = json.loads(line)
+                    queued_write[1] = WriteOperations(queued_write[1])
+                except (ValueError, IndexError, TypeError) as error:
+                    # e.g. the last line was cut short by a crash
+                    logger.warning(f"Skipped write-ahead log entry: {line!r} ({error})")
+                    continue
+                self._db_write_queue.append(queued_write)
+                self._db_replayed_writes.append(queued_write)
+        if self._db_replayed_writes:
+            logger.warning(
+                f"Replayed {len(self._db_replayed_writes)} write(s) from {self._db_wal_path}"
+            )
+
+    def _write_ahead_log_append(self, queued_write: list) -> None:
+        """Append a write to the write-ahead log, and flush it to disk"""
+        with open(self._db_wal_path, "a", encoding="utf-8") as wal_file:
+            wal_file.write(json.dumps(queued_write) + "\n")
+            wal_file.flush()
+            os.fsync(wal_file.fileno())
+
+    def _write_ahead_log_rewrite(self, queued_writes: list[list]) -> None:
+        """Replace the write-ahead log with the writes that are still queued"""
+        temp_path = f"{self._db_wal_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as wal_file:
+            for queued_write in queued_writes:
+                wal_file.write(json.dumps(queued_write) + "\n")
+            wal_file.flush()
+            os.fsync(wal_file.fileno())
+        os.replace(temp_path, self._db_wal_path)
+
+    async def _truncate_write_ahead_log(self) -> None:
+        """Drop committed writes from the write-ahead log"""
+        if not self._db_wal_path:
+            return
+        async with self._db_wal_lock:
+            try:
+                pending_writes = list(self._db_write_queue)
+                await self.run_blocking(self._write_ahead_log_rewrite, pending_writes)
+            except OSError as error:
+                logger.exception(f"Failed to truncate write-ahead log: {error}")
+
+    async def _discard_committed_replays(self) -> None:
+        """Drop replayed INSERTs whose record_id is already in the backend
+
+        These were committed before the restart, but the log was not truncated yet.
+        UPDATE and DELETE are safe to repeat, so they are kept.
+        """
+        replayed_inserts = [
+            queued_write
+            for queued_write in self._db_replayed_writes
+            if queued_write[1] == WriteOperations.INSERT
+        ]
+        committed = []
+        for table_name in {queued_write[0] for queued_write in replayed_inserts}:
+            record_ids = set(
+                await self._call_backend(
+                    self._db_read_quota, 1, self._backend.get_record_ids, table_name
+                )
+            )
+            committed += [
+                queued_write
+                for queued_write in replayed_inserts
+                if queued_write[0] == table_name and queued_write[2] in record_ids
+            ]
+        self._db_replayed_writes = []
+        if committed:
+            logger.warning(
+                f"Dropped {len(committed)} replayed, already committed write(s)"
+            )
+        await self._remove_committed_writes(committed)
+
+    def _read_cache_snapshot(
+        self,
+    ) -> dict[str, tuple[float, list[list[int | float | str | None]]]]:
+        """Read the (pull time, rows) of every table in the cache snapshot file"""
+        connection = sqlite3.connect(self._db_snapshot_path)
+        try:
+            cursor = connection.execute(
+                "SELECT table_name, pull_time, rows FROM cache_snapshot"
+            )
+            return {
+                table_name: (pull_time, json.loads(rows))
+                for table_name, pull_time, rows in cursor.fetchall()
+            }
+        finally:
+            connection.close()
+
+    def _write_cache_snapshot(self, tables: list[tuple[str, float, str]]) -> None:
+        """Replace the cache snapshot file with (table name, pull time, JSON rows)"""
+        connection = sqlite3.connect(self._db_snapshot_path)
+        try:
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS cache_snapshot"
+                    " (table_name TEXT PRIMARY KEY, pull_time REAL, rows TEXT)"
+                )
+                connection.execute("DELETE FROM cache_snapshot")
+                connection.executemany(
+                    "INSERT INTO cache_snapshot VALUES (?, ?, ?)", tables
+                )
+        finally:
+            connection.close()
+
+    async def load_cache_snapshot(self) -> list[str]:
+        """Load the cache snapshot (if any), and read its tables again in the background
+
+        The snapshot is only used for tables that are not cached yet. Writes that
+        are still queued (e.g. replayed from the write-ahead log) are applied to
+        it. Returns the tables that were loaded.
+        """
+        if not self._db_snapshot_path or not os.path.exists(self._db_snapshot_path):
+            return []
+        try:
+            snapshot = await self.run_blocking(self._read_cache_snapshot)
+        except (sqlite3.Error, ValueError) as error:
+            logger.warning(f"Cache snapshot not loaded: {error}")
+            return []
+        # stale, but not too stale to serve (see `get_table_data`)
+        pull_time = time.time() - constants.LEAGUE_DB_CACHE_DURATION_SECONDS
+        loaded = []
+        for table_name, (snapshot_time, rows) in snapshot.items():
+            if table_name in self._db_local_cache or not rows:
+                continue
+            for queued_write in self._db_write_queue:
+                if queued_write[0] == table_name:
+                    await self._apply_write_to_rows(rows, queued_write)
+            self._db_local_cache[table_name] = rows
+            self._db_cache_pull_times[table_name] = min(snapshot_time, pull_time)
+            self._index_table(table_name)
+            loaded.append(table_name)
+        if loaded:
+            logger.info(f"Loaded {len(loaded)} table(s) from the cache snapshot")
+            if not self._db_refresh_task or self._db_refresh_task.done():
+                self._db_refresh_task = asyncio.create_task(
+                    self.refresh_tables(loaded), name="eml-db-cache-refresh"
+                )
+        self.start_snapshot_saver()
+        return loaded
+
+    async def save_cache_snapshot(self) -> None:
+        """Save the cached tables, and their pull times, to the cache snapshot file"""
+        if not self._db_snapshot_path:
+            return
+        # serialized here, so the rows do not change while they are written
+        tables = [
+            (table_name, self._db_cache_pull_times[table_name], json.dumps(rows))
+            for table_name, rows in self._db_local_cache.items()
+            if table_name in self._db_cache_pull_times
+        ]
+        try:
+            await self.run_blocking(self._write_cache_snapshot, tables)
+            logger.debug(f"Saved {len(tables)} table(s) to the cache snapshot")
+        except sqlite3.Error as error:
+            logger.exception(f"Failed to save the cache snapshot: {error}")
+
+    def start_snapshot_saver(self) -> None:
+        """Start the background task that saves the cache snapshot (if not running)"""
+        if not self._db_snapshot_path:
+            return
+        if self._db_snapshot_task and not self._db_snapshot_task.done():
+            return
+        self._db_snapshot_task = asyncio.create_task(
+            self._snapshot_saver(), name="eml-db-cache-snapshot"
+        )
+
+    async def _snapshot_saver(self) -> None:
+        """Save the cache snapshot every interval"""
+        while True:
+            await asyncio.sleep(constants.LEAGUE_DB_CACHE_SNAPSHOT_INTERVAL_SECONDS)
+            await self.save_cache_snapshot()
+
+    async def _queue_write(self, queued_write: list[int | float | str | None]) -> None:
+        """Add a write operation to the queue, for the write flusher to commit
+
+        Raises `EmlWriteAheadLogError` (and queues nothing) if the write could not
+        be appended to the write-ahead log, so it is never acknowledged.
+        """
+        if self._db_wal_path:
+            async with self._db_wal_lock:
+                try:
+                    await self.run_blocking(self._write_ahead_log_append, queued_write)
+                except OSError as error:
+                    logger.exception(f"Failed to write to write-ahead log: {error}")
+                    raise DbErrors.EmlWriteAheadLogError(
+                        f"Write not saved, the write-ahead log failed: {error}"
+                    )
+                self._db_write_queue.append(queued_write)
+        else:
+            self._db_write_queue.append(queued_write)
+
+    async def _commit_queue_if_full(self) -> None:
+        """Wake the write flusher once the queue is long enough, and wait if it is full"""
+        self.start_write_flusher()
+        queue_length = len(self._db_write_queue)
+        if queue_length >= constants.LEAGUE_DB_QUEUE_FLUSH_THRESHOLD:
+            self._db_write_event.set()
+        if queue_length >= constants.LEAGUE_DB_QUEUE_MAX_LENGTH:
+            # Backpressure: make the writer wait until the queue has drained
+            logger.warning(f"DB Write Queue full ({queue_length}), committing now")
+            await self.commit_all_writes()
+
     async def append_row(
         self, table_name: str, row_data: list[int | float | str | None]
     ) -> None:
         """Insert a record into a worksheet"""
-        # Add the write operation to the queue
+        # Add the write operation to the queue (first, so a failed write changes nothing)
         queued_write = [table_name, WriteOperations.INSERT] + row_data
-        self._db_write_queue.append(queued_write)
+        await self._queue_write(queued_write)
         # Update the local cache
         if table_name in self._db_local_cache:
-            self._db_local_cache[table_name] += [row_data]
-        # write any pending changes to the spreadsheet
-        await self.commit_all_writes()
+            table = self._db_local_cache[table_name]
+            table += [row_data]
+            table_index = await self.get_table_index(table_name, table)
+            if table_index:
+                table_index.add_row(row_data)
+        await self._commit_queue_if_full()
 
     async def update_row(
         self, table_name: str, row_data: list[int | float | str | None]
     ) -> None:
         """Update a record in a worksheet"""
-        # Add the write operation to the queue
+        # Add the write operation to the queue (first, so a failed write changes nothing)
         queued_write = [table_name, WriteOperations.UPDATE] + row_data
-        self._db_write_queue.append(queued_write)
+        await self._queue_write(queued_write)
         # Update the local cache
-        id = row_data[0]
         if table_name in self._db_local_cache:
-            for i, row in enumerate(self._db_local_cache[table_name]):
-                if row[0] == id:
-                    self._db_local_cache[table_name][i] = row_data
-                    break
-        # write any pending changes to the spreadsheet
-        await self.commit_all_writes()
+            table = self._db_local_cache[table_name]
+            position = await self.locate_row(table_name, table, row_data[0])
+            if position is not None:
+                table_index = await self.get_table_index(table_name, table)
+                if table_index:
+                    table_index.update_row(table[position], row_data)
+                table[position] = row_data
+        await self._commit_queue_if_full()
 
     async def delete_row(self, table_name: str, record_id: str) -> None:
         """Delete a record from a worksheet"""
-        # Add the write operation to the write queue
+        # Add the write operation to the queue (first, so a failed write changes nothing)
         queued_write = [table_name, WriteOperations.DELETE, record_id]
-        self._db_write_queue.append(queued_write)
+        await self._queue_write(queued_write)
         # Update the local cache
         if table_name in self._db_local_cache:
-            for i, row in enumerate(self._db_local_cache[table_name]):
-                if row[0] == record_id:
-                    del self._db_local_cache[table_name][i]
-                    break
-        # write any pending changes to the spreadsheet
-        await self.commit_all_writes()
+            table = self._db_local_cache[table_name]
+            position = await self.locate_row(table_name, table, record_id)
+            if position is not None:
+                table_index = await self.get_table_index(table_name, table)
+                row = table.pop(position)
+                if table_index:
+                    table_index.delete_row(row)
+        await self._commit_queue_if_full()
+
+    async def append_history_row(
+        self, table_name: str, row_data: list[int | float | str | None]
+    ) -> None:
+        """Buffer a row for a history table, it is appended by the history flusher"""
+        self._db_history_buffer.setdefault(table_name, []).append(row_data)
+        self._trim_history_buffer(table_name)
+        self.start_history_flusher()
+        buffered_rows = sum(len(rows) for rows in self._db_history_buffer.values())
+        if buffered_rows >= constants.LEAGUE_DB_HISTORY_FLUSH_THRESHOLD:
+            self._db_history_event.set()
+
+    def _trim_history_buffer(self, table_name: str) -> None:
+        """Drop the oldest buffered rows of a history table past the buffer limit"""
+        rows = self._db_history_buffer[table_name]
+        overflow = len(rows) - constants.LEAGUE_DB_HISTORY_BUFFER_MAX_ROWS
+        if overflow > 0:
+            dropped = rows[:overflow]
+            del rows[:overflow]
+            logger.error(
+                f"History buffer full, dropped {overflow} row(s) of {table_name}: {dropped}"
+            )
+
+    def register_history_table(self, table_name: str) -> None:
+        """Register a history table (see `append_history_row`), e.g. for archival"""
+        if table_name not in self._db_history_tables:
+            self._db_history_tables.append(table_name)
+
+    async def get_history_tables(self) -> list[str]:
+        """Get the registered history tables"""
+        return list(self._db_history_tables)
+
+    async def commit_history_rows(self) -> None:
+        """Append the buffered history rows, with one request per history table"""
+        async with self._db_history_lock:
+            await self._append_history_buffer()
+
+    async def _append_history_buffer(self) -> None:
+        """Append the buffered history rows (the history lock must be held)
+
+        Rows that could not be appended go back to the front of the buffer.
+        """
+        if not self._db_history_buffer or not self._db_circuit.allows_requests():
+            return
+        for table_name in list(self._db_history_buffer):
+            rows = self._db_history_buffer.pop(table_name)
+            try:
+                await self._call_backend(
+                    self._db_write_quota, 1, self._backend.append_rows, table_name, rows
+                )
+            except Exception as error:
+                self._db_history_buffer[table_name] = (
+                    rows + self._db_history_buffer.get(table_name, [])
+                )
+                self._trim_history_buffer(table_name)
+                if isinstance(error, DbErrors.EmlDatabaseUnavailable):
+                    logger.warning(f"History rows kept in the buffer: {error}")
+                else:
+                    logger.exception(f"Failed to append history rows: {error}")
+                return
+
+    @contextlib.asynccontextmanager
+    async def hold_history_rows(self):
+        """Append the buffered history rows, then hold new ones back until exit
+
+        e.g. while history tables are read and trimmed, so no row is appended
+        between the read and the trim.
+        """
+        async with self._db_history_lock:
+            await self._append_history_buffer()
+            yield
+
+    async def read_uncached_tables(
+        self, table_names: list[str]
+    ) -> dict[str, list[list[int | float | str | None]]]:
+        """Read tables with one backend request, without caching them (e.g. history)"""
+        return await self._call_backend(
+            self._db_read_quota, 1, self._backend.read_tables, table_names
+        )
+
+    async def read_uncached_columns(
+        self, table_names: list[str], column: int
+    ) -> dict[str, list[int | float | str | None]]:
+        """Read one column of several tables with one backend request, without caching"""
+        return await self._call_backend(
+            self._db_read_quota, 1, self._backend.read_columns, table_names, column
+        )
+
+    async def read_uncached_first_rows(
+        self, table_name: str, row_count: int
+    ) -> list[list[int | float | str | None]]:
+        """Read the first `row_count` rows of a table (header included), without caching"""
+        return await self._call_backend(
+            self._db_read_quota, 1, self._backend.read_first_rows, table_name, row_count
+        )
+
+    async def index_rows(self, targets: list[tuple[str, str]]) -> None:
+        """Let the backend find the rows to update or delete, by (table_name, record_id)
+
+        note: only tables the backend does not know the target rows of are read,
+        with one request (see `StorageBackend.get_unindexed_tables`).
+        """
+        table_names = self._backend.get_unindexed_tables(targets)
+        if table_names:
+            await self._call_backend(
+                self._db_read_quota, 1, self._backend.index_tables, table_names
+            )
+
+    async def delete_uncached_rows(
+        self, deletes: list[tuple[str, str]]
+    ) -> set[tuple[str, str]]:
+        """Delete rows of uncached tables now, with one backend request
+
+        note: this is not queued, use `delete_row` for the tables in the cache.
+        Returns the (table_name, record_id) of the rows that were not found.
+        """
+        await self.index_rows(deletes)
+        return await self._call_backend(
+            self._db_write_quota, 1, self._backend.delete_rows, deletes
+        )
+
+    async def write_uncached(self, requests: int, func: Callable, *args) -> Any:
+        """Make `requests` write requests of your own to the backend (e.g. replication)
+
+        note: `func` is called with `args`, within the write quota and circuit,
+        and retried like the queued writes.
+        """
+        return await self._call_backend(self._db_write_quota, requests, func, *args)
+
+    async def get_table_sizes(self, table_names: list[str]) -> dict[str, int]:
+        """Get the number of cells each table takes up in the backend"""
+        return await self._call_backend(
+            self._db_read_quota, 1, self._backend.get_table_sizes, table_names
+        )
+
+    def start_history_flusher(self) -> None:
+        """Start the background task that appends history rows (if not running)"""
+        if self._db_history_flusher and not self._db_history_flusher.done():
+            return
+        self._db_history_flusher = asyncio.create_task(
+            self._history_flusher(), name="eml-db-history-flusher"
+        )
+
+    async def _history_flusher(self) -> None:
+        """Append the history rows every interval, or sooner once there are enough"""
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._db_history_event.wait(),
+                    timeout=constants.LEAGUE_DB_HISTORY_FLUSH_INTERVAL_SECONDS,
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._db_history_event.clear()
+            if self._db_history_buffer:
+                await self.commit_history_rows()
 
     async def commit_next_write(
         self,
@@ -151,31 +925,268 @@ class CoreDatabase:
         operation = write[1]
         record_id = write[2]
         row_data = write[2:]
-        worksheet = self.get_table_worksheet(table_name)
+        missing = set()
         if operation == WriteOperations.INSERT:
-            logger.debug(f"[ 1 write, 0 read ] INSERT in {worksheet.title}")
-            worksheet.append_row(row_data, table_range="A1")
+            await self._call_backend(
+                self._db_write_quota,
+                1,
+                self._backend.append_rows,
+                table_name,
+                [row_data],
+            )
         elif operation == WriteOperations.UPDATE:
-            logger.debug(f"[ 1 write, 1 read ] UPDATE in {worksheet.title}")
-            cell = worksheet.find(record_id, in_column=1)
-            worksheet.update(f"A{cell.row}", [row_data])
+            await self.index_rows([(table_name, record_id)])
+            missing = await self._call_backend(
+                self._db_write_quota,
+                1,
+                self._backend.update_rows,
+                [(table_name, row_data)],
+            )
         elif operation == WriteOperations.DELETE:
-            logger.debug(f"[ 1 write, 1 read ] DELETE in {worksheet.title}")
-            cell = worksheet.find(record_id, in_column=1)
-            worksheet.delete_rows(cell.row)
+            await self.index_rows([(table_name, record_id)])
+            missing = await self._call_backend(
+                self._db_write_quota,
+                1,
+                self._backend.delete_rows,
+                [(table_name, record_id)],
+            )
         self._db_write_queue.pop(0)
+        if missing:
+            raise ValueError(f"Write operation discarded for missing record: {write}")
+
+    async def _next_write_batch(self) -> list[list[int | float | str | None]]:
+        """Get the longest run of queued writes that is safe to commit as a batch
+
+        A batch commits all of its INSERTs first, then UPDATEs, then DELETEs. That
+        is only equivalent to the queue order as long as nothing is written to a
+        record after it was deleted, so the batch stops right before that happens.
+        """
+        batch = []
+        deleted_records = set()
+        for queued_write in self._db_write_queue:
+            record_key = (queued_write[0], queued_write[2])
+            if record_key in deleted_records:
+                break
+            if queued_write[1] == WriteOperations.DELETE:
+                deleted_records.add(record_key)
+            batch.append(queued_write)
+        return batch
+
+    async def _remove_committed_writes(
+        self, committed_writes: list[list[int | float | str | None]]
+    ) -> None:
+        """Remove committed (or discarded) write operations from the queue"""
+        committed_ids = {id(queued_write) for queued_write in committed_writes}
+        self._db_write_queue[:] = [
+            queued_write
+            for queued_write in self._db_write_queue
+            if id(queued_write) not in committed_ids
+        ]
+
+    async def _coalesce_writes(
+        self, batch: list[list[int | float | str | None]]
+    ) -> list[tuple[list[int | float | str | None], list[list]]]:
+        """Merge the writes of a batch that target the same record
+
+        - UPDATE, UPDATE: the last UPDATE
+        - INSERT, UPDATE: the INSERT, with the data of the UPDATE
+        - UPDATE, DELETE: the DELETE
+        - INSERT, DELETE: nothing at all
+
+        Returns (merged write, queued writes it replaces) pairs, in queue order.
+        Writes to different records (e.g. History rows) are never merged.
+        """
+        merged: dict[tuple[str, str], tuple[list | None, list[list]]] = {}
+        for queued_write in batch:
+            record_key = (queued_write[0], queued_write[2])
+            previous_write, sources = merged.get(record_key, (None, []))
+            operation = queued_write[1]
+            write = queued_write
+            if previous_write and previous_write[1] == WriteOperations.INSERT:
+                if operation == WriteOperations.UPDATE:
+                    write = previous_write[:2] + queued_write[2:]
+                elif operation == WriteOperations.DELETE:
+                    write = None
+            merged[record_key] = (write, sources + [queued_write])
+        return [(write, sources) for write, sources in merged.values()]
+
+    async def commit_batch_writes(self) -> None:
+        """Commit a batch of write operations using as few requests as possible
+
+        - INSERT: one `append_rows` per table
+        - UPDATE: one `update_rows` for all tables
+        - DELETE: one `delete_rows` for all tables
+        - Several writes to one record are merged first (see `_coalesce_writes`)
+
+        Each step is removed from the queue as soon as it is committed, so a failed
+        step is retried later without repeating the steps before it.
+        """
+        discarded = [write for write in self._db_write_queue if len(write) < 3]
+        for queued_write in discarded:
+            logger.error(f"Write operation discarded for missing data: {queued_write}")
+        await self._remove_committed_writes(discarded)
+        batch = await self._next_write_batch()
+        inserts: dict[str, list[list[int | float | str | None]]] = {}
+        updates: list[list[int | float | str | None]] = []
+        deletes: list[list[int | float | str | None]] = []
+        sources: dict[int, list[list[int | float | str | None]]] = {}
+
+        def sources_of(writes: list[list[int | float | str | None]]) -> list[list]:
+            return [source for write in writes for source in sources[id(write)]]
+
+        for queued_write, merged_writes in await self._coalesce_writes(batch):
+            if queued_write is None:
+                # nothing left to write (e.g. INSERT followed by DELETE)
+                await self._remove_committed_writes(merged_writes)
+                continue
+            sources[id(queued_write)] = merged_writes
+            if queued_write[1] == WriteOperations.INSERT:
+                inserts.setdefault(queued_write[0], []).append(queued_write)
+            elif queued_write[1] == WriteOperations.UPDATE:
+                updates.append(queued_write)
+            elif queued_write[1] == WriteOperations.DELETE:
+                deletes.append(queued_write)
+        # INSERT
+        for table_name, table_inserts in inserts.items():
+            rows = [queued_write[2:] for queued_write in table_inserts]
+            await self._call_backend(
+                self._db_write_quota, 1, self._backend.append_rows, table_name, rows
+            )
+            await self._remove_committed_writes(sources_of(table_inserts))
+        # UPDATE and DELETE, after one read of the rows they cannot find (if any)
+        targets = [(queued_write[0], queued_write[2]) for queued_write in updates]
+        targets += [(queued_write[0], queued_write[2]) for queued_write in deletes]
+        if targets:
+            await self.index_rows(targets)
+        if updates:
+            missing = await self._call_backend(
+                self._db_write_quota,
+                1,
+                self._backend.update_rows,
+                [(queued_write[0], queued_write[2:]) for queued_write in updates],
+            )
+            await self._discard_missing_records(updates, missing)
+            await self._remove_committed_writes(sources_of(updates))
+        if deletes:
+            missing = await self._call_backend(
+                self._db_write_quota,
+                1,
+                self._backend.delete_rows,
+                [(queued_write[0], queued_write[2]) for queued_write in deletes],
+            )
+            await self._discard_missing_records(deletes, missing)
+            await self._remove_committed_writes(sources_of(deletes))
+
+    async def _discard_missing_records(
+        self,
+        writes: list[list[int | float | str | None]],
+        missing: set[tuple[str, str]],
+    ) -> None:
+        """Log the writes that were dropped, because their record was not found"""
+        for queued_write in writes:
+            if (queued_write[0], queued_write[2]) in missing:
+                logger.error(
+                    f"Write operation discarded for missing record: {queued_write}"
+                )
 
     async def commit_all_writes(self) -> None:
-        """Commit the write queue to the database"""
-        try:
-            while len(self._db_write_queue) > 0:
-                await self.commit_next_write()
-                time.sleep(constants.LEAGUE_DB_QUEUE_WRITE_DELAY_SECONDS)
-        except Exception as error:
-            logger.exception(f"Failed to commit write: {error}")
-        finally:
-            if len(self._db_write_queue) > 0:
-                logger.warn(f"DB Write Queue Length: {len(self._db_write_queue)}")
+        """Commit the write queue to the database
+
+        Only one commit runs at a time, since the queue is committed from the front.
+        Callers that arrive while a commit is running wait for it, and then commit
+        anything that was queued in the meantime.
+        """
+        async with self._db_write_lock:
+            if not self._db_write_queue or not self._db_circuit.allows_requests():
+                return
+            try:
+                if self._db_replayed_writes:
+                    await self._discard_committed_replays()
+                while len(self._db_write_queue) > 0:
+                    if constants.LEAGUE_DB_QUEUE_BATCH_WRITES:
+                        await self.commit_batch_writes()
+                    else:
+                        await self.commit_next_write()
+                    await asyncio.sleep(constants.LEAGUE_DB_QUEUE_WRITE_DELAY_SECONDS)
+            except DbErrors.EmlDatabaseUnavailable as error:
+                logger.warning(f"Writes kept in the queue: {error}")
+            except Exception as error:
+                logger.exception(f"Failed to commit write: {error}")
+            finally:
+                await self._truncate_write_ahead_log()
+                if len(self._db_write_queue) > 0:
+                    logger.warn(f"DB Write Queue Length: {len(self._db_write_queue)}")
+
+    def start_write_flusher(self) -> None:
+        """Start the background task that commits the write queue (if not running)
+
+        note: this needs a running event loop, it is called on the first queued write.
+        """
+        if self._db_write_flusher and not self._db_write_flusher.done():
+            return
+        self._db_write_flusher = asyncio.create_task(
+            self._write_flusher(), name="eml-db-write-flusher"
+        )
+
+    async def _write_flusher(self) -> None:
+        """Commit the write queue every interval, or sooner once it is long enough"""
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._db_write_event.wait(),
+                    timeout=constants.LEAGUE_DB_QUEUE_FLUSH_INTERVAL_SECONDS,
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._db_write_event.clear()
+            if self._db_write_queue:
+                await self.commit_all_writes()
+
+    async def close(self) -> None:
+        """Stop background tasks, commit the write queue, and save the cache snapshot"""
+        if self._db_write_flusher:
+            self._db_write_flusher.cancel()
+            self._db_write_flusher = None
+        if self._db_refresh_task:
+            self._db_refresh_task.cancel()
+            self._db_refresh_task = None
+        if self._db_probe_task:
+            self._db_probe_task.cancel()
+            self._db_probe_task = None
+        if self._db_history_flusher:
+            self._db_history_flusher.cancel()
+            self._db_history_flusher = None
+        if self._db_snapshot_task:
+            self._db_snapshot_task.cancel()
+            self._db_snapshot_task = None
+        await self.commit_all_writes()
+        await self.commit_history_rows()
+        await self.save_cache_snapshot()
+        await self.run_blocking(self._backend.close)
+
+    async def replace_table(
+        self, table_name: str, rows: list[list[int | float | str | None]]
+    ) -> None:
+        """Replace every row of a table (header row included), e.g. a view
+
+        note: this is not queued, it is written to the backend right away. While
+        the database is unavailable only the cache is replaced.
+        """
+        async with self._db_write_lock:
+            try:
+                await self._call_backend(
+                    self._db_write_quota,
+                    2,
+                    self._backend.replace_table,
+                    table_name,
+                    rows,
+                )
+            except DbErrors.EmlDatabaseUnavailable as error:
+                logger.warning(f"{table_name} not replaced in the backend: {error}")
+            if table_name in self._db_local_cache:
+                self._db_local_cache[table_name] = [list(row) for row in rows]
+                self._db_cache_pull_times[table_name] = time.time()
+                self._index_table(table_name)
 
     async def get_pending_writes(
         self,
@@ -183,6 +1194,36 @@ class CoreDatabase:
         """Get all pending write operations"""
         return self._db_write_queue
 
+    async def get_history_buffer_lengths(self) -> dict[str, int]:
+        """Get the number of history rows waiting to be appended, per table"""
+        return {
+            table_name: len(rows)
+            for table_name, rows in self._db_history_buffer.items()
+        }
+
+    async def get_registered_tables(self) -> list[str]:
+        """Get the tables that are read through the cache"""
+        return list(self._db_registered_tables)
+
+    async def get_backend_status(self) -> dict:
+        """Get the state of the storage backend (e.g. replication lag, circuit)"""
+        status = await self.run_blocking(self._backend.get_status)
+        status["circuit"] = self._db_circuit.get_status()
+        return status
+
+    async def get_quota_status(self) -> dict:
+        """Get the read and write quota left this minute, and the retry count"""
+        return {
+            "rate_limited": self._backend.rate_limited,
+            "reads": self._db_read_quota.get_status(),
+            "writes": self._db_write_quota.get_status(),
+            "retries": self._db_retry_count,
+        }
+
+    async def get_read_stats(self) -> dict[str, int]:
+        """Get counters of table reads (requested, deduplicated, read, requests)"""
+        return self._db_read_stats
+
     async def get_cache_times(
         self,
     ) -> dict[str, float]:
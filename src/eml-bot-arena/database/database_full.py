@@ -38,4 +38,4 @@ class FullDatabase:
         self.table_team_player = TeamPlayerTable(core_database)
         self.table_vw_roster = VwRosterTable(core_database)
         self.table_constants = ConstantsTable(core_database)
-
+        # note: the missing tables are created together by `ensure_tables()`
@@ -0,0 +1,141 @@
+from database.backend_mirrored import MirroredSqliteBackend
+from database.database_core import CoreDatabase
+from database.enums import WriteOperations
+import asyncio
+import constants
+import errors.database_errors as DbErrors
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseReplicator:
+    """Background worker that keeps the mirror of a `MirroredSqliteBackend` in sync
+
+    - Every `LEAGUE_DB_REPLICATION_INTERVAL_SECONDS`: send up to
+      `LEAGUE_DB_REPLICATION_BATCH_SIZE` changes to the mirror (rate limit)
+    - Every `LEAGUE_DB_REPLICATION_IMPORT_INTERVAL_SECONDS`: pull hand edits from
+      the mirror back into SQLite, and refresh the cache of the tables that changed
+
+    Both steps run in the same task, so an import never overlaps a replication.
+    The mirror tables are created by that task too. Every request to the mirror
+    goes through a `CoreDatabase` of its own, so it is made within the quota of
+    the mirror, retried, and refused while its circuit is open. While the
+    mirror is down (or over its quota), the task waits twice as long after each
+    failure, up to `LEAGUE_DB_REPLICATION_MAX_BACKOFF_SECONDS`.
+    """
+
+    def __init__(self, core_database: CoreDatabase, backend: MirroredSqliteBackend):
+        self._db = core_database
+        self._backend = backend
+        self._mirror_db = CoreDatabase(backend.mirror)
+        self._task: asyncio.Task | None = None
+        self._last_import = 0.0
+
+    def start(self) -> None:
+        """Start the replication task (if not running)"""
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._replicate(), name="eml-db-replicator")
+
+    async def _replicate(self) -> None:
+        """Replicate changes, and import hand edits, until cancelled"""
+        failures = 0
+        while True:
+            delay = constants.LEAGUE_DB_REPLICATION_INTERVAL_SECONDS
+            try:
+                await self.ensure_mirror_tables()
+                await self.replicate_changes()
+                import_age = time.time() - self._last_import
+                if import_age > constants.LEAGUE_DB_REPLICATION_IMPORT_INTERVAL_SECONDS:
+                    await self.import_changes()
+            except Exception as error:
+                failures += 1
+                delay = min(
+                    constants.LEAGUE_DB_REPLICATION_MAX_BACKOFF_SECONDS,
+                    delay * 2**failures,
+                )
+                if self.is_mirror_unavailable(error):
+                    logger.warning(
+                        f"Mirror unavailable ({failures} failure(s)), retrying in {delay}s: {error}"
+                    )
+                else:
+                    logger.exception(
+                        f"Failed to replicate the database, retrying in {delay}s: {error}"
+                    )
+            else:
+                if failures:
+                    logger.warning(
+                        f"Mirror available again after {failures} failure(s)"
+                    )
+                failures = 0
+            await asyncio.sleep(delay)
+
+    def is_mirror_unavailable(self, error: Exception) -> bool:
+        """Check if an error means the mirror is down, or over its quota"""
+        if isinstance(error, DbErrors.EmlDatabaseUnavailable):
+            return True
+        return self._backend.is_mirror_unavailable(error)
+
+    async def ensure_mirror_tables(self) -> None:
+        """Create the missing tables of the mirror (all at once)"""
+        tables = self._backend.get_mirror_pending_tables()
+        if not tables:
+            return
+        for table_name, field_names in tables.items():
+            self._mirror_db.ensure_table(table_name, field_names)
+        # queued again by `ensure_tables()` if it fails
+        await self._mirror_db.ensure_tables()
+        self._backend.remove_mirror_pending_tables(list(tables))
+
+    async def replicate_changes(self) -> int:
+        """Send one batch of changes to the mirror, one request per run of changes"""
+        runs = await self._db.run_blocking(
+            self._backend.get_change_runs,
+            constants.LEAGUE_DB_REPLICATION_BATCH_SIZE,
+        )
+        count = 0
+        for run in runs:
+            operation = run[0][2]
+            if operation in (WriteOperations.UPDATE, WriteOperations.DELETE):
+                targets = [(change[1], change[3]) for change in run]
+                await self._mirror_db.index_rows(targets)
+            # a REPLACE clears the worksheet, then writes it
+            requests = 2 if operation == WriteOperations.REPLACE else 1
+            await self._mirror_db.write_uncached(
+                requests, self._backend.send_change_run, run
+            )
+            count += len(run)
+        if count:
+            status = await self._db.run_blocking(self._backend.get_status)
+            logger.debug(
+                f"Replicated {count} change(s), lag {status['last_lag_seconds']}s"
+            )
+        return count
+
+    async def import_changes(self) -> dict[str, int]:
+        """Pull hand edits from the mirror into SQLite, and the cache"""
+        self._last_import = time.time()
+        table_names = await self._db.get_registered_tables()
+        mirror_tables = await self._mirror_db.read_uncached_tables(table_names)
+        changed = await self._db.run_blocking(
+            self._backend.import_changes, mirror_tables
+        )
+        if changed:
+            logger.info(f"Imported hand edits from the mirror: {changed}")
+            await self._db.refresh_tables(list(changed))
+        return changed
+
+    async def close(self) -> None:
+        """Stop the replication task, after sending one last batch"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        try:
+            await self.ensure_mirror_tables()
+            await self.replicate_changes()
+        except Exception as error:
+            # the changelog is kept in SQLite, it is sent on the next start
+            logger.warning(f"Changes left unreplicated on close: {error}")
+        await self._mirror_db.close()
@@ -0,0 +1,84 @@
+from contextvars import ContextVar
+from database.fields import BaseFields
+from database.records import BaseRecord
+from typing import Type
+import logging
+
+logger = logging.getLogger(__name__)
+
+"""
+Database Session
+"""
+
+_current_session: ContextVar["DatabaseSession | None"] = ContextVar(
+    "eml_database_session", default=None
+)
+
+
+class DatabaseSession:
+    """A unit of work for one interaction (e.g. one command)
+
+    The first read of a table pins it for the rest of the interaction, so each
+    table is fetched (and checked for staleness) at most once per command.
+    Records are handed out from an identity map, so the same record_id always
+    gives the same record instance.
+
+    note: the pinned table is the live list of the cache, not a copy, so that
+    the `TableIndex` of the cache still applies to it (see `TableQuery`). Writes
+    made by other tasks during the interaction show up in it.
+
+    Open a session at the start of an interaction with `DatabaseSession.open()`.
+    The session lives in a `ContextVar`, so it follows the interaction's task
+    and is gone when the task ends.
+    """
+
+    def __init__(self):
+        self._tables: dict[str, list[list[int | float | str | None]]] = {}
+        self._records: dict[str, dict[str, BaseRecord]] = {}
+
+    @classmethod
+    def open(cls) -> "DatabaseSession":
+        """Open a new session for the current interaction"""
+        session = cls()
+        _current_session.set(session)
+        return session
+
+    @staticmethod
+    def current() -> "DatabaseSession | None":
+        """Get the session of the current interaction, if any"""
+        return _current_session.get()
+
+    def get_table(self, table_name: str) -> list[list[int | float | str | None]]:
+        """Get the pinned table, or None if it is not pinned yet"""
+        return self._tables.get(table_name)
+
+    def pin_table(
+        self, table_name: str, table: list[list[int | float | str | None]]
+    ) -> None:
+        """Pin a table (the live cache list) for the rest of the session"""
+        self._tables[table_name] = table
+
+    def unpin_table(self, table_name: str) -> None:
+        """Unpin a table, so the next read gets (and pins) it from the cache again"""
+        self._tables.pop(table_name, None)
+
+    def get_record(
+        self,
+        table_name: str,
+        row: list[int | float | str | None],
+        record_type: Type[BaseRecord],
+    ) -> BaseRecord:
+        """Get the record instance of a row, creating it on first use"""
+        records = self._records.setdefault(table_name, {})
+        record_id = row[BaseFields.record_id]
+        if record_id not in records:
+            records[record_id] = record_type(row)
+        return records[record_id]
+
+    def put_record(self, table_name: str, record_id: str, record: BaseRecord) -> None:
+        """Use this record instance for a record_id from now on"""
+        self._records.setdefault(table_name, {})[record_id] = record
+
+    def forget_record(self, table_name: str, record_id: str) -> None:
+        """Forget the record instance of a deleted record"""
+        self._records.get(table_name, {}).pop(record_id, None)
@@ -13,6 +13,26 @@ class WriteOperations(StrEnum):
     INSERT = "INSERT"
     UPDATE = "UPDATE"
     DELETE = "DELETE"
+    REPLACE = "REPLACE"  # a whole table (e.g. a view), never queued
+
+
+@verify(EnumCheck.UNIQUE)
+class StorageBackends(StrEnum):
+    """Lookup for Storage Backend names (see `DATABASE_BACKEND`)"""
+
+    GSPREAD = "gspread"
+    GSPREAD_FAKE = "gspread_fake"  # in-memory, nothing is kept after a restart
+    SQLITE = "sqlite"
+    SQLITE_MIRRORED = "sqlite_mirrored"
+
+
+@verify(EnumCheck.UNIQUE)
+class CircuitStates(StrEnum):
+    """Lookup for Circuit Breaker states (see `CircuitBreaker`)"""
+
+    CLOSED = "CLOSED"  # backend healthy, requests go through
+    OPEN = "OPEN"  # backend down, reads from the cache, writes stay queued
+    HALF_OPEN = "HALF_OPEN"  # probing the backend for recovery
 
 
 ### Common ###
@@ -0,0 +1,379 @@
+from collections import Counter
+import gspread
+import json
+import random
+import requests
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+"""
+In-memory fake of the parts of `gspread` used by the database
+
+Use it in place of `gspread.service_account(...)`, e.g. to run the bot or to
+measure the database layer offline:
+
+    client = FakeGspreadClient(latency_seconds=0.2)
+    backend = GspreadBackend(client, "https://docs.google.com/spreadsheets/d/fake")
+    ...
+    client.spreadsheet.calls  # Counter({"values_batch_get": 3, ...})
+"""
+
+
+class FakeGspreadClient:
+    """Fake `gspread.Client`, every URL opens its own in-memory spreadsheet
+
+    Attributes:
+        latency_seconds (float): Time every request sleeps, like a network round-trip
+        method_latency_seconds (dict): Latency of some requests, by method name
+        failure_rate (float): Chance (0-1) that a request fails with `failure_code`
+        failure_code (int): HTTP status of the failures (e.g. 429, 500, 503)
+    """
+
+    def __init__(
+        self,
+        latency_seconds: float = 0.0,
+        failure_rate: float = 0.0,
+        failure_code: int = 429,
+        seed: int = None,
+    ):
+        self.latency_seconds = latency_seconds
+        self.method_latency_seconds: dict[str, float] = {}
+        self.failure_rate = failure_rate
+        self.failure_code = failure_code
+        self.calls: Counter = Counter()
+        self._failures: dict[str, list[int]] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._spreadsheets: dict[str, FakeSpreadsheet] = {}
+        self.spreadsheet: FakeSpreadsheet | None = None
+
+    def open_by_url(self, url: str) -> "FakeSpreadsheet":
+        """Open (or create) the spreadsheet of a URL"""
+        self._request("open_by_url")
+        if url not in self._spreadsheets:
+            self._spreadsheets[url] = FakeSpreadsheet(self, url)
+        self.spreadsheet = self._spreadsheets[url]
+        return self.spreadsheet
+
+    def set_timeout(self, timeout: float) -> None:
+        """Accepted, and ignored"""
+        pass
+
+    def fail_next(self, method: str, code: int = 429, count: int = 1) -> None:
+        """Make the next `count` calls of `method` fail with HTTP status `code`"""
+        with self._lock:
+            self._failures.setdefault(method, []).extend([code] * count)
+
+    def reset_calls(self) -> None:
+        """Reset the call counters"""
+        with self._lock:
+            self.calls.clear()
+
+    def _request(self, method: str) -> None:
+        """Count a request, wait for its latency, and raise any injected failure"""
+        with self._lock:
+            self.calls[method] += 1
+            failures = self._failures.get(method)
+            code = failures.pop(0) if failures else None
+            if code is None and self._random.random() < self.failure_rate:
+                code = self.failure_code
+        latency = self.method_latency_seconds.get(method, self.latency_seconds)
+        if latency:
+            time.sleep(latency)
+        if code is not None:
+            message = f"Injected failure of {method}"
+            raise gspread.exceptions.APIError(api_error_response(code, message))
+
+
+def api_error_response(code: int, message: str) -> requests.Response:
+    """Build the HTTP response of a Sheets API error"""
+    response = requests.Response()
+    response.status_code = code
+    error = {"code": code, "message": message, "status": ""}
+    response._content = json.dumps({"error": error}).encode("utf-8")
+    return response
+
+
+def _to_cell(value: int | float | str | None) -> str:
+    """Convert a value to the text a worksheet returns for it"""
+    if value is None:
+        return ""
+    if value is True:
+        return "TRUE"
+    if value is False:
+        return "FALSE"
+    return str(value)
+
+
+def _split_range(range_name: str) -> tuple[str, str]:
+    """Split "'Title'!A1:B2" into ("Title", "A1:B2")"""
+    title, _, cells = range_name.partition("!")
+    if title.startswith("'") and title.endswith("'"):
+        title = title[1:-1].replace("''", "'")
+    return title, cells
+
+
+def _trim_row(row: list) -> list:
+    """Drop the trailing empty cells of a row (as the Sheets API does)"""
+    row = list(row)
+    while row and row[-1] == "":
+        row.pop()
+    return row
+
+
+class FakeSpreadsheet:
+    """Fake `gspread.Spreadsheet`, holding its worksheets in memory"""
+
+    def __init__(self, client: FakeGspreadClient, url: str):
+        self.client = client
+        self.url = url
+        self.title = url.rstrip("/").split("/")[-1]
+        self._worksheets: dict[str, FakeWorksheet] = {}
+        self._next_id = 0
+
+    @property
+    def calls(self) -> Counter:
+        return self.client.calls
+
+    def worksheets(self) -> list["FakeWorksheet"]:
+        self.client._request("worksheets")
+        return list(self._worksheets.values())
+
+    def worksheet(self, title: str) -> "FakeWorksheet":
+        self.client._request("worksheet")
+        if title not in self._worksheets:
+            raise gspread.WorksheetNotFound(title)
+        return self._worksheets[title]
+
+    def add_worksheet(
+        self, title: str, rows: int = 1000, cols: int = 26, index: int = None
+    ) -> "FakeWorksheet":
+        self.client._request("add_worksheet")
+        return self._add_worksheet(title, rows, cols)
+
+    def _add_worksheet(
+        self, title: str, rows: int, cols: int, sheet_id: int = None
+    ) -> "FakeWorksheet":
+        if title in self._worksheets:
+            error = f'A sheet with the name "{title}" already exists.'
+            raise gspread.exceptions.APIError(api_error_response(400, error))
+        self._next_id = max(self._next_id + 1, sheet_id or 0)
+        worksheet = FakeWorksheet(self, title, sheet_id or self._next_id, rows, cols)
+        self._worksheets[title] = worksheet
+        return worksheet
+
+    def fetch_sheet_metadata(self, params: dict = None) -> dict:
+        self.client._request("fetch_sheet_metadata")
+        sheets = [
+            {"properties": worksheet._properties()}
+            for worksheet in self._worksheets.values()
+        ]
+        return {"spreadsheetId": self.title, "sheets": sheets}
+
+    def values_batch_get(self, ranges: list[str], params: dict = None) -> dict:
+        self.client._request("values_batch_get")
+        value_ranges = []
+        for range_name in ranges:
+            title, cells = _split_range(range_name)
+            if title not in self._worksheets:
+                error = f"Unable to parse range: {range_name}"
+                raise gspread.exceptions.APIError(api_error_response(400, error))
+            value_range = {"range": range_name, "majorDimension": "ROWS"}
+            values = self._worksheets[title]._values()
+            if cells:
+                # only the cells in the range, trailing empty cells left out
+                grid = gspread.utils.a1_range_to_grid_range(cells)
+                values = values[grid.get("startRowIndex", 0) : grid.get("endRowIndex")]
+                start_col = grid.get("startColumnIndex", 0)
+                values = [row[start_col : grid.get("endColumnIndex")] for row in values]
+                values = [_trim_row(row) for row in values]
+                while values and not values[-1]:
+                    values.pop()
+            if values:
+                value_range["values"] = values
+            value_ranges.append(value_range)
+        return {"spreadsheetId": self.title, "valueRanges": value_ranges}
+
+    def values_batch_update(self, body: dict) -> dict:
+        self.client._request("values_batch_update")
+        for data in body.get("data", []):
+            title, cells = _split_range(data["range"])
+            row, col = gspread.utils.a1_to_rowcol(cells.split(":")[0])
+            self._worksheets[title]._write(row, col, data["values"])
+        return {"totalUpdatedRanges": len(body.get("data", []))}
+
+    def batch_update(self, body: dict) -> dict:
+        self.client._request("batch_update")
+        replies = []
+        by_id = {worksheet.id: worksheet for worksheet in self._worksheets.values()}
+        for request in body.get("requests", []):
+            if "deleteDimension" in request:
+                dimension_range = request["deleteDimension"]["range"]
+                worksheet = by_id[dimension_range["sheetId"]]
+                if dimension_range["dimension"] == "ROWS":
+                    start = dimension_range["startIndex"]
+                    end = dimension_range["endIndex"]
+                    del worksheet._rows[start:end]
+                    worksheet.row_count -= min(end, worksheet.row_count) - start
+            elif "addSheet" in request:
+                properties = request["addSheet"]["properties"]
+                grid = properties.get("gridProperties", {})
+                worksheet = self._add_worksheet(
+                    properties["title"],
+                    grid.get("rowCount", 1000),
+                    grid.get("columnCount", 26),
+                    properties.get("sheetId"),
+                )
+                by_id[worksheet.id] = worksheet
+                replies.append({"addSheet": {"properties": worksheet._properties()}})
+                continue
+            elif "updateCells" in request:
+                start = request["updateCells"]["start"]
+                values = [
+                    [
+                        list(
+                            cell.get("userEnteredValue", {"stringValue": ""}).values()
+                        )[0]
+                        for cell in row.get("values", [])
+                    ]
+                    for row in request["updateCells"].get("rows", [])
+                ]
+                by_id[start["sheetId"]]._write(
+                    start.get("rowIndex", 0) + 1,
+                    start.get("columnIndex", 0) + 1,
+                    values,
+                )
+            replies.append({})
+        return {"spreadsheetId": self.title, "replies": replies}
+
+
+class FakeWorksheet:
+    """Fake `gspread.Worksheet`, holding its rows in memory"""
+
+    def __init__(
+        self, spreadsheet: FakeSpreadsheet, title: str, id: int, rows: int, cols: int
+    ):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.id = id
+        self.row_count = rows
+        self.col_count = cols
+        self._rows: list[list[str]] = []
+
+    def _request(self, method: str) -> None:
+        self.spreadsheet.client._request(method)
+
+    def _properties(self) -> dict:
+        grid = {"rowCount": self.row_count, "columnCount": self.col_count}
+        index = list(self.spreadsheet._worksheets).index(self.title)
+        return {
+            "sheetId": self.id,
+            "title": self.title,
+            "index": index,
+            "sheetType": "GRID",
+            "gridProperties": grid,
+        }
+
+    def _values(self) -> list[list[str]]:
+        """Copy the rows, without trailing empty rows and cells (like Sheets)"""
+        values = []
+        for row in self._rows:
+            cells = list(row)
+            while cells and cells[-1] == "":
+                cells.pop()
+            values.append(cells)
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+    def _write(self, row: int, col: int, values: list[list]) -> None:
+        """Write a block of values, with its top left cell at (row, col)"""
+        for row_offset, row_values in enumerate(values):
+            row_index = row - 1 + row_offset
+            while len(self._rows) <= row_index:
+                self._rows.append([])
+            cells = self._rows[row_index]
+            for col_offset, value in enumerate(row_values):
+                col_index = col - 1 + col_offset
+                while len(cells) <= col_index:
+                    cells.append("")
+                cells[col_index] = _to_cell(value)
+
+    def get_all_values(self, *args, **kwargs) -> list[list[str]]:
+        self._request("get_all_values")
+        return gspread.utils.fill_gaps(self._values())
+
+    def col_values(self, col: int, *args, **kwargs) -> list[str]:
+        self._request("col_values")
+        values = [row[col - 1] if len(row) >= col else "" for row in self._values()]
+        while values and values[-1] == "":
+            values.pop()
+        return values
+
+    def find(self, query: str, in_row: int = None, in_column: int = None, **kwargs):
+        self._request("find")
+        for row_index, row in enumerate(self._values()):
+            if in_row and row_index + 1 != in_row:
+                continue
+            for col_index, value in enumerate(row):
+                if in_column and col_index + 1 != in_column:
+                    continue
+                if value == str(query):
+                    return gspread.cell.Cell(row_index + 1, col_index + 1, value)
+        return None
+
+    def append_row(self, values: list, table_range: str = None, **kwargs) -> dict:
+        self._request("append_row")
+        return self._append([values])
+
+    def append_rows(self, values: list[list], table_range: str = None, **kwargs):
+        self._request("append_rows")
+        return self._append(values)
+
+    def _append(self, values: list[list]) -> dict:
+        """Append rows after the last row that has a value"""
+        first_row = len(self._values()) + 1
+        del self._rows[first_row - 1 :]
+        self._write(first_row, 1, values)
+        last_row = first_row + len(values) - 1
+        self.row_count = max(self.row_count, last_row)
+        last_col = max([len(row) for row in values] + [1])
+        cells = f"A{first_row}:{gspread.utils.rowcol_to_a1(last_row, last_col)}"
+        updated_range = gspread.utils.absolute_range_name(self.title, cells)
+        return {
+            "spreadsheetId": self.spreadsheet.title,
+            "updates": {"updatedRange": updated_range, "updatedRows": len(values)},
+        }
+
+    def update(self, values=None, range_name: str = None, **kwargs) -> dict:
+        self._request("update")
+        if isinstance(values, str):
+            # older call style: update(range_name, values)
+            values, range_name = range_name, values
+        row, col = gspread.utils.a1_to_rowcol((range_name or "A1").split(":")[0])
+        self._write(row, col, values)
+        return {
+            "updatedRange": gspread.utils.absolute_range_name(self.title, range_name)
+        }
+
+    def delete_rows(self, start_index: int, end_index: int = None) -> dict:
+        self._request("delete_rows")
+        end_index = end_index if end_index else start_index
+        del self._rows[start_index - 1 : end_index]
+        return {}
+
+    def clear(self) -> dict:
+        self._request("clear")
+        self._rows = []
+        return {}
+
+    def format(self, ranges, format: dict = None) -> dict:
+        self._request("format")
+        return {}
+
+    def freeze(self, rows: int = None, cols: int = None) -> dict:
+        self._request("freeze")
+        return {}
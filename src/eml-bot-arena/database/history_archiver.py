@@ -0,0 +1,165 @@
+from database.base_table import HistoryFields
+from database.database_core import CoreDatabase
+from typing import Callable
+import asyncio
+import constants
+import datetime
+import gzip
+import json
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryArchiver:
+    """Background job that moves old rows out of the `*History` tables
+
+    Every `LEAGUE_DB_HISTORY_ARCHIVE_INTERVAL_SECONDS`, history rows older than
+    `LEAGUE_DB_HISTORY_RETENTION_DAYS` are archived, then deleted from the live
+    history tables, so the spreadsheet stays well inside its cell limit:
+    - The `history_created_at` column of every history table is read first (one
+      request), to find the last row to archive in each table. Then each table
+      is read up to that row only, archived and trimmed, one table at a time.
+    - Rows are appended to compressed JSON Lines files in `archive_dir`, one file
+      per history table and year (e.g. `PlayerHistory-2024.jsonl.gz`), before
+      they are deleted. A run that fails after that archives them again, and the
+      `history_id` of each line tells the copies apart.
+    - New history rows are held back while the tables are trimmed
+
+    Each run reports the rows archived, and the cells reclaimed, to `report`.
+    """
+
+    def __init__(
+        self,
+        core_database: CoreDatabase,
+        archive_dir: str,
+        report: Callable = None,
+    ):
+        self._db = core_database
+        self._archive_dir = archive_dir
+        self._report = report
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start the archival task (if not running)"""
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(
+            self._archive(), name="eml-db-history-archiver"
+        )
+
+    async def _archive(self) -> None:
+        """Archive old history rows every interval, until cancelled"""
+        while True:
+            await asyncio.sleep(constants.LEAGUE_DB_HISTORY_ARCHIVE_INTERVAL_SECONDS)
+            try:
+                await self.archive_history()
+            except Exception as error:
+                logger.exception(f"Failed to archive the history tables: {error}")
+
+    async def archive_history(self) -> dict:
+        """Archive and delete the old rows of every history table
+
+        Returns the rows archived per table, and the cells reclaimed.
+        """
+        retention_seconds = constants.LEAGUE_DB_HISTORY_RETENTION_DAYS * 86400
+        cutoff = time.time() - retention_seconds
+        table_names = await self._db.get_history_tables()
+        summary = {"archived_rows": {}, "cells_reclaimed": 0}
+        if not table_names:
+            return summary
+        async with self._db.hold_history_rows():
+            created_at_columns = await self._db.read_uncached_columns(
+                table_names, HistoryFields.history_created_at
+            )
+            # rows are appended in order, but may have been sorted by hand
+            last_rows = {}
+            for table_name, column in created_at_columns.items():
+                expired = [
+                    row_number
+                    for row_number, created_at in enumerate(column[1:], start=2)
+                    if await self._is_expired(created_at, cutoff)
+                ]
+                if expired:
+                    last_rows[table_name] = expired[-1]
+            if not last_rows:
+                return summary
+            sizes_before = await self._db.get_table_sizes(list(last_rows))
+            archived_rows = {}
+            missing = set()
+            for table_name, last_row in last_rows.items():
+                table = await self._db.read_uncached_first_rows(table_name, last_row)
+                rows = [
+                    row
+                    for row in table[1:]
+                    if len(row) > HistoryFields.history_created_at
+                    and await self._is_expired(
+                        row[HistoryFields.history_created_at], cutoff
+                    )
+                ]
+                if not rows:
+                    continue
+                await self._db.run_blocking(
+                    self._write_archive, table_name, table[0], rows
+                )
+                deletes = [(table_name, row[HistoryFields.history_id]) for row in rows]
+                missing |= await self._db.delete_uncached_rows(deletes)
+                archived_rows[table_name] = rows
+            sizes_after = await self._db.get_table_sizes(list(last_rows))
+        for table_name, rows in archived_rows.items():
+            summary["archived_rows"][table_name] = len(rows)
+        summary["cells_reclaimed"] = sum(sizes_before.values()) - sum(
+            sizes_after.values()
+        )
+        if missing:
+            logger.warning(f"{len(missing)} archived history row(s) were not found")
+        logger.info(
+            f"Archived {sum(summary['archived_rows'].values())} history row(s),"
+            f" reclaimed {summary['cells_reclaimed']} cell(s):"
+            f" {summary['archived_rows']}"
+        )
+        if self._report:
+            await self._report(summary)
+        return summary
+
+    @staticmethod
+    async def _is_expired(created_at: str, cutoff: float) -> bool:
+        """Check if a `history_created_at` is before the cutoff (epoch)"""
+        try:
+            created_at = datetime.datetime.fromisoformat(created_at)
+        except (TypeError, ValueError):
+            # not a history row we can date, keep it
+            return False
+        return created_at.timestamp() < cutoff
+
+    def _write_archive(
+        self,
+        table_name: str,
+        field_names: list[str],
+        rows: list[list[int | float | str | None]],
+    ) -> None:
+        """Append rows to the archive files of a table (one per year), and fsync them"""
+        os.makedirs(self._archive_dir, exist_ok=True)
+        rows_by_year: dict[str, list[list[int | float | str | None]]] = {}
+        for row in rows:
+            year = str(row[HistoryFields.history_created_at])[:4]
+            rows_by_year.setdefault(year, []).append(row)
+        for year, year_rows in rows_by_year.items():
+            archive_path = os.path.join(
+                self._archive_dir, f"{table_name}-{year}.jsonl.gz"
+            )
+            with open(archive_path, "ab") as archive_file:
+                with gzip.GzipFile(fileobj=archive_file, mode="ab") as gzip_file:
+                    for row in year_rows:
+                        line = json.dumps(dict(zip(field_names, row)))
+                        gzip_file.write((line + "\n").encode("utf-8"))
+                archive_file.flush()
+                os.fsync(archive_file.fileno())
+
+    async def close(self) -> None:
+        """Stop the archival task"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
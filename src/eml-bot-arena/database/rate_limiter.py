@@ -0,0 +1,65 @@
+from collections import deque
+import asyncio
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Async token bucket, for a per-minute request quota
+
+    Tokens refill at `per_minute / 60` per second, up to `burst` tokens. A caller
+    that finds the bucket empty waits for the next token, so requests are spread
+    out before the quota is reached, instead of being rejected after it.
+    """
+
+    def __init__(self, per_minute: int, burst: int):
+        self.per_minute = per_minute
+        self.burst = burst
+        self._rate = per_minute / 60
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._used: deque[float] = deque()
+        self.waited_seconds = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated_at) * self._rate
+        )
+        self._updated_at = now
+        while self._used and now - self._used[0] > 60:
+            self._used.popleft()
+
+    async def acquire(self, tokens: int = 1) -> float:
+        """Take `tokens` from the bucket, waiting for them if needed
+
+        Returns the number of seconds waited.
+        """
+        waited = 0.0
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    self._used.extend([time.monotonic()] * tokens)
+                    break
+                delay = (tokens - self._tokens) / self._rate
+                waited += delay
+                await asyncio.sleep(delay)
+        self.waited_seconds += waited
+        return waited
+
+    def get_status(self) -> dict:
+        """Get the quota used in the last minute, and what is left of it"""
+        self._refill()
+        used = len(self._used)
+        return {
+            "per_minute": self.per_minute,
+            "used_last_minute": used,
+            "remaining": max(0, self.per_minute - used),
+            "tokens": round(self._tokens, 2),
+            "waited_seconds": round(self.waited_seconds, 3),
+        }
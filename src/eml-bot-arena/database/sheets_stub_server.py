@@ -0,0 +1,330 @@
+from collections import Counter
+from database.gspread_fake import FakeGspreadClient, FakeSpreadsheet, api_error_response
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+import argparse
+import gspread
+import json
+import requests
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+"""
+Local stand-in for the Google Sheets v4 API
+
+Serves the Sheets endpoints that `gspread` calls for the database, on local
+(in-memory) data, so the whole request pipeline (HTTP, JSON, timeouts, retries,
+batching) can be measured without Google:
+
+    server = SheetsStubServer(latency_seconds=0.1)
+    server.start()
+    server.fail_every(20, 429)
+    gs_client = stub_client(server.url)
+    backend = GspreadBackend(gs_client, "https://docs.google.com/spreadsheets/d/stub")
+
+Or run it on its own, and point the bot at it with `SHEETS_API_URL`:
+
+    python -m database.sheets_stub_server --port 8089
+"""
+
+SHEETS_API_URL = "https://sheets.googleapis.com"
+
+
+class StubSession(requests.Session):
+    """`requests` session that sends Sheets API requests to a stand-in server"""
+
+    def __init__(self, base_url: str):
+        super().__init__()
+        self.base_url = base_url.rstrip("/")
+
+    def request(self, method: str, url: str, *args, **kwargs) -> requests.Response:
+        if url.startswith(SHEETS_API_URL):
+            url = self.base_url + url[len(SHEETS_API_URL) :]
+        return super().request(method, url, *args, **kwargs)
+
+
+def stub_client(
+    base_url: str, http_client: type = gspread.HTTPClient
+) -> gspread.Client:
+    """Get a `gspread.Client` that talks to the stand-in server at `base_url`
+
+    note: use `http_client=gspread.BackOffHTTPClient` to include gspread's retries.
+    """
+    return gspread.Client(None, session=StubSession(base_url), http_client=http_client)
+
+
+class SheetsStubServer:
+    """Threaded HTTP server for the Sheets v4 endpoints used by the database
+
+    - `spreadsheets.get`, `spreadsheets.batchUpdate`
+    - `values.get`, `values.batchGet`, `values.append`, `values.update`,
+      `values.batchUpdate`, `values.clear`
+
+    Attributes:
+        requests (Counter): Number of requests served, by endpoint
+        latency_seconds (float): Time every request waits before it is served
+    """
+
+    def __init__(
+        self, host: str = "127.0.0.1", port: int = 0, latency_seconds: float = 0.0
+    ):
+        self.requests: Counter = Counter()
+        self.latency_seconds = latency_seconds
+        self._data = FakeGspreadClient()
+        self._lock = threading.Lock()
+        self._request_count = 0
+        self._scheduled_faults: dict[int, int] = {}
+        self._periodic_faults: list[tuple[int, int]] = []
+        self._httpd = ThreadingHTTPServer((host, port), _SheetsStubHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> None:
+        """Serve requests in a background thread"""
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="sheets-stub", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Sheets API stand-in listening on {self.url}")
+
+    def stop(self) -> None:
+        """Stop serving requests"""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def fail_on(self, request_number: int, status: int = 429) -> None:
+        """Answer the `request_number`-th request (counting from 1) with `status`"""
+        with self._lock:
+            self._scheduled_faults[request_number] = status
+
+    def fail_every(self, interval: int, status: int = 429) -> None:
+        """Answer every `interval`-th request with `status` (e.g. 429, 500, 503)"""
+        with self._lock:
+            self._periodic_faults.append((interval, status))
+
+    def spreadsheet(self, spreadsheet_id: str) -> FakeSpreadsheet:
+        """Get (or create) the data of a spreadsheet"""
+        return self._data.open_by_url(spreadsheet_id)
+
+    def _next_fault(self) -> int | None:
+        """Count a request, and get the status it must fail with (if any)"""
+        with self._lock:
+            self._request_count += 1
+            status = self._scheduled_faults.pop(self._request_count, None)
+            for interval, periodic_status in self._periodic_faults:
+                if status is None and self._request_count % interval == 0:
+                    status = periodic_status
+        return status
+
+
+class _SheetsStubHandler(BaseHTTPRequestHandler):
+    """Routes Sheets v4 requests to the stand-in's data"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(f"Sheets stand-in: {format % args}")
+
+    def do_GET(self) -> None:
+        self._handle("GET")
+
+    def do_POST(self) -> None:
+        self._handle("POST")
+
+    def do_PUT(self) -> None:
+        self._handle("PUT")
+
+    def _handle(self, method: str) -> None:
+        stub: SheetsStubServer = self.server.stub
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+        parts = urlsplit(self.path)
+        params = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        params["ranges"] = parse_qs(parts.query).get("ranges", [])
+        prefix = "/v4/spreadsheets/"
+        if not parts.path.startswith(prefix):
+            return self._send(404, _error(404, f"Unknown path: {parts.path}"))
+        spreadsheet_id, _, rest = unquote(parts.path[len(prefix) :]).partition("/")
+        spreadsheet_id, _, action = spreadsheet_id.partition(":")
+        endpoint, handler = self._route(method, action, rest)
+        if not handler:
+            return self._send(404, _error(404, f"Unknown endpoint: {method} {rest}"))
+        stub.requests[endpoint] += 1
+        if stub.latency_seconds:
+            time.sleep(stub.latency_seconds)
+        fault = stub._next_fault()
+        if fault:
+            return self._send(fault, _error(fault, f"Scheduled failure of {endpoint}"))
+        spreadsheet = stub.spreadsheet(spreadsheet_id)
+        try:
+            with stub._lock:
+                response = handler(spreadsheet, rest, params, body)
+        except gspread.exceptions.APIError as error:
+            return self._send(error.code, {"error": error.error})
+        except (KeyError, ValueError, gspread.exceptions.GSpreadException) as error:
+            return self._send(400, _error(400, f"Bad request: {error}"))
+        self._send(200, response)
+
+    def _route(self, method: str, action: str, rest: str):
+        """Get the (endpoint name, handler) of a request"""
+        if not rest:
+            if method == "GET" and not action:
+                return "spreadsheets.get", _spreadsheets_get
+            if method == "POST" and action == "batchUpdate":
+                return "spreadsheets.batchUpdate", _spreadsheets_batch_update
+        elif method == "GET" and rest == "values:batchGet":
+            return "values.batchGet", _values_batch_get
+        elif method == "POST" and rest == "values:batchUpdate":
+            return "values.batchUpdate", _values_batch_update
+        elif rest.startswith("values/"):
+            if method == "GET":
+                return "values.get", _values_get
+            if method == "PUT":
+                return "values.update", _values_update
+            if method == "POST" and rest.endswith(":append"):
+                return "values.append", _values_append
+            if method == "POST" and rest.endswith(":clear"):
+                return "values.clear", _values_clear
+        return None, None
+
+    def _send(self, status: int, response: dict) -> None:
+        content = json.dumps(response).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+def _error(code: int, message: str) -> dict:
+    return {"error": {"code": code, "message": message, "status": ""}}
+
+
+def _range_of(rest: str) -> str:
+    """Get the A1 range of a `values/{range}[:action]` path"""
+    range_name = rest[len("values/") :]
+    for action in (":append", ":clear"):
+        if range_name.endswith(action):
+            range_name = range_name[: -len(action)]
+    return range_name
+
+
+def _grid(spreadsheet: FakeSpreadsheet, range_name: str):
+    """Get the worksheet, and the 0-based (row, col) bounds of an A1 range"""
+    title, _, cells = range_name.partition("!")
+    if title.startswith("'") and title.endswith("'"):
+        title = title[1:-1].replace("''", "'")
+    worksheet = spreadsheet._worksheets.get(title)
+    if worksheet is None:
+        raise gspread.exceptions.APIError(
+            api_error_response(400, f"Unable to parse range: {range_name}")
+        )
+    grid = gspread.utils.a1_range_to_grid_range(cells) if cells else {}
+    return worksheet, grid
+
+
+def _values_of(spreadsheet: FakeSpreadsheet, range_name: str, params: dict) -> dict:
+    """Read an A1 range as a ValueRange (trailing empty cells left out)"""
+    worksheet, grid = _grid(spreadsheet, range_name)
+    rows = worksheet._values()
+    rows = rows[grid.get("startRowIndex", 0) : grid.get("endRowIndex")]
+    start_col = grid.get("startColumnIndex", 0)
+    rows = [row[start_col : grid.get("endColumnIndex")] for row in rows]
+    major_dimension = params.get("majorDimension", "ROWS")
+    if major_dimension == "COLUMNS":
+        width = max([len(row) for row in rows] + [0])
+        rows = gspread.utils.fill_gaps(rows, cols=width) if rows else []
+        rows = [list(column) for column in zip(*rows)]
+    values = []
+    for row in rows:
+        row = list(row)
+        while row and row[-1] == "":
+            row.pop()
+        values.append(row)
+    while values and not values[-1]:
+        values.pop()
+    value_range = {"range": range_name, "majorDimension": major_dimension}
+    if values:
+        value_range["values"] = values
+    return value_range
+
+
+def _spreadsheets_get(spreadsheet, rest, params, body) -> dict:
+    sheets = [
+        {"properties": worksheet._properties()}
+        for worksheet in spreadsheet._worksheets.values()
+    ]
+    properties = {"title": spreadsheet.title, "locale": "en_US", "timeZone": "Etc/UTC"}
+    return {
+        "spreadsheetId": spreadsheet.title,
+        "properties": properties,
+        "sheets": sheets,
+    }
+
+
+def _spreadsheets_batch_update(spreadsheet, rest, params, body) -> dict:
+    return spreadsheet.batch_update(body)
+
+
+def _values_get(spreadsheet, rest, params, body) -> dict:
+    return _values_of(spreadsheet, _range_of(rest), params)
+
+
+def _values_batch_get(spreadsheet, rest, params, body) -> dict:
+    value_ranges = [
+        _values_of(spreadsheet, range_name, params) for range_name in params["ranges"]
+    ]
+    return {"spreadsheetId": spreadsheet.title, "valueRanges": value_ranges}
+
+
+def _values_update(spreadsheet, rest, params, body) -> dict:
+    range_name = _range_of(rest)
+    worksheet, grid = _grid(spreadsheet, range_name)
+    row = grid.get("startRowIndex", 0) + 1
+    col = grid.get("startColumnIndex", 0) + 1
+    worksheet._write(row, col, body.get("values", []))
+    return {"spreadsheetId": spreadsheet.title, "updatedRange": range_name}
+
+
+def _values_batch_update(spreadsheet, rest, params, body) -> dict:
+    return spreadsheet.values_batch_update(body)
+
+
+def _values_append(spreadsheet, rest, params, body) -> dict:
+    worksheet, _ = _grid(spreadsheet, _range_of(rest))
+    return worksheet._append(body.get("values", []))
+
+
+def _values_clear(spreadsheet, rest, params, body) -> dict:
+    range_name = _range_of(rest)
+    worksheet, _ = _grid(spreadsheet, range_name)
+    worksheet._rows = []
+    return {"spreadsheetId": spreadsheet.title, "clearedRange": range_name}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for Sheets v4")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--fail-every", type=int, default=0)
+    parser.add_argument("--fail-status", type=int, default=429)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    server = SheetsStubServer(args.host, args.port, args.latency)
+    if args.fail_every:
+        server.fail_every(args.fail_every, args.fail_status)
+    server.start()
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
@@ -27,6 +27,11 @@ class CommandLockTable(BaseTable):
             constants.LEAGUE_DB_TAB_COMMAND_LOCK,
             CommandLockRecord,
             CommandLockFields,
+            indexed_fields=[
+                CommandLockFields.record_id,
+                CommandLockFields.command_name,
+            ],
+            keep_history=False,
         )
 
     async def create_command_lock_record(
@@ -68,30 +73,10 @@ class CommandLockTable(BaseTable):
         # Parameter conversion
         if is_allowed is not None:
             is_allowed = Bool.TRUE if is_allowed else Bool.FALSE
-        # Walk the table
-        table = await self.get_table_data()
-        existing_records = []
-        for row in table[1:]:  # skip header row
-            # Check for matched record
-            if (
-                (
-                    not record_id
-                    or str(record_id).casefold()
-                    == str(row[CommandLockFields.record_id]).casefold()
-                )
-                and (
-                    not command_name
-                    or str(command_name).casefold()
-                    == str(row[CommandLockFields.command_name]).casefold()
-                )
-                and (
-                    not is_allowed
-                    or str(is_allowed).casefold()
-                    == str(row[CommandLockFields.is_allowed]).casefold()
-                )
-            ):
-                # Add matched record
-                existing_record = CommandLockRecord(row)
-                existing_records.append(existing_record)
+        # Query the table (see `TableQuery`)
+        query = self.where(
+            record_id=record_id, command_name=command_name, is_allowed=is_allowed
+        )
+        existing_records = await query.all()
         # Return matched records
         return existing_records
@@ -27,25 +27,14 @@ class ConstantsTable(BaseTable):
             constants.LEAGUE_DB_TAB_CONSTANTS,
             ConstantsRecord,
             ConstantsFields,
+            indexed_fields=[ConstantsFields.name],
         )
     async def get_constants_records(
         self, name: str = None
     ) -> list[ConstantsRecord]:
         """Get an existing Constants record"""
-        # Walk the table
-        table = await self.get_table_data()
-        existing_records = []
-        for row in table[1:]:  # skip header row
-            # Check for matched record
-            if (
-                (
-                    not name
-                    or str(name).casefold()
-                    == str(row[ConstantsFields.name]).casefold()
-                )
-            ):
-                # Add matched record
-                existing_record = ConstantsRecord(row)
-                existing_records.append(existing_record)
+        # Query the table (see `TableQuery`)
+        query = self.where(name=name)
+        existing_records = await query.all()
         # Return matched records
         return existing_records
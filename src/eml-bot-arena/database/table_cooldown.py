@@ -23,7 +23,12 @@ class CooldownTable(BaseTable):
     def __init__(self, db: CoreDatabase):
         """Initialize the Cooldown Table class"""
         super().__init__(
-            db, constants.LEAGUE_DB_TAB_COOLDOWN, CooldownRecord, CooldownFields
+            db,
+            constants.LEAGUE_DB_TAB_COOLDOWN,
+            CooldownRecord,
+            CooldownFields,
+            indexed_fields=[CooldownFields.record_id, CooldownFields.player_id],
+            expires_at_field=CooldownFields.expires_at,
         )
 
     async def create_cooldown_record(
@@ -81,15 +86,20 @@ class CooldownTable(BaseTable):
     ) -> list[CooldownRecord]:
         """Get an existing Cooldown record
 
-        Note: Since this has to walk the whole table anyway, this is also used to clean up expired records
+        Note: This also cleans up the expired records (see `delete_expired_records`)
         """
+        # Sweep the whole table for expired records (throttled)
+        await self.delete_expired_records()
         # Prepare for expired records
         now = await general_helpers.epoch_timestamp()
         expired_records = []
-        # Walk the table
-        table = await self.get_table_data()
+        # Query the table (see `TableQuery`)
+        query = self.where(record_id=record_id, player_id=player_id)
+        query.between(
+            CooldownFields.expires_at, after=expires_after, before=expires_before
+        )
         existing_records = []
-        for row in table[1:]:  # skip header row
+        for row in await query.rows():
             # Check for expired record
             expiration_epoch = int(
                 await general_helpers.epoch_timestamp(row[CooldownFields.expires_at])
@@ -98,24 +108,9 @@ class CooldownTable(BaseTable):
                 expired_record = CooldownRecord(row)
                 expired_records.append(expired_record)
                 continue
-            # Check for matched record
-            if (
-                (
-                    not record_id
-                    or str(record_id).casefold()
-                    == str(row[CooldownFields.record_id]).casefold()
-                )
-                and (
-                    not player_id
-                    or str(player_id).casefold()
-                    == str(row[CooldownFields.player_id]).casefold()
-                )
-                and (not expires_before or int(expires_before) > int(expiration_epoch))
-                and (not expires_after or int(expires_after) < int(expiration_epoch))
-            ):
-                # Add matched record
-                existing_record = CooldownRecord(row)
-                existing_records.append(existing_record)
+            # Add matched record
+            existing_record = await self.get_record_from_row(row)
+            existing_records.append(existing_record)
         # Delete expired records
         for expired_record in expired_records:
             await self.delete_cooldown_record(expired_record)
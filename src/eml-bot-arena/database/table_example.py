@@ -23,7 +23,11 @@ class ExmapleTable(BaseTable):
     def __init__(self, db: CoreDatabase):
         """Initialize the Example Table class"""
         super().__init__(
-            db, constants.LEAGUE_DB_TAB_EXAMPLE, ExampleRecord, ExampleFields
+            db,
+            constants.LEAGUE_DB_TAB_EXAMPLE,
+            ExampleRecord,
+            ExampleFields,
+            indexed_fields=[ExampleFields.record_id, ExampleFields.example_a],
         )
 
     async def create_example_record(
@@ -60,30 +64,10 @@ class ExmapleTable(BaseTable):
         self, record_id: str = None, example_a: str = None, example_b: str = None
     ) -> ExampleRecord:
         """Get an existing Example record"""
-        # Walk the table
-        table = await self.get_table_data()
-        existing_records = []
-        for row in table[1:]:  # skip header row
-            # Check for matched record
-            if (
-                (
-                    not record_id
-                    or str(record_id).casefold()
-                    == str(row[ExampleFields.record_id]).casefold()
-                )
-                and (
-                    not example_a
-                    or str(example_a).casefold()
-                    == str(row[ExampleFields.example_a]).casefold()
-                )
-                and (
-                    not example_b
-                    or str(example_b).casefold()
-                    == str(row[ExampleFields.example_b]).casefold()
-                )
-            ):
-                # Add matched recrod
-                existing_record = ExampleRecord(row)
-                existing_records.append(existing_record)
+        # Query the table (see `TableQuery`)
+        query = self.where(
+            record_id=record_id, example_a=example_a, example_b=example_b
+        )
+        existing_records = await query.all()
         # Return matched records
         return existing_records
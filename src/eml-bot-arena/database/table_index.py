@@ -0,0 +1,116 @@
+import bisect
+import constants
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TableIndex:
+    """Record locator and hash indexes of one cached table
+
+    - Locator: `record_id` to the position of its row, for updates and deletes
+    - Hash indexes: `str(value).casefold()` of each indexed column to the
+      positions of the rows that hold it, so a lookup is O(1) in table order
+
+    Rows are indexed by a "slot" that never changes: the position the row had
+    when the index was built, or when it was appended. A deleted row leaves a
+    tombstone slot behind, and the position of a row is its slot minus the
+    tombstones before it. Once there are more than
+    `LEAGUE_DB_INDEX_MAX_TOMBSTONES`, the index is rebuilt (compacted).
+
+    The index belongs to one table list (`rows`), and is only valid for that list.
+
+    Attributes:
+        columns (list[int]): The indexed columns
+        rows (list): The cached table (header row included) that is indexed
+    """
+
+    def __init__(self, columns: list[int]):
+        self.columns = list(columns)
+        self.rows: list[list[int | float | str | None]] | None = None
+        self._slots: dict[str, list[int]] = {}
+        self._keys: dict[int, dict[str, list[int]]] = {}
+        self._tombstones: list[int] = []
+        self._next_slot = 0
+
+    @staticmethod
+    def key(value: int | float | str | None) -> str:
+        """Get the index key of a value (casefolded, like the table lookups)"""
+        return str(value).casefold()
+
+    def build(self, rows: list[list[int | float | str | None]]) -> None:
+        """Index every row of a table (the header row is skipped)"""
+        self.rows = rows
+        self._slots = {}
+        self._keys = {column: {} for column in self.columns}
+        self._tombstones = []
+        self._next_slot = 1
+        for row in rows[1:]:
+            self.add_row(row)
+
+    def _position(self, slot: int) -> int:
+        """Get the position in the table of the row in a slot"""
+        return slot - bisect.bisect_left(self._tombstones, slot)
+
+    def _add_keys(self, slot: int, row: list[int | float | str | None]) -> None:
+        for column, keys in self._keys.items():
+            if column < len(row):
+                bisect.insort(keys.setdefault(self.key(row[column]), []), slot)
+
+    def _remove_keys(self, slot: int, row: list[int | float | str | None]) -> None:
+        for column, keys in self._keys.items():
+            if column >= len(row):
+                continue
+            key = self.key(row[column])
+            if slot in keys.get(key, []):
+                keys[key].remove(slot)
+                if not keys[key]:
+                    del keys[key]
+
+    def add_row(self, row: list[int | float | str | None]) -> None:
+        """Index a row that was added at the end of the table"""
+        slot = self._next_slot
+        self._next_slot += 1
+        if row:
+            self._slots.setdefault(row[0], []).append(slot)
+        self._add_keys(slot, row)
+
+    def locate(self, record_id: str) -> int | None:
+        """Get the position in the table of a record (the first, if repeated)"""
+        slots = self._slots.get(record_id)
+        if not slots:
+            return None
+        return self._position(slots[0])
+
+    def update_row(
+        self,
+        old_row: list[int | float | str | None],
+        new_row: list[int | float | str | None],
+    ) -> None:
+        """Move a record that was replaced in place to the keys of its new values"""
+        slots = self._slots.get(old_row[0])
+        if not slots:
+            return
+        self._remove_keys(slots[0], old_row)
+        self._add_keys(slots[0], new_row)
+
+    def delete_row(self, row: list[int | float | str | None]) -> None:
+        """Unindex a record that was deleted from the table, leaving a tombstone
+
+        note: call this after the row was removed from `rows`, it may compact.
+        """
+        slots = self._slots.get(row[0])
+        if not slots:
+            return
+        slot = slots.pop(0)
+        if not slots:
+            del self._slots[row[0]]
+        self._remove_keys(slot, row)
+        bisect.insort(self._tombstones, slot)
+        if len(self._tombstones) > constants.LEAGUE_DB_INDEX_MAX_TOMBSTONES:
+            self.build(self.rows)
+
+    def lookup(self, column: int, value: int | float | str | None) -> list[int]:
+        """Get the positions of the rows whose `column` matches `value`"""
+        slots = self._keys[column].get(self.key(value), [])
+        return [self._position(slot) for slot in slots]
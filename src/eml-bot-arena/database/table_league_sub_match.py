@@ -27,6 +27,12 @@ class LeagueSubMatchTable(BaseTable):
             constants.LEAGUE_DB_TAB_LEAGUE_SUB_MATCH,
             LeagueSubMatchRecord,
             LeagueSubMatchFields,
+            indexed_fields=[
+                LeagueSubMatchFields.record_id,
+                LeagueSubMatchFields.match_id,
+                LeagueSubMatchFields.player_id,
+                LeagueSubMatchFields.team_id,
+            ],
         )
 
     async def create_league_sub_match_record(
@@ -89,35 +95,10 @@ class LeagueSubMatchTable(BaseTable):
         team_id: str = None,
     ) -> list[LeagueSubMatchRecord]:
         """Get existing LeagueSubMatch records"""
-        # Walk the table
-        table = await self.get_table_data()
-        existing_records = []
-        for row in table[1:]:  # skip header row
-            # Check for matched record
-            if (
-                (
-                    not record_id
-                    or str(record_id).casefold()
-                    == str(row[LeagueSubMatchFields.record_id]).casefold()
-                )
-                and (
-                    not match_id
-                    or str(match_id).casefold()
-                    == str(row[LeagueSubMatchFields.match_id]).casefold()
-                )
-                and (
-                    not player_id
-                    or player_id.casefold()
-                    == str(row[LeagueSubMatchFields.player_id]).casefold()
-                )
-                and (
-                    not team_id
-                    or team_id.casefold()
-                    == str(row[LeagueSubMatchFields.team_id]).casefold()
-                )
-            ):
-                # Add matched record
-                existing_record = LeagueSubMatchRecord(row)
-                existing_records.append(existing_record)
+        # Query the table (see `TableQuery`)
+        query = self.where(
+            record_id=record_id, match_id=match_id, player_id=player_id, team_id=team_id
+        )
+        existing_records = await query.all()
         # Return matched records
         return existing_records
@@ -29,6 +29,13 @@ class LeagueSubMatchInviteTable(BaseTable):
             constants.LEAGUE_DB_TAB_LEAGUE_SUB_MATCH_INVITE,
             LeagueSubMatchInviteRecord,
             LeagueSubMatchInviteFields,
+            indexed_fields=[
+                LeagueSubMatchInviteFields.record_id,
+                LeagueSubMatchInviteFields.match_id,
+                LeagueSubMatchInviteFields.sub_player_id,
+                LeagueSubMatchInviteFields.team_id,
+            ],
+            expires_at_field=LeagueSubMatchInviteFields.invite_expires_at,
         )
 
     async def create_league_sub_match_invite_record(
@@ -93,15 +100,23 @@ class LeagueSubMatchInviteTable(BaseTable):
         invite_status: InviteStatus = None,
     ) -> list[LeagueSubMatchInviteRecord]:
         """Get existing LeagueSubMatchInvite records
-        Note: Since this has to walk the whole table anyway, this is also used to clean up expired records
+        Note: This also cleans up the expired records (see `delete_expired_records`)
         """
+        # Sweep the whole table for expired records (throttled)
+        await self.delete_expired_records()
         # Prepare for expired records
         now = await general_helpers.epoch_timestamp()
         expired_records = []
-        # Walk the table
-        table = await self.get_table_data()
+        # Query the table (see `TableQuery`)
+        query = self.where(
+            record_id=record_id,
+            match_id=match_id,
+            sub_player_id=sub_player_id,
+            team_id=team_id,
+            invite_status=invite_status,
+        )
         existing_records = []
-        for row in table[1:]:  # skip header row
+        for row in await query.rows():
             # Check for expired record
             expiration_epoch = await general_helpers.epoch_timestamp(
                 row[LeagueSubMatchInviteFields.invite_expires_at]
@@ -110,36 +125,9 @@ class LeagueSubMatchInviteTable(BaseTable):
                 expired_record = LeagueSubMatchInviteRecord(row)
                 expired_records.append(expired_record)
                 continue
-            # Check for matched record
-            if (
-                (
-                    not record_id
-                    or str(record_id).casefold()
-                    == str(row[LeagueSubMatchInviteFields.record_id]).casefold()
-                )
-                and (
-                    not match_id
-                    or str(match_id).casefold()
-                    == str(row[LeagueSubMatchInviteFields.match_id]).casefold()
-                )
-                and (
-                    not sub_player_id
-                    or sub_player_id.casefold()
-                    == str(row[LeagueSubMatchInviteFields.sub_player_id]).casefold()
-                )
-                and (
-                    not team_id
-                    or team_id.casefold()
-                    == str(row[LeagueSubMatchInviteFields.team_id]).casefold()
-                )
-                and (
-                    not invite_status
-                    or invite_status == row[LeagueSubMatchInviteFields.invite_status]
-                )
-            ):
-                # Add matched record
-                existing_record = LeagueSubMatchInviteRecord(row)
-                existing_records.append(existing_record)
+            # Add matched record
+            existing_record = await self.get_record_from_row(row)
+            existing_records.append(existing_record)
         # Delete expired records
         for expired_record in expired_records:
             await self.delete_league_sub_match_invite_record(expired_record)
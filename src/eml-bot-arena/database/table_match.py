@@ -25,7 +25,17 @@ class MatchTable(BaseTable):
 
     def __init__(self, db: CoreDatabase):
         """Initialize the Match Table class"""
-        super().__init__(db, constants.LEAGUE_DB_TAB_MATCH, MatchRecord, MatchFields)
+        super().__init__(
+            db,
+            constants.LEAGUE_DB_TAB_MATCH,
+            MatchRecord,
+            MatchFields,
+            indexed_fields=[
+                MatchFields.record_id,
+                MatchFields.team_a_id,
+                MatchFields.team_b_id,
+            ],
+        )
 
     async def create_match_record(
         self,
@@ -130,54 +140,17 @@ class MatchTable(BaseTable):
         match_timestamp: str = None,
     ) -> list[MatchRecord]:
         """Get existing Match records"""
-        table = await self.get_table_data()
-        existing_records = []
-        for row in table[1:]:  # skip header row
-            # Check for matched records
-            if (
-                (
-                    not record_id
-                    or str(record_id).casefold()
-                    == str(row[MatchFields.record_id]).casefold()
-                )
-                and (
-                    not match_week
-                    or str(match_week).casefold()
-                    == str(row[MatchFields.match_week]).casefold()
-                )
-                and (
-                    not match_type
-                    or str(match_type).casefold()
-                    == str(row[MatchFields.match_type]).casefold()
-                )
-                and (
-                    not team_a_id
-                    or str(team_a_id).casefold()
-                    == str(row[MatchFields.team_a_id]).casefold()
-                )
-                and (
-                    not team_b_id
-                    or str(team_b_id).casefold()
-                    == str(row[MatchFields.team_b_id]).casefold()
-                )
-                and (
-                    not outcome
-                    or str(outcome).casefold()
-                    == str(row[MatchFields.outcome]).casefold()
-                )
-                and (
-                    not match_status
-                    or str(match_status).casefold()
-                    == str(row[MatchFields.match_status]).casefold()
-                )
-                and (
-                    not match_timestamp
-                    or str(match_timestamp).casefold()
-                    == str(row[MatchFields.match_timestamp]).casefold()
-                )
-            ):
-                # Add matched record
-                existing_record = MatchRecord(row)
-                existing_records.append(existing_record)
+        # Query the table (see `TableQuery`)
+        query = self.where(
+            record_id=record_id,
+            match_week=match_week,
+            match_type=match_type,
+            team_a_id=team_a_id,
+            team_b_id=team_b_id,
+            outcome=outcome,
+            match_status=match_status,
+            match_timestamp=match_timestamp,
+        )
+        existing_records = await query.all()
         # Return matched records
         return existing_records
@@ -29,6 +29,13 @@ class MatchInviteTable(BaseTable):
             constants.LEAGUE_DB_TAB_MATCH_INVITE,
             MatchInviteRecord,
             MatchInviteFields,
+            indexed_fields=[
+                MatchInviteFields.record_id,
+                MatchInviteFields.to_team_id,
+                MatchInviteFields.from_team_id,
+                MatchInviteFields.to_player_id,
+            ],
+            expires_at_field=MatchInviteFields.invite_expires_at,
         )
 
     async def create_match_invite_record(
@@ -103,13 +110,22 @@ class MatchInviteTable(BaseTable):
         invite_status: str = None,
     ) -> list[MatchInviteRecord]:
         """Get an existing Match Invite records"""
+        # Sweep the whole table for expired records (throttled)
+        await self.delete_expired_records()
         # Prepare for expired records
         now = await general_helpers.epoch_timestamp()
         expired_records = []
-        # Walk the table
-        table = await self.get_table_data()
+        # Query the table (see `TableQuery`)
+        query = self.where(
+            record_id=record_id,
+            from_team_id=from_team_id,
+            to_team_id=to_team_id,
+            from_player_id=from_player_id,
+            to_player_id=to_player_id,
+            invite_status=invite_status,
+        )
         existing_records = []
-        for row in table[1:]:  # skip header row
+        for row in await query.rows():
             # Check for expired record
             expiration_epoch = await general_helpers.epoch_timestamp(
                 row[MatchInviteFields.invite_expires_at]
@@ -118,42 +134,9 @@ class MatchInviteTable(BaseTable):
                 expired_record = MatchInviteRecord(row)
                 expired_records.append(expired_record)
                 continue
-            # Check for matched record
-            if (
-                (
-                    not record_id
-                    or str(record_id).casefold()
-                    == str(row[MatchInviteFields.record_id]).casefold()
-                )
-                and (
-                    not from_team_id
-                    or str(from_team_id).casefold()
-                    == str(row[MatchInviteFields.from_team_id]).casefold()
-                )
-                and (
-                    not to_team_id
-                    or str(to_team_id).casefold()
-                    == str(row[MatchInviteFields.to_team_id]).casefold()
-                )
-                and (
-                    not from_player_id
-                    or from_player_id.casefold()
-                    == str(row[MatchInviteFields.from_player_id]).casefold()
-                )
-                and (
-                    not to_player_id
-                    or to_player_id.casefold()
-                    == str(row[MatchInviteFields.to_player_id]).casefold()
-                )
-                and (
-                    not invite_status
-                    or invite_status.casefold()
-                    == str(row[MatchInviteFields.invite_status]).casefold()
-                )
-            ):
-                # Add matched record
-                existing_record = MatchInviteRecord(row)
-                existing_records.append(existing_record)
+            # Add matched record
+            existing_record = await self.get_record_from_row(row)
+            existing_records.append(existing_record)
         # Delete expired records
         for expired_record in expired_records:
             await self.delete_match_invite_record(expired_record)
@@ -29,6 +29,12 @@ class MatchResultInviteTable(BaseTable):
             constants.LEAGUE_DB_TAB_MATCH_RESULT_INVITE,
             MatchResultInviteRecord,
             MatchResultInviteFields,
+            indexed_fields=[
+                MatchResultInviteFields.record_id,
+                MatchResultInviteFields.to_team_id,
+                MatchResultInviteFields.from_team_id,
+            ],
+            expires_at_field=MatchResultInviteFields.invite_expires_at,
         )
 
     async def create_match_result_invite_record(
@@ -120,15 +126,25 @@ class MatchResultInviteTable(BaseTable):
         invite_status: str = None,
     ) -> list[MatchResultInviteRecord]:
         """Get existing Match Result Invite records
-        Note: Since this has to walk the whole table anyway, this is also used to clean up expired records
+        Note: This also cleans up the expired records (see `delete_expired_records`)
         """
+        # Sweep the whole table for expired records (throttled)
+        await self.delete_expired_records()
         # Prepare for expired records
         now = await general_helpers.epoch_timestamp()
         expired_records = []
-        # Walk the table
-        table = await self.get_table_data()
+        # Query the table (see `TableQuery`)
+        query = self.where(
+            record_id=record_id,
+            match_type=match_type,
+            from_team_id=from_team_id,
+            to_team_id=to_team_id,
+            from_player_id=from_player_id,
+            to_player_id=to_player_id,
+            invite_status=invite_status,
+        )
         existing_records = []
-        for row in table[1:]:  # skip header row
+        for row in await query.rows():
             # Check for expired record
             expiration_epoch = await general_helpers.epoch_timestamp(
                 row[MatchResultInviteFields.invite_expires_at]
@@ -137,47 +153,9 @@ class MatchResultInviteTable(BaseTable):
                 expired_record = MatchResultInviteRecord(row)
                 expired_records.append(expired_record)
                 continue
-            # Check for matched record
-            if (
-                (
-                    not record_id
-                    or str(record_id).casefold()
-                    == str(row[MatchResultInviteFields.record_id]).casefold()
-                )
-                and (
-                    not match_type
-                    or match_type.casefold()
-                    == str(row[MatchResultInviteFields.match_type]).casefold()
-                )
-                and (
-                    not from_team_id
-                    or str(from_team_id).casefold()
-                    == str(row[MatchResultInviteFields.from_team_id]).casefold()
-                )
-                and (
-                    not to_team_id
-                    or str(to_team_id).casefold()
-                    == str(row[MatchResultInviteFields.to_team_id]).casefold()
-                )
-                and (
-                    not from_player_id
-                    or from_player_id.casefold()
-                    == str(row[MatchResultInviteFields.from_player_id]).casefold()
-                )
-                and (
-                    not to_player_id
-                    or to_player_id.casefold()
-                    == str(row[MatchResultInviteFields.to_player_id]).casefold()
-                )
-                and (
-                    not invite_status
-                    or invite_status.casefold()
-                    == str(row[MatchResultInviteFields.status]).casefold()
-                )
-            ):
-                # Add matched record
-                existing_record = MatchResultInviteRecord(row)
-                existing_records.append(existing_record)
+            # Add matched record
+            existing_record = await self.get_record_from_row(row)
+            existing_records.append(existing_record)
         # Delete expired records
         for expired_record in expired_records:
             await self.delete_match_result_invite_record(expired_record)
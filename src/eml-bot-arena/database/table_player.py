@@ -22,7 +22,17 @@ class PlayerTable(BaseTable):
 
     def __init__(self, db: CoreDatabase):
         """Initialize the Player Table class"""
-        super().__init__(db, constants.LEAGUE_DB_TAB_PLAYER, PlayerRecord, PlayerFields)
+        super().__init__(
+            db,
+            constants.LEAGUE_DB_TAB_PLAYER,
+            PlayerRecord,
+            PlayerFields,
+            indexed_fields=[
+                PlayerFields.record_id,
+                PlayerFields.discord_id,
+                PlayerFields.player_name,
+            ],
+        )
 
     async def create_player_record(
         self, discord_id: str, player_name: str, region: str
@@ -66,33 +76,13 @@ class PlayerTable(BaseTable):
         region: str = None,
     ) -> list[PlayerRecord]:
         """Get existing Player records"""
-        table = await self.get_table_data()
-        existing_records = []
-        for row in table[1:]:  # skip header row
-            # Check for matched records
-            if (
-                (
-                    not record_id
-                    or str(record_id).casefold()
-                    == str(row[PlayerFields.record_id]).casefold()
-                )
-                and (
-                    not discord_id
-                    or str(discord_id).casefold()
-                    == str(row[PlayerFields.discord_id]).casefold()
-                )
-                and (
-                    not player_name
-                    or player_name.casefold()
-                    == str(row[PlayerFields.player_name]).casefold()
-                )
-                and (
-                    not region
-                    or region.casefold() == str(row[PlayerFields.region]).casefold()
-                )
-            ):
-                # Add matched record
-                existing_record = PlayerRecord(row)
-                existing_records.append(existing_record)
+        # Query the table (see `TableQuery`)
+        query = self.where(
+            record_id=record_id,
+            discord_id=discord_id,
+            player_name=player_name,
+            region=region,
+        )
+        existing_records = await query.all()
         # Return matched records
         return existing_records
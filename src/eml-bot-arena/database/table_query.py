@@ -0,0 +1,110 @@
+from database.records import BaseRecord
+from enum import IntEnum
+from utils import general_helpers
+import logging
+
+logger = logging.getLogger(__name__)
+
+"""
+Table Query
+"""
+
+
+class TableQuery:
+    """A query on one table, built with `BaseTable.where()`
+
+    - `where(field_name=value, ...)`: Match a field (casefolded), `None` is ignored
+    - `between(field, after, before)`: Match an ISO timestamp field by epoch range
+    - `rows()`, `all()`, `first()`, `exists()`, `count()`: Run the query
+
+    The planner looks up every matched field that has an index, and walks only
+    the shortest of those lists, checking the other predicates on it. Without an
+    indexed field, the whole table is walked. Rows keep the table order.
+    """
+
+    def __init__(self, table, fields: type[IntEnum]):
+        self._table = table
+        self._fields = fields
+        self._equals: dict[IntEnum, int | float | str] = {}
+        self._ranges: list[tuple[IntEnum, int | None, int | None]] = []
+
+    def where(self, **criteria: int | float | str | None) -> "TableQuery":
+        """Match fields (by name) to values, values that are not set are ignored"""
+        for name, value in criteria.items():
+            if name not in self._fields.__members__:
+                raise ValueError(f"Unknown field '{name}' for {self._table.table_name}")
+            if value:
+                self._equals[self._fields[name]] = value
+        return self
+
+    def between(
+        self, field: IntEnum, after: int = None, before: int = None
+    ) -> "TableQuery":
+        """Match an ISO timestamp field that is after and/or before epoch times"""
+        if after or before:
+            self._ranges.append((field, after, before))
+        return self
+
+    async def _plan(
+        self, table: list[list[int | float | str | None]]
+    ) -> tuple[list[list[int | float | str | None]], dict]:
+        """Get the shortest list of rows to walk, and the predicates left to check"""
+        equals = dict(self._equals)
+        table_index = await self._table.get_table_index(table)
+        if not table_index:
+            return table[1:], equals  # skip header row
+        best_field, best_positions = None, None
+        for field, value in equals.items():
+            if field not in table_index.columns:
+                continue
+            positions = table_index.lookup(field, value)
+            if best_positions is None or len(positions) < len(best_positions):
+                best_field, best_positions = field, positions
+        if best_positions is None:
+            return table[1:], equals  # skip header row
+        del equals[best_field]
+        return [table[position] for position in best_positions], equals
+
+    async def _matches(self, row: list[int | float | str | None], equals: dict) -> bool:
+        """Check a row against the predicates"""
+        for field, value in equals.items():
+            if str(value).casefold() != str(row[field]).casefold():
+                return False
+        for field, after, before in self._ranges:
+            epoch = await general_helpers.epoch_timestamp(row[field])
+            if after and not int(after) < epoch:
+                return False
+            if before and not int(before) > epoch:
+                return False
+        return True
+
+    async def rows(self, limit: int = None) -> list[list[int | float | str | None]]:
+        """Get the matching rows (at most `limit`)"""
+        table = await self._table.get_table_data()
+        candidates, equals = await self._plan(table)
+        matched_rows = []
+        for row in candidates:
+            if await self._matches(row, equals):
+                matched_rows.append(row)
+                if limit and len(matched_rows) >= limit:
+                    break
+        return matched_rows
+
+    async def all(self) -> list[BaseRecord]:
+        """Get the matching records"""
+        return [await self._table.get_record_from_row(row) for row in await self.rows()]
+
+    async def first(self) -> BaseRecord | None:
+        """Get the first matching record, if any"""
+        matched_rows = await self.rows(limit=1)
+        if not matched_rows:
+            return None
+        return await self._table.get_record_from_row(matched_rows[0])
+
+    async def exists(self) -> bool:
+        """Check if any record matches"""
+        return bool(await self.rows(limit=1))
+
+    async def count(self) -> int:
+        """Count the matching records"""
+        return len(await self.rows())
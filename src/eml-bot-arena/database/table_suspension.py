@@ -23,7 +23,12 @@ class SuspensionTable(BaseTable):
     def __init__(self, db: CoreDatabase):
         """Initialize the Suspension Table class"""
         super().__init__(
-            db, constants.LEAGUE_DB_TAB_SUSPENSION, SuspensionRecord, SuspensionFields
+            db,
+            constants.LEAGUE_DB_TAB_SUSPENSION,
+            SuspensionRecord,
+            SuspensionFields,
+            indexed_fields=[SuspensionFields.record_id, SuspensionFields.player_id],
+            expires_at_field=SuspensionFields.expires_at,
         )
 
     async def create_suspension_record(
@@ -79,15 +84,20 @@ class SuspensionTable(BaseTable):
     ) -> list[SuspensionRecord]:
         """Get an existing Suspension record
 
-        Note: Since this has to walk the whole table anyway, this is also used to clean up expired records
+        Note: This also cleans up the expired records (see `delete_expired_records`)
         """
+        # Sweep the whole table for expired records (throttled)
+        await self.delete_expired_records()
         # Prepare for expired records
         now = await general_helpers.epoch_timestamp()
         expired_records = []
-        # Walk the table
-        table = await self.get_table_data()
+        # Query the table (see `TableQuery`)
+        query = self.where(record_id=record_id, player_id=player_id)
+        query.between(
+            SuspensionFields.expires_at, after=expires_after, before=expires_before
+        )
         existing_records = []
-        for row in table[1:]:  # skip header row
+        for row in await query.rows():
             # Check for expired record
             expiration_epoch = await general_helpers.epoch_timestamp(
                 row[SuspensionFields.expires_at]
@@ -96,24 +106,9 @@ class SuspensionTable(BaseTable):
                 expired_record = SuspensionRecord(row)
                 expired_records.append(expired_record)
                 continue
-            # Check for matched records
-            if (
-                (
-                    not record_id
-                    or str(record_id).casefold()
-                    == str(row[SuspensionFields.record_id]).casefold()
-                )
-                and (
-                    not player_id
-                    or str(player_id).casefold()
-                    == str(row[SuspensionFields.player_id]).casefold()
-                )
-                and (not expires_before or int(expires_before) > int(expiration_epoch))
-                and (not expires_after or int(expires_after) < int(expiration_epoch))
-            ):
-                # Add the matching record to the list
-                existing_record = SuspensionRecord(row)
-                existing_records.append(existing_record)
+            # Add matched record
+            existing_record = await self.get_record_from_row(row)
+            existing_records.append(existing_record)
         # Remove expired records from the database
         for record in expired_records:
             await self.delete_suspension_record(record)
@@ -23,7 +23,13 @@ class TeamTable(BaseTable):
 
     def __init__(self, db: CoreDatabase):
         """Initialize the Team Table class"""
-        super().__init__(db, constants.LEAGUE_DB_TAB_TEAM, TeamRecord, TeamFields)
+        super().__init__(
+            db,
+            constants.LEAGUE_DB_TAB_TEAM,
+            TeamRecord,
+            TeamFields,
+            indexed_fields=[TeamFields.record_id, TeamFields.team_name],
+        )
 
     async def create_team_record(self, team_name: str, vw_region: str) -> TeamRecord:
         """Create a new Team record"""
@@ -54,22 +60,8 @@ class TeamTable(BaseTable):
         self, record_id: str = None, team_name: str = None
     ) -> list[TeamRecord]:
         """Get an existing Team record"""
-        # Walk the table
-        table = await self.get_table_data()
-        existing_records = []
-        for row in table[1:]:  # skip header row
-            # Check for matched records
-            if (
-                not record_id
-                or str(record_id).casefold()
-                == str(row[TeamFields.record_id]).casefold()
-            ) and (
-                not team_name
-                or str(team_name).casefold()
-                == str(row[TeamFields.team_name]).casefold()
-            ):
-                # Add matched record
-                existing_record = TeamRecord(row)
-                existing_records.append(existing_record)
+        # Query the table (see `TableQuery`)
+        query = self.where(record_id=record_id, team_name=team_name)
+        existing_records = await query.all()
         # Return matched records
         return existing_records
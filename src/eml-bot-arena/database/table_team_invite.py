@@ -25,7 +25,16 @@ class TeamInviteTable(BaseTable):
     def __init__(self, db: CoreDatabase):
         """Initialize the Invite Table class"""
         super().__init__(
-            db, constants.LEAGUE_DB_TAB_TEAM_INVITE, TeamInviteRecord, TeamInviteFields
+            db,
+            constants.LEAGUE_DB_TAB_TEAM_INVITE,
+            TeamInviteRecord,
+            TeamInviteFields,
+            indexed_fields=[
+                TeamInviteFields.record_id,
+                TeamInviteFields.to_player_id,
+                TeamInviteFields.from_team_id,
+            ],
+            expires_at_field=TeamInviteFields.invite_expires_at,
         )
 
     async def create_team_invite_record(
@@ -84,15 +93,22 @@ class TeamInviteTable(BaseTable):
         to_player_id: str = None,
     ) -> list[TeamInviteRecord]:
         """Get an existing Invite record
-        Note: Since this has to walk the whole table anyway, this is also used to clean up expired records
+        Note: This also cleans up the expired records (see `delete_expired_records`)
         """
+        # Sweep the whole table for expired records (throttled)
+        await self.delete_expired_records()
         # Prepare for expired records
         now = await general_helpers.epoch_timestamp()
         expired_records = []
-        # Walk the table
-        table = await self.get_table_data()
+        # Query the table (see `TableQuery`)
+        query = self.where(
+            record_id=record_id,
+            from_team_id=from_team_id,
+            from_player_id=from_player_id,
+            to_player_id=to_player_id,
+        )
         existing_records = []
-        for row in table[1:]:  # skip header row
+        for row in await query.rows():
             # Check for expired record
             expiration_epoch = await general_helpers.epoch_timestamp(
                 row[TeamInviteFields.invite_expires_at]
@@ -101,32 +117,9 @@ class TeamInviteTable(BaseTable):
                 expired_record = TeamInviteRecord(row)
                 expired_records.append(expired_record)
                 continue
-            # Check for matched records
-            if (
-                (
-                    not record_id
-                    or str(record_id).casefold()
-                    == str(row[TeamInviteFields.record_id]).casefold()
-                )
-                and (
-                    not from_team_id
-                    or str(from_team_id).casefold()
-                    == str(row[TeamInviteFields.from_team_id]).casefold()
-                )
-                and (
-                    not from_player_id
-                    or from_player_id.casefold()
-                    == str(row[TeamInviteFields.from_player_id]).casefold()
-                )
-                and (
-                    not to_player_id
-                    or to_player_id.casefold()
-                    == str(row[TeamInviteFields.to_player_id]).casefold()
-                )
-            ):
-                # Add matched record
-                existing_record = TeamInviteRecord(row)
-                existing_records.append(existing_record)
+            # Add matched record
+            existing_record = await self.get_record_from_row(row)
+            existing_records.append(existing_record)
         # Delete expired records
         for expired_record in expired_records:
             await self.delete_team_invite_record(expired_record)
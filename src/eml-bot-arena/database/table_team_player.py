@@ -24,7 +24,15 @@ class TeamPlayerTable(BaseTable):
     def __init__(self, db: CoreDatabase):
         """Initialize the TeamPlayer Table class"""
         super().__init__(
-            db, constants.LEAGUE_DB_TAB_TEAM_PLAYER, TeamPlayerRecord, TeamPlayerFields
+            db,
+            constants.LEAGUE_DB_TAB_TEAM_PLAYER,
+            TeamPlayerRecord,
+            TeamPlayerFields,
+            indexed_fields=[
+                TeamPlayerFields.record_id,
+                TeamPlayerFields.player_id,
+                TeamPlayerFields.team_id,
+            ],
         )
 
     async def create_team_player_record(
@@ -71,30 +79,8 @@ class TeamPlayerTable(BaseTable):
         self, record_id: str = None, team_id: str = None, player_id: str = None
     ) -> list[TeamPlayerRecord]:
         """Get existing TeamPlayer records"""
-        # Walk the table
-        table = await self.get_table_data()
-        existing_records = []
-        for row in table[1:]:  # skip header row
-            # Check for matched records
-            if (
-                (
-                    not record_id
-                    or str(record_id).casefold()
-                    == str(row[TeamPlayerFields.record_id]).casefold()
-                )
-                and (
-                    not team_id
-                    or str(team_id).casefold()
-                    == str(row[TeamPlayerFields.team_id]).casefold()
-                )
-                and (
-                    not player_id
-                    or str(player_id).casefold()
-                    == str(row[TeamPlayerFields.player_id]).casefold()
-                )
-            ):
-                # Add matched record
-                existing_record = TeamPlayerRecord(row)
-                existing_records.append(existing_record)
+        # Query the table (see `TableQuery`)
+        query = self.where(record_id=record_id, team_id=team_id, player_id=player_id)
+        existing_records = await query.all()
         # Return matched records
         return existing_records
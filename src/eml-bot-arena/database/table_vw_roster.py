@@ -3,10 +3,10 @@ from database.database_core import CoreDatabase
 from database.enums import Bool
 from database.fields import VwRosterFields
 from database.records import VwRosterRecord
+import asyncio
 import constants
 import errors.database_errors as DbErrors
 import gspread
-import time
 import utils.general_helpers as general_helpers
 import logging
 
@@ -27,10 +27,12 @@ class VwRosterTable(BaseTable):
     def __init__(self, db: CoreDatabase):
         """Initialize the Match Table class"""
         super().__init__(
-            db, constants.LEAGUE_DB_TAB_VW_ROSTER, VwRosterRecord, VwRosterFields
-        )
-        self._tab: gspread.Worksheet = db.get_table_worksheet(
-            constants.LEAGUE_DB_TAB_VW_ROSTER
+            db,
+            constants.LEAGUE_DB_TAB_VW_ROSTER,
+            VwRosterRecord,
+            VwRosterFields,
+            indexed_fields=[VwRosterFields.record_id, VwRosterFields.team],
+            keep_history=False,
         )
 
     async def create_vw_roster_record(
@@ -129,31 +131,9 @@ class VwRosterTable(BaseTable):
         region: str = None,
     ) -> list[VwRosterRecord]:
         """Get existing VwRoster records"""
-        # Walk the table
-        table = await self.get_table_data()
-        existing_records = []
-        for row in table[1:]:  # skip header row
-            # Check for matched record
-            if (
-                (
-                    not record_id
-                    or str(record_id).casefold()
-                    == str(row[VwRosterFields.record_id]).casefold()
-                )
-                and (
-                    not team_name
-                    or str(team_name).casefold()
-                    == str(row[VwRosterFields.team]).casefold()
-                )
-                and (
-                    not region
-                    or str(region).casefold()
-                    == str(row[VwRosterFields.region]).casefold()
-                )
-            ):
-                # Add matched record
-                existing_record = VwRosterRecord(row)
-                existing_records.append(existing_record)
+        # Query the table (see `TableQuery`)
+        query = self.where(record_id=record_id, team=team_name, region=region)
+        existing_records = await query.all()
         # Return matched records
         return existing_records
 
@@ -161,11 +141,8 @@ class VwRosterTable(BaseTable):
         self, roster_table: list[list[int | float | str | None]]
     ) -> None:
         """Write a new list of VwRoster records to the database"""
-        logger.debug("[ 2 write, 0 read ] UPDATE of vwRoster")
         try:
-            self._tab.clear()
-            time.sleep(constants.LEAGUE_DB_QUEUE_WRITE_DELAY_SECONDS)
-            self._tab.append_rows(roster_table)
-            time.sleep(constants.LEAGUE_DB_QUEUE_WRITE_DELAY_SECONDS)
+            await self._db.replace_table(self.table_name, roster_table)
+            await asyncio.sleep(constants.LEAGUE_DB_QUEUE_WRITE_DELAY_SECONDS)
         except Exception as error:
             logger.exception(f"    Failed to commit write: {error}")
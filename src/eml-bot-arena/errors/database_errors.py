@@ -40,6 +40,18 @@ class EmlWorksheetWriteError(EmlDatabaseException):
 ### Database General ###
 
 
+class EmlDatabaseUnavailable(EmlDatabaseException):
+    def __init__(self, message="Database is unavailable"):
+        self.message = message
+        super().__init__(self.message)
+
+
+class EmlWriteAheadLogError(EmlDatabaseException):
+    def __init__(self, message="Error writing to the write-ahead log"):
+        self.message = message
+        super().__init__(self.message)
+
+
 class EmlRecordNotFound(EmlDatabaseException):
     def __init__(self, message="Record not found"):
         self.message = message
@@ -1,6 +1,13 @@
 import bot_commands.show_matches
+from database.backend_gspread import GspreadBackend
+from database.backend_mirrored import MirroredSqliteBackend
+from database.backend_sqlite import SqliteBackend
 from database.database_core import CoreDatabase
 from database.database_full import FullDatabase
+from database.database_replicator import DatabaseReplicator
+from database.database_session import DatabaseSession
+from database.enums import CircuitStates, StorageBackends
+from database.history_archiver import HistoryArchiver
 import bot_commands
 import bot_helpers
 import constants
@@ -10,11 +17,17 @@ import dotenv
 import gspread
 import os
 import json
+import signal
+import asyncio
+import time
 import logging
 from datetime import datetime, timezone
 import logging
 from utils import general_helpers
 
+# Startup timings (see bootstrap_database)
+BOOT_STARTED_AT = time.perf_counter()
+
 # Initialize logger
 logger = logging.getLogger("")
 logger.setLevel(logging.INFO)
@@ -49,6 +62,21 @@ SPREADSHEET_URL = os.environ.get("SPREADSHEET_URL")
 SPREADSHEET_URL = (
     SPREADSHEET_URL if SPREADSHEET_URL else constants.LINK_DB_SPREADSHEET_URL
 )
+DB_WRITE_AHEAD_LOG_FILE = os.environ.get("DB_WRITE_AHEAD_LOG_FILE")
+DB_WRITE_AHEAD_LOG_FILE = f'{DB_WRITE_AHEAD_LOG_FILE if DB_WRITE_AHEAD_LOG_FILE else os.path.join(SECRETS_DIR, "db_write_ahead_log.jsonl")}'
+DATABASE_BACKEND = os.environ.get("DATABASE_BACKEND")
+DATABASE_BACKEND = StorageBackends(
+    DATABASE_BACKEND if DATABASE_BACKEND else StorageBackends.GSPREAD
+)
+SHEETS_API_URL = os.environ.get("SHEETS_API_URL")
+SQLITE_DATABASE_FILE = os.environ.get("SQLITE_DATABASE_FILE")
+SQLITE_DATABASE_FILE = f'{SQLITE_DATABASE_FILE if SQLITE_DATABASE_FILE else os.path.join(SECRETS_DIR, "eml_database.sqlite3")}'
+COMMAND_TREE_HASH_FILE = os.environ.get("COMMAND_TREE_HASH_FILE")
+COMMAND_TREE_HASH_FILE = f'{COMMAND_TREE_HASH_FILE if COMMAND_TREE_HASH_FILE else os.path.join(SECRETS_DIR, "command_tree_hash.txt")}'
+DB_CACHE_SNAPSHOT_FILE = os.environ.get("DB_CACHE_SNAPSHOT_FILE")
+DB_CACHE_SNAPSHOT_FILE = f'{DB_CACHE_SNAPSHOT_FILE if DB_CACHE_SNAPSHOT_FILE else os.path.join(SECRETS_DIR, "db_cache_snapshot.sqlite3")}'
+DB_HISTORY_ARCHIVE_DIR = os.environ.get("DB_HISTORY_ARCHIVE_DIR")
+DB_HISTORY_ARCHIVE_DIR = f'{DB_HISTORY_ARCHIVE_DIR if DB_HISTORY_ARCHIVE_DIR else os.path.join(SECRETS_DIR, "history_archive")}'
 
 # Logger - File
 now = datetime.now(timezone.utc)
@@ -69,6 +97,13 @@ config_dict = {
     "SECRETS_DIR": SECRETS_DIR,
     "SCRIPTS_DIR": THIS_DIR,
     "LOGGER_FILE": logfile_path,
+    "DB_WRITE_AHEAD_LOG_FILE": DB_WRITE_AHEAD_LOG_FILE,
+    "DATABASE_BACKEND": DATABASE_BACKEND,
+    "SQLITE_DATABASE_FILE": SQLITE_DATABASE_FILE,
+    "DB_CACHE_SNAPSHOT_FILE": DB_CACHE_SNAPSHOT_FILE,
+    "COMMAND_TREE_HASH_FILE": COMMAND_TREE_HASH_FILE,
+    "DB_HISTORY_ARCHIVE_DIR": DB_HISTORY_ARCHIVE_DIR,
+    "SHEETS_API_URL": SHEETS_API_URL,
 }
 logger.info(
     "\n".join(
@@ -79,11 +114,36 @@ logger.info(
     )
 )
 
-# Google Sheets "Database"
-# gs_client = gspread.service_account(GOOGLE_CREDENTIALS_FILE, http_client=gspread.BackOffHTTPClient)  # For 429 backoff, but breaks on 403
-gs_client = gspread.service_account(GOOGLE_CREDENTIALS_FILE)
-gs_client.set_timeout(constants.LEAGUE_DB_RESPONSE_TIMEOUT_SECONDS)
-database_core = CoreDatabase(gs_client, SPREADSHEET_URL)
+if DATABASE_BACKEND == StorageBackends.SQLITE:
+    # SQLite "Database" (e.g. local runs and benchmarks)
+    storage_backend = SqliteBackend(SQLITE_DATABASE_FILE)
+elif DATABASE_BACKEND == StorageBackends.GSPREAD_FAKE:
+    # In-memory fake of Google Sheets (e.g. offline runs and benchmarks)
+    # note: imported here, test doubles are not loaded in production
+    from database.gspread_fake import FakeGspreadClient
+
+    storage_backend = GspreadBackend(FakeGspreadClient(), SPREADSHEET_URL)
+else:
+    # Google Sheets "Database"
+    # note: 429 and 5xx responses are retried by CoreDatabase, not gspread.BackOffHTTPClient
+    if SHEETS_API_URL:
+        # Local stand-in for the Sheets API (see database/sheets_stub_server.py)
+        from database.sheets_stub_server import stub_client
+
+        gs_client = stub_client(SHEETS_API_URL)
+    else:
+        gs_client = gspread.service_account(GOOGLE_CREDENTIALS_FILE)
+    gs_client.set_timeout(constants.LEAGUE_DB_RESPONSE_TIMEOUT_SECONDS)
+    storage_backend = GspreadBackend(gs_client, SPREADSHEET_URL)
+    if DATABASE_BACKEND == StorageBackends.SQLITE_MIRRORED:
+        # SQLite "Database", mirrored to Google Sheets for staff
+        storage_backend = MirroredSqliteBackend(SQLITE_DATABASE_FILE, storage_backend)
+database_core = CoreDatabase(
+    storage_backend, DB_WRITE_AHEAD_LOG_FILE, DB_CACHE_SNAPSHOT_FILE
+)
+database_replicator = None
+if isinstance(storage_backend, MirroredSqliteBackend):
+    database_replicator = DatabaseReplicator(database_core, storage_backend)
 db = FullDatabase(database_core)
 
 # Discord Intents
@@ -92,10 +152,167 @@ intents.messages = True
 intents.members = True
 intents.message_content = True
 
+
+class EmlCommandTree(discord.app_commands.CommandTree):
+    """Command tree that opens a `DatabaseSession` for every interaction"""
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        # Commands that arrive during startup wait for the database
+        if not database_ready.is_set():
+            try:
+                await asyncio.wait_for(
+                    database_ready.wait(), constants.DISCORD_STARTUP_WAIT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                await interaction.response.send_message(
+                    "The bot is still starting up, please try again in a moment.",
+                    ephemeral=True,
+                )
+                return False
+        # Each table is read at most once per command (see DatabaseSession)
+        DatabaseSession.open()
+        return True
+
+
+class EmlBot(commands.Bot):
+    """Bot that opens the database while it logs in, and closes it cleanly"""
+
+    async def setup_hook(self):
+        # Runs after the login, while the gateway connects and commands sync
+        bot_state["bootstrap"] = asyncio.create_task(
+            bootstrap_database(), name="eml-db-bootstrap"
+        )
+        # Close cleanly when the host stops the bot (e.g. `docker stop`, systemd)
+        try:
+            asyncio.get_running_loop().add_signal_handler(
+                signal.SIGTERM, self.on_sigterm
+            )
+        except NotImplementedError:
+            # no signal handlers on Windows, Ctrl+C still closes the bot
+            pass
+
+    def on_sigterm(self):
+        logger.warning("SIGTERM received, closing")
+        if not bot_state["closing"]:
+            bot_state["closing"] = asyncio.create_task(
+                self.close(), name="eml-bot-close"
+            )
+
+    async def close(self):
+        # Commit the write queue, and save the cache snapshot for the next start
+        try:
+            if database_replicator:
+                await database_replicator.close()
+            await history_archiver.close()
+            await database_core.close()
+        finally:
+            # log out of Discord, even if the database did not close cleanly
+            await super().close()
+
+
 # Discord Bot
 # bot = commands.Bot(command_prefix=".", intents=intents)
-bot = commands.Bot(command_prefix=".", intents=discord.Intents.all())
-bot_state = {"synced": False}
+bot = EmlBot(command_prefix=".", intents=discord.Intents.all(), tree_cls=EmlCommandTree)
+bot_state = {"synced": False, "bootstrap": None, "closing": None}
+database_ready = asyncio.Event()
+
+
+async def bootstrap_database():
+    """Serve the cache snapshot, then open the database and create its missing tables
+
+    Runs as a task alongside the Discord login. `database_ready` is set as soon as
+    a snapshot with tables in it is loaded, and the backend is opened in the
+    background (through the circuit breaker, see `CoreDatabase._call_backend`).
+    Without a snapshot, it is set once the backend is opened and its tables exist.
+    """
+    timings = {}
+    phase_started_at = time.perf_counter()
+
+    def end_phase(phase: str):
+        nonlocal phase_started_at
+        timings[phase] = round(time.perf_counter() - phase_started_at, 3)
+        phase_started_at = time.perf_counter()
+
+    # Serve the cache snapshot of the last run while it is read again
+    # note: without one, tables are read on first use
+    loaded = await database_core.load_cache_snapshot()
+    end_phase("snapshot")
+    # Commit any writes replayed from the write-ahead log
+    database_core.start_write_flusher()
+    # Mirror the SQLite database to Google Sheets
+    if database_replicator:
+        database_replicator.start()
+    # Archive old history rows (daily)
+    history_archiver.start()
+    if loaded:
+        database_ready.set()
+        timings["ready"] = round(time.perf_counter() - BOOT_STARTED_AT, 3)
+    while True:
+        try:
+            # Open the spreadsheet (or the SQLite database)
+            await database_core.connect()
+            end_phase("connect")
+            # Look up every table, and create the missing ones
+            await database_core.ensure_tables()
+            end_phase("tables")
+            if not database_ready.is_set():
+                database_ready.set()
+                timings["ready"] = round(time.perf_counter() - BOOT_STARTED_AT, 3)
+            # Fill the cache, if there was no snapshot
+            if not loaded:
+                await database_core.refresh_tables()
+            end_phase("cache")
+            break
+        except Exception as error:
+            logger.warning(f"Database not opened yet, retrying: {error}")
+            await asyncio.sleep(constants.LEAGUE_DB_CIRCUIT_PROBE_INTERVAL_SECONDS)
+    timings["since_start"] = round(time.perf_counter() - BOOT_STARTED_AT, 3)
+    logger.info(
+        "\n".join(["Database opened (seconds):", json.dumps(timings, indent=4)])
+    )
+
+
+async def announce_database_status(state: CircuitStates, message: str):
+    """Post database degraded mode (and recovery) to the debug logs channel"""
+    color = discord.Color.green()
+    if state == CircuitStates.OPEN:
+        color = discord.Color.red()
+    debug_embed = discord.Embed(description=message, color=color)
+    debug_embed.add_field(name="Database", value=state)
+    for guild in bot.guilds:
+        if GUILD_ID and str(guild.id) != str(GUILD_ID):
+            continue
+        debug_channel = discord.utils.get(
+            guild.channels, name=constants.DISCORD_CHANNEL_BOT_DEBUG_LOGS
+        )
+        if debug_channel:
+            await debug_channel.send(embed=debug_embed)
+
+
+database_core.add_circuit_listener(announce_database_status)
+
+
+async def announce_history_archive(summary: dict):
+    """Post the result of a history archival run to the debug logs channel"""
+    archived_rows = sum(summary["archived_rows"].values())
+    debug_embed = discord.Embed(
+        description=f"Archived {archived_rows} history row(s) to {DB_HISTORY_ARCHIVE_DIR}",
+        color=discord.Color.blue(),
+    )
+    debug_embed.add_field(name="Cells reclaimed", value=summary["cells_reclaimed"])
+    for guild in bot.guilds:
+        if GUILD_ID and str(guild.id) != str(GUILD_ID):
+            continue
+        debug_channel = discord.utils.get(
+            guild.channels, name=constants.DISCORD_CHANNEL_BOT_DEBUG_LOGS
+        )
+        if debug_channel:
+            await debug_channel.send(embed=debug_embed)
+
+
+history_archiver = HistoryArchiver(
+    database_core, DB_HISTORY_ARCHIVE_DIR, announce_history_archive
+)
 
 
 @bot.event
@@ -104,18 +321,24 @@ async def on_ready():
     if bot_state["synced"]:
         return
     bot_state["synced"] = True
-    # Sync Commands
-    synced_commands = await bot.tree.sync()
-    # Log Synced Commands
-    command_list = sorted([command.name for command in synced_commands])
     logger.info(
-        "\n".join(
-            [
-                f"Synchronized {len(synced_commands)} command(s):",
-                json.dumps(sorted(command_list), indent=4),
-            ]
-        )
+        f"Connected to Discord after {time.perf_counter() - BOOT_STARTED_AT:.3f}s"
+        f" (database ready: {database_ready.is_set()})"
     )
+    # Sync Commands (only if they changed since the last sync)
+    sync_started_at = time.perf_counter()
+    sync_result = await bot_helpers.sync_command_tree(bot.tree, COMMAND_TREE_HASH_FILE)
+    # Log Synced Commands
+    if sync_result["synced"]:
+        logger.info(
+            "\n".join(
+                [
+                    f"Synchronized {len(sync_result['commands'])} command(s)"
+                    f" in {time.perf_counter() - sync_started_at:.3f}s:",
+                    json.dumps(sync_result["commands"], indent=4),
+                ]
+            )
+        )
     logger.info("Initialization Complete. Waiting for commands.")
 
 
@@ -821,6 +1044,22 @@ async def bot_admin_generate_uuid(interaction: discord.Interaction):
         await bot_commands.admin_generate_uuid(database=db, interaction=interaction)
 
 
+@bot.tree.command(name=f"{BOT_PREFIX}{constants.COMMAND_ZADMINSYNCCOMMANDS}")
+async def bot_admin_sync_commands(interaction: discord.Interaction):
+    """Sync the slash commands to Discord"""
+    await bot_helpers.command_log({**locals()})
+    if await bot_helpers.command_is_allowed(
+        database=db,
+        interaction=interaction,
+        require_admin=True,
+        skip_channel=True,
+        skip_db=True,
+    ):
+        await bot_commands.admin_sync_commands(
+            database=db, interaction=interaction, hash_file=COMMAND_TREE_HASH_FILE
+        )
+
+
 @bot.tree.command(name=f"{BOT_PREFIX}{constants.COMMAND_ZADMINSUSPEND}")
 async def bot_admin_suspend_player(
     interaction: discord.Interaction,
@@ -45,18 +45,14 @@ async def update_roster_view(
     ]
 
     player_name_dict = {}
-    for player in all_players:
-        if all_players.index(player) == 0:
-            continue
+    for player in all_players[1:]:  # skip header row
         player_id = player[PlayerFields.record_id]
         player_name = player[PlayerFields.player_name]
         player_name_dict[player_id] = player_name
 
     team_name_dict = {}
     team_region_dict = {}
-    for team in all_teams:
-        if all_teams.index(team) == 0:
-            continue
+    for team in all_teams[1:]:  # skip header row
         team_id = team[TeamFields.record_id]
         team_name = team[TeamFields.team_name]
         team_name_dict[team_id] = team_name
@@ -64,9 +60,7 @@ async def update_roster_view(
         team_region_dict[team_id] = team_region
 
     roster_dict = {}
-    for team_player in all_team_players:
-        if all_team_players.index(team_player) == 0:
-            continue
+    for team_player in all_team_players[1:]:  # skip header row
         # Gather info about this player and team
         team_id = team_player[TeamPlayerFields.team_id]
         player_id = team_player[TeamPlayerFields.player_id]
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# The bot is not installed as a package, its modules import each other from src/
+SRC_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "eml-bot-arena"
+)
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
@@ -0,0 +1,64 @@
+from database.backend_gspread import GspreadBackend
+from database.gspread_fake import FakeGspreadClient
+import unittest
+
+SPREADSHEET_URL = "https://docs.google.com/spreadsheets/d/fake"
+
+
+class TestGspreadBackend(unittest.TestCase):
+    def setUp(self):
+        self.client = FakeGspreadClient()
+        self.backend = GspreadBackend(self.client, SPREADSHEET_URL)
+        self.backend.ensure_tables({"Example": ["record_id", "value"]})
+        rows = [[f"r{i}", str(i)] for i in range(1, 6)]
+        self.backend.append_rows("Example", rows)
+        self.backend.read_tables(["Example"])
+        self.worksheet = self.client.spreadsheet._worksheets["Example"]
+        self.client.reset_calls()
+
+    def test_adjacent_rows_are_deleted_as_one_range(self):
+        deletes = [("Example", "r2"), ("Example", "r3"), ("Example", "r5")]
+        missing = self.backend.delete_rows(deletes + [("Example", "r9")])
+        self.assertEqual(missing, {("Example", "r9")})
+        self.assertEqual(self.worksheet._values()[1:], [["r1", "1"], ["r4", "4"]])
+        self.assertEqual(self.client.calls["batch_update"], 1)
+        self.backend.update_rows([("Example", ["r4", "four"])])
+        self.assertEqual(self.worksheet._values()[2], ["r4", "four"])
+
+    def test_unknown_record_ids_are_indexed_with_one_read(self):
+        self.assertEqual(self.backend.get_unindexed_tables([("Example", "r1")]), [])
+        # a row added by hand is not in the index
+        self.worksheet.append_rows([["r9", "9"]])
+        targets = [("Example", "r9"), ("Example", "r2")]
+        self.assertEqual(self.backend.get_unindexed_tables(targets), ["Example"])
+        self.backend.index_tables(["Example"])
+        self.assertEqual(self.backend.get_unindexed_tables(targets), [])
+        self.backend.delete_rows(targets)
+        self.assertEqual(self.client.calls["values_batch_get"], 1)
+        self.assertEqual(self.client.calls["col_values"], 0)
+        self.assertEqual(
+            [row[0] for row in self.worksheet._values()[1:]], ["r1", "r3", "r4", "r5"]
+        )
+
+    def test_rows_appended_out_of_place_drop_the_index(self):
+        self.worksheet.append_rows([["r9", "9"]])
+        self.backend.append_rows("Example", [["r6", "6"]])
+        self.assertEqual(
+            self.backend.get_unindexed_tables([("Example", "r1")]), ["Example"]
+        )
+        self.backend.index_tables(["Example"])
+        self.backend.update_rows([("Example", ["r6", "six"])])
+        self.assertEqual(self.worksheet._values()[-1], ["r6", "six"])
+
+    def test_first_rows_and_columns(self):
+        self.assertEqual(
+            self.backend.read_first_rows("Example", 3),
+            [["record_id", "value"], ["r1", "1"], ["r2", "2"]],
+        )
+        columns = self.backend.read_columns(["Example"], 1)
+        self.assertEqual(columns["Example"], ["value", "1", "2", "3", "4", "5"])
+        self.assertEqual(self.client.calls["values_batch_get"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+from database.backend_gspread import GspreadBackend
+from database.backend_mirrored import MirroredSqliteBackend
+from database.database_core import CoreDatabase
+from database.database_replicator import DatabaseReplicator
+from database.gspread_fake import FakeGspreadClient
+from unittest import mock
+import constants
+import unittest
+
+SPREADSHEET_URL = "https://docs.google.com/spreadsheets/d/fake"
+FIELDS = ["record_id", "created_at", "updated_at", "value"]
+
+
+class TestReplication(unittest.IsolatedAsyncioTestCase):
+    """A `MirroredSqliteBackend` mirrored to a `FakeGspreadClient`"""
+
+    async def asyncSetUp(self):
+        patcher = mock.patch.object(constants, "LEAGUE_DB_RETRY_BASE_DELAY_SECONDS", 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = FakeGspreadClient()
+        self.mirror = GspreadBackend(self.client, SPREADSHEET_URL)
+        self.backend = MirroredSqliteBackend(":memory:", self.mirror)
+        self.db = CoreDatabase(self.backend)
+        self.replicator = DatabaseReplicator(self.db, self.backend)
+        self.backend.ensure_table("Example", FIELDS)
+        self.db.register_table("Example")
+        await self.replicator.ensure_mirror_tables()
+        rows = [[f"r{i}", "t0", "t0", str(i)] for i in range(1, 5)]
+        self.backend.append_rows("Example", rows)
+        await self.replicator.replicate_changes()
+        # for the edits "by hand" below
+        self.mirror.index_tables(["Example"])
+        self.client.reset_calls()
+
+    async def asyncTearDown(self):
+        await self.replicator.close()
+        await self.db.close()
+
+    def local_ids(self) -> list[str]:
+        return self.backend.get_record_ids("Example")[1:]
+
+    def mirror_ids(self) -> list[str]:
+        worksheet = self.client.spreadsheet._worksheets["Example"]
+        return [row[0] for row in worksheet._values()[1:]]
+
+    async def test_changes_are_sent_within_the_mirror_quota(self):
+        self.backend.update_rows([("Example", ["r1", "t0", "t1", "one"])])
+        self.backend.delete_rows([("Example", "r2")])
+        quota = self.replicator._mirror_db._db_write_quota
+        used = quota.get_status()["used_last_minute"]
+        self.assertEqual(await self.replicator.replicate_changes(), 2)
+        self.assertEqual(self.mirror_ids(), ["r1", "r3", "r4"])
+        # one request for the UPDATE, one for the DELETE
+        self.assertEqual(quota.get_status()["used_last_minute"], used + 2)
+
+    async def test_records_deleted_from_the_mirror_are_deleted(self):
+        self.mirror.delete_rows([("Example", "r2")])
+        self.assertEqual(await self.replicator.import_changes(), {"Example": 1})
+        self.assertEqual(self.local_ids(), ["r1", "r3", "r4"])
+
+    async def test_records_not_replicated_yet_are_kept(self):
+        self.backend.append_rows("Example", [["r5", "t0", "t0", "5"]])
+        # the changelog was lost, so r5 is not pending either
+        self.backend._connection.execute("DELETE FROM _changelog")
+        await self.replicator.import_changes()
+        self.assertIn("r5", self.local_ids())
+
+    async def test_a_much_smaller_mirror_tab_deletes_nothing(self):
+        self.mirror.delete_rows([("Example", "r1"), ("Example", "r2")])
+        self.mirror.delete_rows([("Example", "r3")])
+        self.assertEqual(await self.replicator.import_changes(), {})
+        self.assertEqual(len(self.local_ids()), 4)
+
+    async def test_an_empty_mirror_tab_is_sent_again(self):
+        self.mirror.replace_table("Example", [FIELDS])
+        self.assertEqual(await self.replicator.import_changes(), {})
+        self.assertEqual(len(self.local_ids()), 4)
+        await self.replicator.replicate_changes()
+        self.assertEqual(self.mirror_ids(), ["r1", "r2", "r3", "r4"])
+
+
+if __name__ == "__main__":
+    unittest.main()
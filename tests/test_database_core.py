@@ -0,0 +1,153 @@
+from database.backend_gspread import GspreadBackend
+from database.database_core import CoreDatabase
+from database.enums import CircuitStates, WriteOperations
+from database.gspread_fake import FakeGspreadClient
+from unittest import mock
+import constants
+import errors.database_errors as DbErrors
+import os
+import shutil
+import tempfile
+import unittest
+
+SPREADSHEET_URL = "https://docs.google.com/spreadsheets/d/fake"
+
+
+class CoreDatabaseTestCase(unittest.IsolatedAsyncioTestCase):
+    """`CoreDatabase` on a `FakeGspreadClient`, with one cached table "Example" """
+
+    async def asyncSetUp(self):
+        patches = {
+            "LEAGUE_DB_QUEUE_FLUSH_INTERVAL_SECONDS": 3600,
+            "LEAGUE_DB_RETRY_BASE_DELAY_SECONDS": 0,
+            "LEAGUE_DB_CIRCUIT_PROBE_INTERVAL_SECONDS": 3600,
+        }
+        for name, value in patches.items():
+            patcher = mock.patch.object(constants, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.wal_path = os.path.join(self.temp_dir, "wal.jsonl")
+        self.client = FakeGspreadClient()
+        self.db = self.open_database()
+        await self.db.get_table_data("Example")
+        await self.db.append_row("Example", ["r0", "zero"])
+        await self.db.commit_all_writes()
+        self.client.reset_calls()
+
+    async def asyncTearDown(self):
+        await self.db.close()
+
+    def open_database(self) -> CoreDatabase:
+        db = CoreDatabase(GspreadBackend(self.client, SPREADSHEET_URL), self.wal_path)
+        db.ensure_table("Example", ["record_id", "value"])
+        db.register_table("Example")
+        return db
+
+    def sheet_rows(self) -> list[list[str]]:
+        return self.client.spreadsheet._worksheets["Example"]._values()
+
+
+class TestWriteQueue(CoreDatabaseTestCase):
+    async def test_writes_to_one_record_are_coalesced(self):
+        await self.db.append_row("Example", ["r1", "a"])
+        await self.db.update_row("Example", ["r1", "b"])
+        await self.db.update_row("Example", ["r1", "c"])
+        await self.db.append_row("Example", ["r2", "x"])
+        await self.db.delete_row("Example", "r2")
+        merged = await self.db._coalesce_writes(list(self.db._db_write_queue))
+        writes = [write for write, _ in merged]
+        self.assertEqual(writes, [["Example", WriteOperations.INSERT, "r1", "c"], None])
+        await self.db.commit_all_writes()
+        self.assertEqual(self.sheet_rows()[1:], [["r0", "zero"], ["r1", "c"]])
+        self.assertEqual(self.client.calls["append_rows"], 1)
+        self.assertEqual(self.client.calls["values_batch_update"], 0)
+        self.assertEqual(self.client.calls["batch_update"], 0)
+
+    async def test_batch_commits_each_operation_with_one_request(self):
+        await self.db.append_row("Example", ["r1", "a"])
+        await self.db.append_row("Example", ["r2", "b"])
+        await self.db.append_row("Example", ["r3", "c"])
+        await self.db.commit_all_writes()
+        self.client.reset_calls()
+        await self.db.update_row("Example", ["r1", "A"])
+        await self.db.update_row("Example", ["r3", "C"])
+        await self.db.delete_row("Example", "r0")
+        await self.db.delete_row("Example", "r2")
+        await self.db.append_row("Example", ["r4", "d"])
+        await self.db.commit_all_writes()
+        self.assertEqual(self.sheet_rows()[1:], [["r1", "A"], ["r3", "C"], ["r4", "d"]])
+        self.assertEqual(self.client.calls["append_rows"], 1)
+        self.assertEqual(self.client.calls["values_batch_update"], 1)
+        self.assertEqual(self.client.calls["batch_update"], 1)
+        self.assertEqual(await self.db.get_pending_writes(), [])
+
+    async def test_write_after_delete_ends_the_batch(self):
+        await self.db.delete_row("Example", "r0")
+        await self.db.append_row("Example", ["r0", "again"])
+        batch = await self.db._next_write_batch()
+        self.assertEqual(len(batch), 1)
+        await self.db.commit_all_writes()
+        self.assertEqual(self.sheet_rows()[1:], [["r0", "again"]])
+
+
+class TestWriteAheadLog(CoreDatabaseTestCase):
+    async def test_queued_writes_are_replayed_after_a_restart(self):
+        await self.db.append_row("Example", ["r1", "a"])
+        await self.db.update_row("Example", ["r0", "updated"])
+        # the process stops before the writes are committed
+        self.db._db_write_flusher.cancel()
+        self.db._db_write_queue.clear()
+        restarted_db = self.open_database()
+        self.addAsyncCleanup(restarted_db.close)
+        self.assertEqual(len(restarted_db._db_write_queue), 2)
+        await restarted_db.commit_all_writes()
+        self.assertEqual(self.sheet_rows()[1:], [["r0", "updated"], ["r1", "a"]])
+        with open(self.wal_path, encoding="utf-8") as wal_file:
+            self.assertEqual(wal_file.read(), "")
+
+    async def test_write_is_refused_when_the_log_fails(self):
+        self.db._db_wal_path = os.path.join(self.temp_dir, "missing", "wal.jsonl")
+        with self.assertRaises(DbErrors.EmlWriteAheadLogError):
+            await self.db.append_row("Example", ["r1", "a"])
+        self.assertEqual(await self.db.get_pending_writes(), [])
+        table = await self.db.get_table_data("Example")
+        self.assertEqual(table[1:], [["r0", "zero"]])
+
+
+class TestCircuitBreaker(CoreDatabaseTestCase):
+    async def test_retried_429_does_not_open_the_circuit(self):
+        for _ in range(constants.LEAGUE_DB_CIRCUIT_FAILURE_THRESHOLD):
+            self.client.fail_next("values_batch_get", 429, 2)
+            await self.db.refresh_tables(["Example"])
+        self.assertEqual(self.db._db_circuit.state, CircuitStates.CLOSED)
+
+    async def test_outages_open_the_circuit(self):
+        self.client.failure_rate = 1.0
+        self.client.failure_code = 503
+        await self.db.append_row("Example", ["r1", "a"])
+        await self.db.commit_all_writes()
+        self.assertEqual(self.db._db_circuit.state, CircuitStates.OPEN)
+        self.assertEqual(len(await self.db.get_pending_writes()), 1)
+        # degraded mode: reads are served from the cache, with no request
+        self.client.reset_calls()
+        table = await self.db.get_table_data("Example")
+        self.assertEqual(table[1:], [["r0", "zero"], ["r1", "a"]])
+        self.assertEqual(sum(self.client.calls.values()), 0)
+
+
+class TestHistoryBuffer(CoreDatabaseTestCase):
+    async def test_full_buffer_drops_the_oldest_rows(self):
+        self.client.failure_rate = 1.0
+        self.client.failure_code = 503
+        with mock.patch.object(constants, "LEAGUE_DB_HISTORY_BUFFER_MAX_ROWS", 3):
+            for i in range(5):
+                await self.db.append_history_row("ExampleHistory", [f"h{i}"])
+            await self.db.commit_history_rows()
+        buffered = self.db._db_history_buffer["ExampleHistory"]
+        self.assertEqual(buffered, [["h2"], ["h3"], ["h4"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+from database.backend_sqlite import SqliteBackend
+from database.database_core import CoreDatabase
+from database.fields import PlayerFields
+from database.table_index import TableIndex
+from database.table_player import PlayerTable
+from unittest import mock
+import constants
+import unittest
+
+
+class TestTableIndex(unittest.TestCase):
+    def setUp(self):
+        self.rows = [["record_id", "name"]] + [[f"r{i}", f"n{i % 3}"] for i in range(6)]
+        self.index = TableIndex([1])
+        self.index.build(self.rows)
+
+    def delete(self, record_id: str):
+        position = self.index.locate(record_id)
+        row = self.rows.pop(position)
+        self.index.delete_row(row)
+
+    def test_locate_and_lookup(self):
+        self.assertEqual(self.index.locate("r0"), 1)
+        self.assertEqual(self.index.locate("r5"), 6)
+        self.assertIsNone(self.index.locate("missing"))
+        self.assertEqual(self.index.lookup(1, "N1"), [2, 5])
+
+    def test_positions_skip_tombstones(self):
+        self.delete("r1")
+        self.delete("r3")
+        self.assertEqual(self.index.locate("r4"), 3)
+        self.assertEqual(self.rows[self.index.locate("r4")][0], "r4")
+        self.assertEqual(self.index.lookup(1, "n1"), [3])
+        self.assertEqual(self.index.lookup(1, "n2"), [2, 4])
+
+    def test_add_and_update_rows(self):
+        self.delete("r0")
+        new_row = ["r6", "n1"]
+        self.rows.append(new_row)
+        self.index.add_row(new_row)
+        self.assertEqual(self.index.locate("r6"), 6)
+        self.index.update_row(new_row, ["r6", "n9"])
+        self.assertEqual(self.index.lookup(1, "n9"), [6])
+        self.assertNotIn(6, self.index.lookup(1, "n1"))
+
+    def test_tombstones_are_compacted(self):
+        with mock.patch.object(constants, "LEAGUE_DB_INDEX_MAX_TOMBSTONES", 2):
+            self.delete("r0")
+            self.delete("r1")
+            self.assertEqual(len(self.index._tombstones), 2)
+            self.delete("r2")
+        self.assertEqual(self.index._tombstones, [])
+        for position, row in enumerate(self.rows[1:], start=1):
+            self.assertEqual(self.index.locate(row[0]), position)
+
+
+class TestTableQuery(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.db = CoreDatabase(SqliteBackend(":memory:"))
+        self.table = PlayerTable(self.db)
+        for discord_id, name, region in [
+            ("1", "Alice", "EU"),
+            ("2", "Bob", "NA"),
+            ("3", "Carol", "EU"),
+        ]:
+            await self.table.create_player_record(
+                discord_id=discord_id, player_name=name, region=region
+            )
+
+    async def asyncTearDown(self):
+        await self.db.close()
+
+    async def test_where_matches_fields_casefolded(self):
+        rows = await self.table.where(region="eu").rows()
+        self.assertEqual(
+            [row[PlayerFields.player_name] for row in rows], ["Alice", "Carol"]
+        )
+        rows = await self.table.where(region="EU", player_name="carol").rows()
+        self.assertEqual([row[PlayerFields.discord_id] for row in rows], ["3"])
+
+    async def test_where_ignores_unset_values(self):
+        self.assertEqual(await self.table.where(region=None).count(), 3)
+        self.assertTrue(await self.table.where(discord_id="2").exists())
+        self.assertIsNone(await self.table.where(discord_id="4").first())
+
+    async def test_where_rejects_unknown_fields(self):
+        with self.assertRaises(ValueError):
+            self.table.where(status="EU")
+
+    async def test_query_sees_deleted_records(self):
+        record = await self.table.where(discord_id="1").first()
+        await self.table.delete_player_record(record)
+        rows = await self.table.where(region="EU").rows()
+        self.assertEqual([row[PlayerFields.player_name] for row in rows], ["Carol"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+from database.backend_sqlite import SqliteBackend
+from database.database_core import CoreDatabase
+from database.database_full import FullDatabase
+from database.table_cooldown import CooldownTable
+from enum import Enum
+import inspect
+import time
+import unittest
+
+
+class TestGetRecords(unittest.IsolatedAsyncioTestCase):
+    """Every `get_*_records` query only uses field names the table has"""
+
+    async def asyncSetUp(self):
+        self.db = CoreDatabase(SqliteBackend(":memory:"))
+        self.full_database = FullDatabase(self.db)
+
+    async def asyncTearDown(self):
+        await self.db.close()
+
+    @staticmethod
+    def sample_value(parameter: inspect.Parameter):
+        """A value of the type of a query argument"""
+        if inspect.isclass(parameter.annotation):
+            if issubclass(parameter.annotation, Enum):
+                return list(parameter.annotation)[0]
+            if issubclass(parameter.annotation, bool):
+                return True
+            if issubclass(parameter.annotation, int):
+                return 1
+        return "sample"
+
+    def get_records_methods(self):
+        for table_name, table in vars(self.full_database).items():
+            for method_name, method in inspect.getmembers(table, inspect.ismethod):
+                if method_name.startswith("get_") and method_name.endswith("_records"):
+                    yield f"{table_name}.{method_name}", method
+
+    async def test_get_records_with_every_argument(self):
+        methods = list(self.get_records_methods())
+        self.assertGreater(len(methods), 10)
+        for name, method in methods:
+            with self.subTest(name):
+                self.assertEqual(await method(), [])
+                for parameter in inspect.signature(method).parameters.values():
+                    with self.subTest(name, argument=parameter.name):
+                        value = self.sample_value(parameter)
+                        records = await method(**{parameter.name: value})
+                        self.assertEqual(records, [])
+
+
+class TestExpiredRecords(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.db = CoreDatabase(SqliteBackend(":memory:"))
+        self.table = CooldownTable(self.db)
+
+    async def asyncTearDown(self):
+        await self.db.close()
+
+    async def test_expired_records_are_swept_from_the_whole_table(self):
+        now = int(time.time())
+        await self.table.create_cooldown_record("p1", "t1", "one", "team", now - 60)
+        await self.table.create_cooldown_record("p2", "t1", "two", "team", now + 60)
+        self.assertEqual(len(await self.table.get_table_data()), 3)
+        # a query for another player still removes the expired record of "p1"
+        self.table._expired_swept_at = 0
+        records = await self.table.get_cooldown_records(player_id="p2")
+        self.assertEqual(len(records), 1)
+        self.assertEqual(len(await self.table.get_table_data()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()